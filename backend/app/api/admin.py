@@ -0,0 +1,79 @@
+"""
+Admin endpoints for operators
+
+Mounted in every environment, production included, but only usable with the
+ADMIN_API_TOKEN (sent as the X-Admin-Token header). While the token is unset
+the endpoints answer 404.
+"""
+import hmac
+import logging
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+from app.core.config import settings
+from app.core.profiler import ProfilerBusy, collapsed, profiler
+
+logger = logging.getLogger(__name__)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None, alias="X-Admin-Token")):
+    """Reject requests without the admin token"""
+    if not settings.ADMIN_API_TOKEN:
+        raise HTTPException(
+            status_code=404,
+            detail={"success": False, "error": "Admin endpoints are disabled (set ADMIN_API_TOKEN)"}
+        )
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.ADMIN_API_TOKEN):
+        raise HTTPException(
+            status_code=401,
+            detail={"success": False, "error": "Invalid admin token"}
+        )
+
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+
+@router.post("/profile", response_class=PlainTextResponse)
+async def sampling_profile(
+    seconds: Optional[float] = Query(None, gt=0, description="Profile the whole process for this long"),
+    route: Optional[str] = Query(None, description="Profile requests to this path, e.g. /api/v1/voice/process-audio"),
+    requests: int = Query(10, ge=1, le=1000, description="With `route`: how many requests to profile"),
+    include_idle: bool = Query(False, description="Keep samples of threads that are only waiting")
+):
+    """
+    Run the sampling profiler and return collapsed stacks
+
+    Either for `seconds`, or until the next `requests` requests to `route`
+    finished (capped at PROFILER_MAX_SECONDS). The response holds when the
+    profile is done. Feed it to flamegraph.pl, or drop it on speedscope.app:
+
+        curl -X POST -H "X-Admin-Token: $TOKEN" \\
+            "$API/admin/profile?route=/api/v1/voice/process-audio&requests=20" > echobank.folded
+        flamegraph.pl echobank.folded > echobank.svg
+    """
+    if (seconds is None) == (route is None):
+        raise HTTPException(
+            status_code=400,
+            detail={"success": False, "error": "Give either seconds or route"}
+        )
+
+    logger.info(
+        "Profiling started",
+        extra={"seconds": seconds, "route": route, "requests": requests if route else None}
+    )
+    try:
+        if route is not None:
+            result = await profiler.profile_requests(route, requests, include_idle=include_idle)
+        else:
+            result = await profiler.profile_for(seconds, include_idle=include_idle)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail={"success": False, "error": str(e)})
+
+    headers = {
+        "X-Profile-Samples": str(result["samples"]),
+        "X-Profile-Duration-Seconds": str(result["duration_seconds"]),
+        "X-Profile-Interval-Ms": str(result["interval_ms"]),
+    }
+    if route is not None:
+        headers["X-Profile-Requests"] = str(result["requests"])
+    return PlainTextResponse(collapsed(result["stacks"]), headers=headers)
@@ -11,6 +11,13 @@ import secrets
 import hashlib
 from app.core.database import get_db
 from app.models.company import Company, CompanyEndpoints
+from app.services.endpoint_scoreboard import endpoint_scoreboard
+from app.services.health_prober import health_prober
+from app.services.response_mapping import (
+    compile_response_mapping,
+    mapping_cache,
+    ResponseMappingError,
+)
 
 router = APIRouter(prefix="/api/v1/companies", tags=["Company Management"])
 
@@ -208,6 +215,18 @@ async def configure_endpoints(
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
 
+    # Compile the response mapping up front so bad paths fail here, not mid-call
+    try:
+        compiled_mapping = compile_response_mapping(request.response_mapping)
+    except ResponseMappingError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "success": False,
+                "error": f"Invalid response_mapping: {str(e)}"
+            }
+        )
+
     # Check if endpoints already configured
     existing_endpoints = db.query(CompanyEndpoints).filter(
         CompanyEndpoints.company_id == company_id
@@ -258,6 +277,8 @@ async def configure_endpoints(
     company.is_active = True
     db.commit()
 
+    mapping_cache.store(company_id, compiled_mapping)
+
     return {
         "success": True,
         "company_id": company_id,
@@ -303,6 +324,54 @@ async def get_company_endpoints(
     }
 
 
+@router.get("/{company_id}/health")
+async def get_company_health(
+    company_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Latency and error rate of the company's API endpoints
+
+    Numbers cover the last few minutes of real traffic; the background
+    prober's synthetic calls are reported separately under "probe" and only
+    decide the status of endpoints without recent real traffic.
+    """
+
+    company = db.query(Company).filter(Company.id == company_id).first()
+
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+
+    endpoints = endpoint_scoreboard.snapshot(company_id)
+    last_probe_at = health_prober.last_probe_at.get(company_id)
+
+    # Healthy unless some endpoint is mostly failing
+    error_rates = []
+    for stats in endpoints.values():
+        source = stats if stats["samples"] else stats["probe"]
+        if source["samples"]:
+            error_rates.append(source["error_rate"])
+    if not error_rates:
+        status = "unknown"
+    elif max(error_rates) >= 0.5:
+        status = "down"
+    elif max(error_rates) > 0.05:
+        status = "degraded"
+    else:
+        status = "healthy"
+
+    return {
+        "success": True,
+        "data": {
+            "company_id": company_id,
+            "status": status,
+            "last_probe_at": last_probe_at.isoformat() if last_probe_at else None,
+            "window_seconds": endpoint_scoreboard.window_seconds,
+            "endpoints": endpoints
+        }
+    }
+
+
 @router.get("/{company_id}")
 async def get_company_info(
     company_id: int,
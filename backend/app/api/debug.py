@@ -0,0 +1,86 @@
+"""
+Debug endpoints for operators
+
+Mounted in every environment behind the same X-Admin-Token check as the admin
+endpoints (see api/admin.py): traces carry session ids and timings, so they
+answer 404 while ADMIN_API_TOKEN is unset.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from app.api.admin import require_admin
+from app.core.config import settings
+from app.core.loop_monitor import loop_monitor
+from app.core.tracing import tracer
+
+router = APIRouter(prefix="/debug", tags=["Debug"], dependencies=[Depends(require_admin)])
+
+
+def _ring():
+    if tracer.ring is None:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "success": False,
+                "error": "In-memory traces are disabled (add 'ring' to TRACE_EXPORTERS)"
+            }
+        )
+    return tracer.ring
+
+
+@router.get("/traces")
+async def recent_slow_traces(
+    min_duration_ms: Optional[float] = Query(None, ge=0, description="Defaults to TRACE_SLOW_TURN_MS"),
+    limit: int = Query(20, ge=1, le=200)
+):
+    """Recent slow requests across all sessions, newest first"""
+    threshold = settings.TRACE_SLOW_TURN_MS if min_duration_ms is None else min_duration_ms
+    traces = _ring().recent(min_duration_ms=threshold, limit=limit)
+
+    return {
+        "success": True,
+        "data": {
+            "min_duration_ms": threshold,
+            "traces": [trace.to_dict() for trace in traces]
+        }
+    }
+
+
+@router.get("/traces/{session_id}")
+async def session_traces(
+    session_id: str,
+    min_duration_ms: Optional[float] = Query(None, ge=0, description="Defaults to TRACE_SLOW_TURN_MS; 0 shows every turn"),
+    limit: int = Query(20, ge=1, le=200)
+):
+    """
+    Recent slow turns of one conversation as span trees
+
+    Each trace shows where the time went: stt.whisper, llm.parse_intent,
+    bank.<endpoint> and tts.synthesize spans under the HTTP request span.
+    """
+    threshold = settings.TRACE_SLOW_TURN_MS if min_duration_ms is None else min_duration_ms
+    traces = _ring().recent(session_id=session_id, min_duration_ms=threshold, limit=limit)
+
+    return {
+        "success": True,
+        "data": {
+            "session_id": session_id,
+            "min_duration_ms": threshold,
+            "traces": [trace.to_dict() for trace in traces]
+        }
+    }
+
+
+@router.get("/loop")
+async def event_loop_stalls():
+    """
+    Where the event loop was blocked
+
+    Stalls longer than LOOP_BLOCK_THRESHOLD_MS, grouped by the endpoint that
+    was running, with the stack of the worst one. Stacks are only captured
+    with LOOP_WATCHDOG_ENABLED; lag itself is always measured (see /metrics).
+    """
+    return {
+        "success": True,
+        "data": loop_monitor.snapshot()
+    }
+
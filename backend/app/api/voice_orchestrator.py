@@ -11,21 +11,60 @@ Integration Flow:
     4. Returns what to say back + next action
 """
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, Header, Depends
-from fastapi.responses import Response
+from fastapi import APIRouter, UploadFile, File, HTTPException, Header, Depends, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
 from sqlalchemy.orm import Session
 from app.services.whisper import whisper_service
 from app.services.llm import llm_service
 from app.services.tts import tts_service
-from app.services.company_api_client import CompanyAPIClient
+from app.services.company_api_client import CompanyAPIClient, use_intent
+from app.services.admission import BUSY_TEXT, TRANSFER, Admission, admission_controller, turn_priority
+from app.services.audio_cache import audio_cache
+from app.services.notifications import notify_transfer_completed
+from app.services.prompts import (
+    GREETING_TEXT,
+    HELP_TEXT,
+    NO_SPEECH_TEXT,
+    NOT_UNDERSTOOD_TEXT,
+    PIN_PROMPT_TEXT,
+    TIMEOUT_TEXT,
+    TRANSFER_CANCELLED_TEXT,
+    TRANSFER_DETAILS_TEXT,
+)
+from app.services.tenant_scheduler import mark_urgent, use_company
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.deadline import DeadlineExceeded, has_budget, skip_stage, start_deadline
+from app.core.responses import JSONTemplate, dumps
+from app.utils.fieldsets import FieldTree, FieldsetError, apply_fields, parse_fields
 from app.utils.session import session_store
+from app.core.metrics import (
+    STAGE_SECONDS,
+    TURN_SECONDS,
+    TURNS_TOTAL,
+    INTENT_SOURCE_TOTAL,
+    INFLIGHT_TURNS,
+)
+from app.core.tracing import set_trace_attribute
+from app.utils.audio import MEDIA_TYPES, available_formats, negotiate_audio_format, transcode_wav
+from urllib.parse import quote
+import asyncio
 import base64
+import logging
+import time
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/voice", tags=["Voice Orchestration"])
 
+# Intents the LLM may return; anything else is labelled "other" in metrics
+KNOWN_INTENTS = {
+    "check_balance", "view_recipients", "view_transactions", "transfer", "add_recipient",
+    "provide_pin", "confirm", "cancel", "start_over", "greeting", "help", "unknown",
+}
+
 
 class VoiceRequest(BaseModel):
     """Request for text-based voice command"""
@@ -35,6 +74,8 @@ class VoiceRequest(BaseModel):
     session_id: Optional[str] = None
     token: Optional[str] = None  # User's auth token from the bank
     include_audio: bool = False  # Include TTS audio in response
+    audio_mode: str = "inline"  # inline (base64 in JSON), url (audio_url to fetch) or stream (audio body, metadata in headers)
+    audio_format: Optional[str] = None  # wav, ogg (Opus) or mp3; default negotiated from the Accept header
 
 
 class TTSRequest(BaseModel):
@@ -50,7 +91,9 @@ class VoiceResponse(BaseModel):
     session_id: str
     intent: str
     response_text: str  # What to say back to user
-    response_audio: Optional[str] = None  # Base64 encoded audio (if include_audio=True)
+    response_audio: Optional[str] = None  # Base64 encoded audio (if include_audio=True, audio_mode="inline")
+    audio_url: Optional[str] = None  # Where to fetch the audio (audio_mode="url"); expires after a couple of minutes
+    audio_format: Optional[str] = None  # wav, ogg or mp3
     action: Optional[str] = None  # next_action: confirm_transfer, input_pin, etc
     data: Optional[Dict[str, Any]] = None  # Additional context
     error: Optional[str] = None
@@ -64,6 +107,10 @@ async def process_voice_audio(
     session_id: Optional[str] = Header(None, alias="session-id"),
     token: Optional[str] = Header(None),
     include_audio: Optional[str] = Header(None, alias="include-audio"),  # For TTS response
+    audio_mode: str = Header("inline", alias="audio-mode"),
+    audio_format: Optional[str] = Header(None, alias="audio-format"),
+    accept: Optional[str] = Header(None),
+    fields: Optional[str] = Query(None),
     db: Session = Depends(get_db)
 ):
     """
@@ -87,57 +134,77 @@ async def process_voice_audio(
 
     Returns:
         Voice response with what to say back and next action
+        (only the parts named in ?fields=, see parse_voice_fields)
     """
-    import time
-    request_start = time.time()
+    turn_start = time.perf_counter()
+    start_deadline(settings.TURN_DEADLINE_SECONDS)
+    use_company(company_id)
+    audio_format = resolve_audio_format(audio_mode, audio_format, accept)
+    field_tree = parse_voice_fields(fields)
+
+    # Convert include_audio header to boolean
+    should_include_audio = bool(include_audio) and include_audio.lower() in ['true', '1', 'yes']
+
+    # Decide before spending anything on STT
+    priority = turn_priority(session_store.get(session_id or f"session_{account_number}"))
+    admission = admission_controller.admit(priority)
+    if admission is None:
+        return busy_response(session_id or f"session_{account_number}", should_include_audio, audio_mode)
+    mark_urgent(priority == TRANSFER)
+
+    with INFLIGHT_TURNS.track_inprogress(), admission:
+        try:
+            # Step 1: Transcribe audio
+            with STAGE_SECONDS.time(stage="stt", company_id=company_id, intent="none"):
+                transcription = await whisper_service.transcribe_audio(audio)
+            transcript_text = transcription["transcript"]
+
+            if transcription.get("no_speech"):
+                # Preprocessing found only silence; answer without STT, LLM or bank calls
+                result = no_speech_response(session_id or f"session_{account_number}")
+            else:
+                # Step 2: Process as text
+                result = await run_voice_turn(
+                    request=VoiceRequest(
+                        text=transcript_text,
+                        account_number=account_number,
+                        company_id=company_id,
+                        session_id=session_id,
+                        token=token,
+                        include_audio=should_include_audio,
+                        audio_mode=audio_mode,
+                        audio_format=audio_format
+                    ),
+                    db=db
+                )
 
-    try:
-        # Step 1: Transcribe audio
-        whisper_start = time.time()
-        transcription = await whisper_service.transcribe_audio(audio)
-        transcript_text = transcription["transcript"]
-        whisper_time = time.time() - whisper_start
-        print(f"[TIMING] Whisper transcription took: {whisper_time:.2f}s")
-
-        # Step 2: Process as text
-        # Convert include_audio header to boolean
-        should_include_audio = include_audio and include_audio.lower() in ['true', '1', 'yes']
-
-        print(f"[TTS DEBUG] include_audio header: {include_audio}")
-        print(f"[TTS DEBUG] should_include_audio: {should_include_audio}")
-
-        processing_start = time.time()
-        result = await process_voice_text(
-            request=VoiceRequest(
-                text=transcript_text,
-                account_number=account_number,
-                company_id=company_id,
-                session_id=session_id,
-                token=token,
-                include_audio=should_include_audio
-            ),
-            db=db
-        )
+        except DeadlineExceeded:
+            result = deadline_response(session_id or f"session_{account_number}")
+        except Exception as e:
+            result = VoiceResponse(
+                success=False,
+                session_id=session_id or "error",
+                intent="error",
+                response_text="Sorry, I couldn't understand that. Please try again.",
+                error=str(e)
+            )
 
-        processing_time = time.time() - processing_start
-        total_time = time.time() - request_start
-        print(f"[TIMING] Processing (LLM + API + TTS) took: {processing_time:.2f}s")
-        print(f"[TIMING] ⏱️  TOTAL REQUEST TIME: {total_time:.2f}s")
+        if audio_mode == "stream":
+            admission.defer()  # Audio is synthesized while the body is sent
 
-        return result
-
-    except Exception as e:
-        return VoiceResponse(
-            success=False,
-            session_id=session_id or "error",
-            intent="error",
-            response_text="Sorry, I couldn't understand that. Please try again.",
-            error=str(e)
-        )
+    record_turn_metrics("audio", company_id, result, turn_start)
+    if audio_mode == "stream":
+        return hold_until_sent(audio_body_response(result, should_include_audio, audio_format), admission)
+    return voice_json_response(result, field_tree)
 
 
 @router.post("/process-text", response_model=VoiceResponse)
-async def process_voice_text(request: VoiceRequest, db: Session = Depends(get_db)):
+async def process_voice_text(
+    request: VoiceRequest,
+    http_request: Request,
+    fields: Optional[str] = Query(None),
+    db: Session = Depends(get_db)
+):
     """
     Process text command (for testing or text-based input)
 
@@ -156,17 +223,333 @@ async def process_voice_text(request: VoiceRequest, db: Session = Depends(get_db
         });
         ```
     """
+    turn_start = time.perf_counter()
+    start_deadline(settings.TURN_DEADLINE_SECONDS)
+    request.audio_format = resolve_audio_format(
+        request.audio_mode, request.audio_format, http_request.headers.get("accept")
+    )
+    field_tree = parse_voice_fields(fields)
+
+    session_id = request.session_id or f"session_{request.account_number}"
+    priority = turn_priority(session_store.get(session_id))
+    admission = admission_controller.admit(priority)
+    if admission is None:
+        return busy_response(session_id, request.include_audio, request.audio_mode)
+    mark_urgent(priority == TRANSFER)
+
+    with INFLIGHT_TURNS.track_inprogress(), admission:
+        result = await run_voice_turn(request, db)
+        if request.audio_mode == "stream":
+            admission.defer()  # Audio is synthesized while the body is sent
+
+    record_turn_metrics("text", request.company_id, result, turn_start)
+    if request.audio_mode == "stream":
+        return hold_until_sent(
+            audio_body_response(result, request.include_audio, request.audio_format), admission
+        )
+    return voice_json_response(result, field_tree)
+
+
+def no_speech_response(session_id: str) -> VoiceResponse:
+    """Answer for audio that had no speech in it"""
+    return VoiceResponse(
+        success=True,
+        session_id=session_id,
+        intent="no_speech",
+        response_text=NO_SPEECH_TEXT,
+        action="clarify"
+    )
+
+
+def deadline_response(session_id: str) -> VoiceResponse:
+    """Answer for a turn that ran out of time (TURN_DEADLINE_SECONDS)"""
+    return VoiceResponse(
+        success=False,
+        session_id=session_id,
+        intent="timeout",
+        response_text=TIMEOUT_TEXT,
+        action="retry",
+        error="Turn deadline exceeded"
+    )
+
+
+def busy_body(session_id: str) -> VoiceResponse:
+    return VoiceResponse(
+        success=False,
+        session_id=session_id,
+        intent="busy",
+        response_text=BUSY_TEXT,
+        action="retry",
+        error="Server busy"
+    )
+
+
+def _static_body(response: VoiceResponse) -> JSONTemplate:
+    return JSONTemplate(response.model_dump(mode="json"), "session_id")
+
+
+# Replies whose JSON only differs in session_id, serialized once
+STATIC_BODIES: Dict[str, JSONTemplate] = {
+    template.content["intent"]: template for template in (
+        _static_body(VoiceResponse(
+            success=True, session_id="", intent="greeting", response_text=GREETING_TEXT, action="ready"
+        )),
+        _static_body(VoiceResponse(
+            success=True, session_id="", intent="help", response_text=HELP_TEXT, action="ready"
+        )),
+        _static_body(no_speech_response("")),
+        _static_body(deadline_response("")),
+        _static_body(busy_body("")),
+    )
+}
+
+
+# Kept in every response whatever ?fields= asks for
+ALWAYS_FIELDS = ("success", "session_id", "error")
+
+
+def parse_voice_fields(fields: Optional[str]) -> Optional[FieldTree]:
+    """
+    Parse the ?fields= sparse fieldset of a voice turn
+
+    e.g. fields=intent,response_text,data.recipients.name returns only those
+    (plus success, session_id and error). None/empty = the whole response.
+    """
+    if not fields:
+        return None
+    try:
+        return parse_fields(fields, VoiceResponse.model_fields, always=ALWAYS_FIELDS)
+    except FieldsetError as e:
+        raise HTTPException(status_code=400, detail={"success": False, "error": str(e)})
+
+
+def voice_json_response(response: VoiceResponse, fields: Optional[FieldTree] = None) -> Response:
+    """
+    JSON body of a turn
+
+    Fixed replies use their pre-serialized body. Anything else is encoded in
+    one pass, instead of FastAPI's dump, re-validate and serialize passes over
+    the response_model (which copy base64 audio each time). See
+    benchmarks/serialization.py.
+
+    With a sparse fieldset (parse_voice_fields), only the selected parts are
+    dumped and encoded.
+    """
+    if fields is not None:
+        content = response.model_dump(include={key: True for key in fields})
+        return Response(content=dumps(apply_fields(content, fields)), media_type="application/json")
+    template = STATIC_BODIES.get(response.intent)
+    if template is not None and all(
+        getattr(response, name) == value for name, value in template.content.items() if name != "session_id"
+    ):
+        return template.response(response.session_id)
+    if response.response_audio:
+        # orjson copies long base64 strings about twice as fast as pydantic's encoder
+        body = dumps(response.model_dump())
+    else:
+        body = response.model_dump_json()
+    return Response(content=body, media_type="application/json")
+
+
+def busy_response(session_id: str, include_audio: bool = False, audio_mode: str = "inline") -> Response:
+    """
+    503 for a turn shed by admission control
+
+    Carries the pre-rendered busy message when audio was asked for: as the
+    body in stream mode, else inline (base64) whatever the audio_mode.
+    """
+    headers = {"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)}
+    audio = admission_controller.busy_audio if include_audio else None
+    if audio is None:
+        # The common case under overload; no need to build a response at all
+        return STATIC_BODIES["busy"].response(session_id, status_code=503, headers=headers)
+
+    response = busy_body(session_id)
+
+    if audio_mode == "stream":
+        return Response(
+            content=audio,
+            status_code=503,
+            media_type=MEDIA_TYPES["wav"],
+            headers={**voice_response_headers(response), **headers}
+        )
+    response.response_audio = base64.b64encode(audio).decode("utf-8")
+    response.audio_format = "wav"
+    return Response(
+        content=response.model_dump_json(), status_code=503, headers=headers, media_type="application/json"
+    )
+
+
+AUDIO_MODES = ("inline", "url", "stream")
+
+
+def audio_format_preference():
+    """Configured format order, limited to what this server can encode"""
+    available = available_formats()
+    return tuple(f.strip() for f in settings.TTS_AUDIO_FORMATS.split(",") if f.strip() in available) or ("wav",)
+
+
+def resolve_audio_format(audio_mode: str, audio_format: Optional[str], accept: Optional[str]) -> str:
+    """
+    Pick the response audio format: explicit audio_format, else Accept negotiation
+
+    inline keeps WAV by default for existing clients. url/stream take the best
+    format the client accepts (Opus/MP3 when this server can encode them).
+    """
+    if audio_mode not in AUDIO_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail={"success": False, "error": f"audio_mode must be one of: {', '.join(AUDIO_MODES)}"}
+        )
+
+    preference = audio_format_preference()
+    if audio_format:
+        if audio_format not in preference:
+            raise HTTPException(
+                status_code=406,
+                detail={"success": False, "error": f"audio_format must be one of: {', '.join(preference)}"}
+            )
+        return audio_format
+
+    if audio_mode == "inline":
+        return "wav"
+
+    negotiated = negotiate_audio_format(accept, preference)
+    if negotiated is None and audio_mode == "stream" and accept and "json" not in accept:
+        raise HTTPException(
+            status_code=406,
+            detail={"success": False, "error": f"Can produce: {', '.join(MEDIA_TYPES[f] for f in preference)}"}
+        )
+    return negotiated or preference[0]
+
+
+def voice_response_headers(response: VoiceResponse) -> Dict[str, str]:
+    """VoiceResponse metadata for audio bodies (text is percent-encoded UTF-8)"""
+    headers = {
+        "X-Success": "true" if response.success else "false",
+        "X-Session-Id": response.session_id,
+        "X-Intent": response.intent,
+        "X-Response-Text": quote(response.response_text),
+        "Cache-Control": "no-store",
+    }
+    if response.action:
+        headers["X-Action"] = response.action
+    if response.audio_url:
+        headers["X-Audio-Url"] = response.audio_url
+    return headers
+
+
+def audio_body_response(response: VoiceResponse, include_audio: bool = True, audio_format: str = "wav"):
+    """
+    audio_mode="stream": audio as the body, metadata in headers
+
+    WAV is synthesized clause by clause while the body is being sent, so
+    playback starts after the first clause. ogg/mp3 are encoded whole first.
+    Falls back to the JSON VoiceResponse when there is no audio (TTS
+    unavailable or failed), so clients should check the Content-Type.
+    """
+    if include_audio and audio_format == "wav" and not response.audio_url:
+        if not tts_service.available or not response.response_text:
+            return response
+        if not has_budget(settings.TTS_MIN_BUDGET_SECONDS):
+            skip_stage("tts")
+            return response
+        response.audio_format = "wav"
+        return StreamingResponse(
+            tts_service.stream_speech(response.response_text),
+            media_type=MEDIA_TYPES["wav"],
+            headers=voice_response_headers(response)
+        )
+
+    entry = audio_cache.get(response.audio_url.rsplit("/", 1)[-1]) if response.audio_url else None
+    if entry is None:
+        return response
+
+    return Response(
+        content=entry["audio"],
+        media_type=entry["media_type"],
+        headers=voice_response_headers(response)
+    )
+
+
+def hold_until_sent(response, admission: Admission):
+    """
+    Release a deferred admission once the response body has been sent
+
+    Streamed WAV is synthesized while it is sent, so the turn keeps using
+    capacity until the last chunk is out. Other responses are complete
+    already and release at once.
+    """
+    if not isinstance(response, StreamingResponse):
+        admission.release()
+        return response
+
+    body = response.body_iterator
+
+    async def release_when_sent():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            if hasattr(body, "aclose"):
+                await body.aclose()
+            admission.release()
+
+    response.body_iterator = release_when_sent()
+    return response
+
+
+def record_turn_metrics(input_type: str, company_id: int, response: VoiceResponse, turn_start: float):
+    """Record total turn time and outcome (metrics + root trace span)"""
+    set_trace_attribute("turn.input", input_type)
+    set_trace_attribute("turn.intent", response.intent)
+    set_trace_attribute("turn.success", response.success)
+    TURN_SECONDS.observe(
+        time.perf_counter() - turn_start,
+        input=input_type, company_id=company_id, intent=response.intent
+    )
+    TURNS_TOTAL.inc(
+        input=input_type, company_id=company_id, intent=response.intent,
+        success="true" if response.success else "false"
+    )
+
+
+async def run_voice_turn(
+    request: VoiceRequest,
+    db: Session,
+    api_client: Optional[CompanyAPIClient] = None,
+    intent_result: Optional[Dict[str, Any]] = None
+) -> VoiceResponse:
+    """
+    Handle one conversational turn from text: resolve intent, execute it
+    against the bank's API and optionally attach TTS audio.
+
+    Args:
+        request: The turn
+        db: Database session
+        api_client: Client to reuse (a WebSocket conversation keeps one, with
+            its company config and bank connections, for all of its turns);
+            by default one is built for this turn
+        intent_result: parse_intent result already computed for this text
+            (a committed speculation); skips the LLM call
+    """
+    use_company(request.company_id)
+    use_intent("none")
     try:
         # Initialize company API client with the bank's configured endpoints
-        api_client = CompanyAPIClient(company_id=request.company_id, db=db)
+        if api_client is None:
+            api_client = CompanyAPIClient(company_id=request.company_id, db=db)
 
         # Get or create session
         session_id = request.session_id or f"session_{request.account_number}"
         session_data = session_store.get(session_id) or {}
+        set_trace_attribute("session_id", session_id)
+        set_trace_attribute("company_id", request.company_id)
 
         # Check if we're awaiting transfer details (recipient name or amount)
         if session_data.get("awaiting_transfer_details"):
-            print(f"[TRANSFER] Awaiting transfer details, user said: {request.text}")
+            INTENT_SOURCE_TOTAL.inc(source="session_state")
+            use_intent("transfer")
 
             # Extract entities from user's response
             entities = {}
@@ -192,7 +575,10 @@ async def process_voice_text(request: VoiceRequest, db: Session = Depends(get_db
             if session_data.get("pending_recipient_name") and not entities.get("recipient"):
                 entities["recipient"] = session_data["pending_recipient_name"]
 
-            print(f"[TRANSFER] Extracted entities: {entities}")
+            logger.debug(
+                "Transfer details from follow-up: %s", entities,
+                extra={"session_id": session_id}
+            )
 
             # Clear awaiting state
             session_data.pop("awaiting_transfer_details", None)
@@ -205,6 +591,8 @@ async def process_voice_text(request: VoiceRequest, db: Session = Depends(get_db
 
         # Check if we're in recipient disambiguation mode
         if session_data.get("pending_recipients"):
+            INTENT_SOURCE_TOTAL.inc(source="session_state")
+            use_intent("transfer")
             pending_recipients = session_data["pending_recipients"]
             pending_amount = session_data.get("pending_amount")
 
@@ -213,7 +601,9 @@ async def process_voice_text(request: VoiceRequest, db: Session = Depends(get_db
             user_input_lower = request.text.lower()
 
             for recipient in pending_recipients:
-                if user_input_lower in recipient["name"].lower() or recipient["name"].lower() in user_input_lower:
+                # Banks may send a recipient without a name; it can't be picked by name
+                name = (recipient["name"] or "").lower()
+                if name and (user_input_lower in name or name in user_input_lower):
                     selected_recipient = recipient
                     break
 
@@ -266,7 +656,7 @@ async def process_voice_text(request: VoiceRequest, db: Session = Depends(get_db
                 )
             else:
                 # User didn't select a valid recipient
-                names_list = ", ".join([r.get("recipient_name", r.get("name", "Unknown")) for r in pending_recipients])
+                names_list = ", ".join([r["name"] or "Unknown" for r in pending_recipients])
                 return VoiceResponse(
                     success=True,
                     session_id=session_id,
@@ -277,32 +667,41 @@ async def process_voice_text(request: VoiceRequest, db: Session = Depends(get_db
                 )
 
         # Step 1: Parse intent with LLM
-        import time
-        llm_start = time.time()
-        intent_result = await llm_service.parse_intent(
-            request.text,
-            context=session_data
-        )
-        llm_time = time.time() - llm_start
-        print(f"[TIMING] LLM intent parsing took: {llm_time:.2f}s")
+        llm_start = time.perf_counter()
+        if intent_result is None:
+            intent_result = await llm_service.parse_intent(
+                request.text,
+                context=session_data
+            )
 
         intent = intent_result.get("intent", "unknown")
+        intent_label = intent if intent in KNOWN_INTENTS else "other"
+        STAGE_SECONDS.observe(
+            time.perf_counter() - llm_start,
+            stage="llm", company_id=request.company_id, intent=intent_label
+        )
+        use_intent(intent_label)
         entities = intent_result.get("entities", {})
         confidence = intent_result.get("confidence", 0.0)
 
-        # DEBUG LOGGING - Track intent recognition (no emojis for Windows compatibility)
-        print(f"\n{'='*60}")
-        print(f"[TRANSCRIPT] User said: '{request.text}'")
-        print(f"[INTENT] LLM parsed as: {intent}")
-        print(f"[CONFIDENCE] Score: {confidence}")
-        print(f"[ENTITIES] Extracted: {entities}")
-        print(f"{'='*60}\n")
+        # Track intent recognition; transcript/entities only at DEBUG (they may hold PII)
+        logger.info(
+            "Intent parsed",
+            extra={"session_id": session_id, "company_id": request.company_id, "intent": intent, "confidence": confidence}
+        )
+        logger.debug(
+            "Transcript %r parsed as %s with entities %s", request.text, intent, entities,
+            extra={"session_id": session_id}
+        )
 
         # Update session
         session_data["last_transcript"] = request.text
         session_data["last_intent"] = intent
         session_data["entities"] = entities
 
+        if intent != "unknown":
+            INTENT_SOURCE_TOTAL.inc(source="llm")
+
         # Step 2: Check for global interrupts first
         if intent == "cancel":
             response = await handle_cancel_intent(request, session_data, session_id, api_client)
@@ -350,7 +749,7 @@ async def process_voice_text(request: VoiceRequest, db: Session = Depends(get_db
                 success=True,
                 session_id=session_id,
                 intent="greeting",
-                response_text="Hello! I'm your voice banking assistant. I can help you check your balance, send money, view recipients, or check transactions. What would you like to do?",
+                response_text=GREETING_TEXT,
                 action="ready"
             )
 
@@ -359,7 +758,7 @@ async def process_voice_text(request: VoiceRequest, db: Session = Depends(get_db
                 success=True,
                 session_id=session_id,
                 intent="help",
-                response_text="I can help you with: checking your balance, sending money to saved recipients, viewing your recipients, checking transaction history, or adding new recipients. Just tell me what you'd like to do!",
+                response_text=HELP_TEXT,
                 action="ready"
             )
 
@@ -369,18 +768,26 @@ async def process_voice_text(request: VoiceRequest, db: Session = Depends(get_db
 
             # Check for balance keywords
             if any(word in text_lower for word in ["balance", "money", "account", "how much"]):
-                return await handle_check_balance(request, session_data, session_id, api_client)
+                INTENT_SOURCE_TOTAL.inc(source="keyword_fallback")
+                use_intent("check_balance")
+                return await handle_balance_intent(request, session_data, session_id, api_client)
 
             # Check for recipients keywords
             elif any(word in text_lower for word in ["recipient", "beneficiar", "people", "send to", "who can"]):
-                return await handle_view_recipients(request, session_data, session_id, api_client)
+                INTENT_SOURCE_TOTAL.inc(source="keyword_fallback")
+                use_intent("view_recipients")
+                return await handle_view_recipients_intent(request, session_data, session_id, api_client)
 
             # Check for transactions keywords
             elif any(word in text_lower for word in ["transaction", "history", "spent", "payment"]):
-                return await handle_view_transactions(request, session_data, session_id, api_client)
+                INTENT_SOURCE_TOTAL.inc(source="keyword_fallback")
+                use_intent("view_transactions")
+                return await handle_view_transactions_intent(request, session_data, session_id, api_client)
 
             # Check for transfer/send money keywords
             elif any(word in text_lower for word in ["send", "transfer", "pay", "give"]):
+                INTENT_SOURCE_TOTAL.inc(source="keyword_fallback")
+                use_intent("transfer")
                 # Try to extract recipient and amount from text
                 entities = {}
                 # Simple extraction - look for names and numbers
@@ -396,32 +803,32 @@ async def process_voice_text(request: VoiceRequest, db: Session = Depends(get_db
                 return await handle_transfer_intent(request, session_data, entities, session_id, api_client)
 
             # If no keywords match, return unknown
+            INTENT_SOURCE_TOTAL.inc(source="llm")
             response = VoiceResponse(
                 success=True,
                 session_id=session_id,
                 intent="unknown",
-                response_text="I didn't quite understand that. Could you please rephrase your request?",
+                response_text=NOT_UNDERSTOOD_TEXT,
                 action="clarify"
             )
 
-        # Step 4: Add audio to response if requested
+        # Step 4: Add audio to response if requested (and there's time left for it)
+        if request.include_audio and not has_budget(settings.TTS_MIN_BUDGET_SECONDS):
+            skip_stage("tts")
+        elif request.include_audio:
+            with STAGE_SECONDS.time(stage="tts", company_id=request.company_id, intent=response.intent):
+                response = await add_audio_to_response(
+                    response, True, audio_mode=request.audio_mode, audio_format=request.audio_format or "wav"
+                )
+
         session_data["last_response_text"] = response.response_text
+        session_data["last_audio_url"] = response.audio_url
         session_store.set(session_id, session_data)
 
-        print(f"[TTS DEBUG] request.include_audio = {request.include_audio}")
-        if request.include_audio:
-            import time
-            tts_start = time.time()
-            print(f"[TTS DEBUG] Generating TTS for: {response.response_text[:50]}...")
-            response = await add_audio_to_response(response, True)
-            tts_time = time.time() - tts_start
-            print(f"[TIMING] TTS audio generation took: {tts_time:.2f}s")
-            print(f"[TTS DEBUG] TTS generated, response_audio present: {response.response_audio is not None}")
-        else:
-            print(f"[TTS DEBUG] Skipping TTS - include_audio is False")
-
         return response
 
+    except DeadlineExceeded:
+        return deadline_response(request.session_id or f"session_{request.account_number}")
     except Exception as e:
         return VoiceResponse(
             success=False,
@@ -453,7 +860,7 @@ async def handle_transfer_intent(
             success=True,
             session_id=session_id,
             intent="transfer",
-            response_text="I can help you with that transfer. Who would you like to send money to and how much?",
+            response_text=TRANSFER_DETAILS_TEXT,
             action="clarify_transfer"
         )
 
@@ -505,8 +912,7 @@ async def handle_transfer_intent(
     matched_recipients = []
 
     for r in recipients:
-        name = r.get("recipient_name", r.get("name", ""))
-        if recipient_name.lower() in name.lower():
+        if recipient_name.lower() in (r["name"] or "").lower():
             matched_recipients.append(r)
 
     # No matches found
@@ -526,7 +932,7 @@ async def handle_transfer_intent(
         session_store.set(session_id, session_data)
 
         # Build list of names
-        names_list = ", ".join([r.get("recipient_name", r.get("name", "Unknown")) for r in matched_recipients])
+        names_list = ", ".join([r["name"] or "Unknown" for r in matched_recipients])
         return VoiceResponse(
             success=True,
             session_id=session_id,
@@ -641,7 +1047,7 @@ async def handle_confirm_intent(
         success=True,
         session_id=session_id,
         intent="confirm",
-        response_text="Please enter your 4-digit PIN to complete the transfer.",
+        response_text=PIN_PROMPT_TEXT,
         action="request_pin",
         data=pending_transfer
     )
@@ -692,6 +1098,16 @@ async def handle_pin_intent(
     session_data.pop("awaiting_pin", None)
     session_store.set(session_id, session_data)
 
+    # Audit record off the critical path (the bank emails its own customers)
+    notify_transfer_completed(
+        transaction_ref=confirm_result["transaction_ref"],
+        amount=pending_transfer["amount"],
+        recipient_name=pending_transfer["recipient_name"],
+        company_id=api_client.company_id,
+        session_id=session_id,
+        transfer_id=pending_transfer["transfer_id"]
+    )
+
     return VoiceResponse(
         success=True,
         session_id=session_id,
@@ -729,7 +1145,7 @@ async def handle_cancel_intent(
         success=True,
         session_id=session_id,
         intent="cancel",
-        response_text="Transfer cancelled. How else can I help you?",
+        response_text=TRANSFER_CANCELLED_TEXT,
         action="complete"
     )
 
@@ -832,14 +1248,14 @@ async def handle_view_recipients_intent(
 
         # Format recipient list for speech
         if len(recipients) == 1:
-            name = recipients[0].get("recipient_name", recipients[0].get("name", "Unknown"))
+            name = recipients[0]["name"] or "Unknown"
             response_text = f"You have one saved recipient: {name}."
         elif len(recipients) <= 5:
-            names = ", ".join([r.get("recipient_name", r.get("name", "Unknown")) for r in recipients[:-1]])
-            last_name = recipients[-1].get("recipient_name", recipients[-1].get("name", "Unknown"))
+            names = ", ".join([r["name"] or "Unknown" for r in recipients[:-1]])
+            last_name = recipients[-1]["name"] or "Unknown"
             response_text = f"You have {len(recipients)} saved recipients: {names}, and {last_name}."
         else:
-            names = ", ".join([r.get("recipient_name", r.get("name", "Unknown")) for r in recipients[:5]])
+            names = ", ".join([r["name"] or "Unknown" for r in recipients[:5]])
             response_text = f"You have {len(recipients)} saved recipients. The first few are: {names}, and {len(recipients) - 5} more."
 
         return VoiceResponse(
@@ -903,9 +1319,9 @@ async def handle_view_transactions_intent(
         # Format transaction summary for speech
         transaction_summaries = []
         for txn in recent:
-            txn_type = txn.get("transaction_type", "transaction")
-            amount = txn.get("amount", 0)
-            recipient = txn.get("recipient_name", "")
+            txn_type = txn["transaction_type"] or "transaction"
+            amount = txn["amount"] or 0
+            recipient = txn["recipient_name"]
 
             if txn_type == "transfer" and recipient:
                 transaction_summaries.append(f"Transfer of {amount} naira to {recipient}")
@@ -915,7 +1331,12 @@ async def handle_view_transactions_intent(
                 transaction_summaries.append(f"{txn_type} of {amount} naira")
 
         summary_text = ". ".join(transaction_summaries)
-        response_text = f"Your most recent transactions are: {summary_text}. You have {len(transactions)} total transactions."
+        if transactions_result.get("truncated"):
+            # The bank sent more than we asked for; we only read the first page
+            count_text = f"I've fetched your latest {len(transactions)}."
+        else:
+            count_text = f"You have {len(transactions)} total transactions."
+        response_text = f"Your most recent transactions are: {summary_text}. {count_text}"
 
         return VoiceResponse(
             success=True,
@@ -923,7 +1344,10 @@ async def handle_view_transactions_intent(
             intent="view_transactions",
             response_text=response_text,
             action="complete",
-            data={"transactions": transactions[:10]}  # Return top 10
+            data={
+                "transactions": transactions[:10],  # Return top 10
+                "truncated": transactions_result.get("truncated", False)
+            }
         )
 
     except Exception as e:
@@ -979,12 +1403,47 @@ async def text_to_speech(request: TTSRequest):
     return result
 
 
+@router.post("/tts/stream")
+async def stream_text_to_speech(request: TTSRequest):
+    """
+    Convert text to speech, streaming the audio as it is synthesized
+
+    The text is split at sentence/clause boundaries and rendered clause by
+    clause; the body is a WAV stream (mono 16-bit PCM, sizes left open) that
+    starts playing after the first clause instead of after the whole text.
+    Best for long answers such as recipient and transaction lists.
+
+    Example usage:
+        ```javascript
+        const response = await fetch('/api/v1/voice/tts/stream', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({text: longText})
+        });
+        const reader = response.body.getReader();  // or feed a MediaSource / AudioWorklet
+        ```
+    """
+    if not tts_service.available:
+        raise HTTPException(
+            status_code=503,
+            detail={"success": False, "error": "TTS not available on this server (pyttsx3 requires espeak-ng)"}
+        )
+
+    return StreamingResponse(
+        tts_service.stream_speech(request.text, speed=request.speed or 1.0),
+        media_type=MEDIA_TYPES["wav"],
+        headers={"Cache-Control": "no-store"}
+    )
+
+
 @router.get("/tts/audio/{session_id}")
-async def get_tts_audio(session_id: str):
+async def get_tts_audio(session_id: str, accept: Optional[str] = Header(None)):
     """
     Get TTS audio for last response in session
 
-    Returns MP3 audio file directly (not base64).
+    Returns the audio file directly (not base64). Served from the audio cache
+    when the turn already synthesized it; otherwise synthesized now in the
+    format negotiated from the Accept header (ogg/mp3/wav).
     Useful for direct playback in audio players.
     """
     session_data = session_store.get(session_id)
@@ -992,55 +1451,124 @@ async def get_tts_audio(session_id: str):
     if not session_data or "last_response_text" not in session_data:
         raise HTTPException(status_code=404, detail="No response audio found for session")
 
-    result = await tts_service.text_to_speech(
-        text=session_data["last_response_text"],
-        voice="nova",
-        speed=1.0,
-        return_format="base64"
-    )
+    cached_url = session_data.get("last_audio_url")
+    entry = audio_cache.get(cached_url.rsplit("/", 1)[-1]) if cached_url else None
 
-    if not result["success"]:
-        raise HTTPException(status_code=500, detail=result["error"])
+    if entry is None:
+        audio_format = negotiate_audio_format(accept, audio_format_preference()) or "wav"
+        result = await tts_service.text_to_speech(
+            text=session_data["last_response_text"],
+            voice="nova",
+            speed=1.0,
+            return_format="bytes"
+        )
+
+        if not result["success"]:
+            raise HTTPException(status_code=500, detail=result["error"])
+
+        audio = await asyncio.to_thread(transcode_wav, result["audio_bytes"], audio_format)
+        if audio is None:
+            audio, audio_format = result["audio_bytes"], "wav"
 
-    # Decode base64 to binary
-    audio_bytes = base64.b64decode(result["audio_base64"])
+        audio_id = audio_cache.put(audio, MEDIA_TYPES[audio_format], session_id=session_id)
+        # Write back only this key: a turn may have changed the session during
+        # synthesis, and set() would also reset a short confirmation expiry
+        latest = session_store.get(session_id)
+        if latest and latest.get("last_response_text") == session_data["last_response_text"]:
+            session_store.update(session_id, {"last_audio_url": f"/api/v1/voice/audio/{audio_id}"})
+        entry = audio_cache.get(audio_id)
 
+    extension = next(fmt for fmt, media in MEDIA_TYPES.items() if media == entry["media_type"])
     return Response(
-        content=audio_bytes,
-        media_type="audio/mpeg",
+        content=entry["audio"],
+        media_type=entry["media_type"],
         headers={
-            "Content-Disposition": f"inline; filename=response_{session_id}.mp3"
+            "Content-Disposition": f"inline; filename=response_{session_id}.{extension}"
         }
     )
 
 
-async def add_audio_to_response(response: VoiceResponse, include_audio: bool) -> VoiceResponse:
+@router.get("/audio/{audio_id}")
+async def get_response_audio(audio_id: str):
+    """
+    Fetch the audio of a voice response made with audio_mode="url"
+
+    Links expire after AUDIO_CACHE_TTL_SECONDS.
+    """
+    entry = audio_cache.get(audio_id)
+    if entry is None:
+        raise HTTPException(
+            status_code=404,
+            detail={"success": False, "error": "Audio not found or expired"}
+        )
+
+    return Response(
+        content=entry["audio"],
+        media_type=entry["media_type"],
+        headers={"Cache-Control": f"private, max-age={settings.AUDIO_CACHE_TTL_SECONDS}"}
+    )
+
+
+async def add_audio_to_response(
+    response: VoiceResponse,
+    include_audio: bool,
+    audio_mode: str = "inline",
+    audio_format: str = "wav"
+) -> VoiceResponse:
     """
     Helper function to add TTS audio to voice response
 
     Args:
         response: VoiceResponse object
         include_audio: Whether to generate and include audio
+        audio_mode: "inline" puts base64 audio in response_audio; "url" and
+            "stream" store the audio in the audio cache and set audio_url
+            (stream + wav is left to the endpoint, which streams it per clause)
+        audio_format: wav, ogg or mp3
 
     Returns:
-        VoiceResponse with audio_base64 field populated if include_audio=True
+        VoiceResponse with response_audio or audio_url populated if include_audio=True
     """
     if not include_audio or not response.response_text:
         return response
+    if audio_mode == "stream" and audio_format == "wav":
+        return response
 
     try:
+        if audio_mode == "inline" and audio_format == "wav":
+            tts_result = await tts_service.text_to_speech(
+                text=response.response_text,
+                voice="nova",
+                speed=1.0,
+                return_format="base64"
+            )
+            if tts_result["success"]:
+                response.response_audio = tts_result["audio_base64"]
+                response.audio_format = "wav"
+            return response
+
         tts_result = await tts_service.text_to_speech(
             text=response.response_text,
             voice="nova",
             speed=1.0,
-            return_format="base64"
+            return_format="bytes"
         )
+        if not tts_result["success"]:
+            return response
 
-        if tts_result["success"]:
-            response.response_audio = tts_result["audio_base64"]
+        audio = await asyncio.to_thread(transcode_wav, tts_result["audio_bytes"], audio_format)
+        if audio is None:
+            audio, audio_format = tts_result["audio_bytes"], "wav"
+
+        response.audio_format = audio_format
+        if audio_mode == "inline":
+            response.response_audio = base64.b64encode(audio).decode("ascii")
+        else:
+            audio_id = audio_cache.put(audio, MEDIA_TYPES[audio_format], session_id=response.session_id)
+            response.audio_url = f"/api/v1/voice/audio/{audio_id}"
 
     except Exception as e:
         # Don't fail the whole request if TTS fails
-        print(f"TTS generation failed: {e}")
+        logger.warning("TTS generation failed: %s", e)
 
     return response
@@ -0,0 +1,363 @@
+"""
+Voice WebSocket
+
+One connection carries a whole conversation. The company config, the bank API
+client (with a pooled HTTP connection to the bank) and the session are set up
+once, so a turn costs roughly STT + LLM + bank call + TTS and nothing else.
+
+Protocol (JSON text frames unless noted):
+
+    client -> server
+        {"type": "start", "account_number": "0123456789", "company_id": 1,
+         "session_id": "...", "token": "...", "include_audio": true}
+                                            first message; session_id/token optional
+        <binary>                            audio chunks of the current utterance
+        {"type": "audio_end", "filename": "utterance.webm"}
+                                            utterance complete -> run a turn
+        {"type": "text", "text": "check my balance"}
+                                            text turn
+        {"type": "barge_in"}                stop the response audio now
+        {"type": "partial", "text": "send five"}
+                                            interim transcript from an on-device recognizer;
+                                            the intent is parsed speculatively once it is stable
+
+    server -> client
+        {"type": "ready", "session_id": "..."}
+        {"type": "transcript", "text": "...", "confidence": 0.93}
+        {"type": "response", ...VoiceResponse fields}
+        {"type": "audio_start", "format": "wav"}, <binary WAV stream>, {"type": "audio_end"}
+        {"type": "audio_cancelled"}         barge-in stopped the audio
+        {"type": "error", "error": "..."}
+
+Barge-in: the first audio chunk of a new utterance (or a text turn, or an
+explicit barge_in) cancels response audio that is still being synthesized or
+sent. Turns themselves are never cancelled, since one may be half-way through
+a transfer; they run one after another.
+
+Overload: a turn shed by admission control (app/services/admission.py) gets a
+response with intent "busy" and action "retry", plus the pre-rendered busy
+message as audio.
+
+Partials: see app/services/speculation.py. A speculation that matches the
+final transcript (the audio's or a text turn's) saves the LLM call and, often,
+the bank read.
+"""
+import asyncio
+import json
+import logging
+import time
+from contextlib import aclosing
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from sqlalchemy.orm import Session
+from app.api.voice_orchestrator import (
+    VoiceRequest, VoiceResponse, deadline_response, no_speech_response, record_turn_metrics, run_voice_turn
+)
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.deadline import DeadlineExceeded, has_budget, skip_stage, start_deadline
+from app.core.metrics import INFLIGHT_TURNS, STAGE_SECONDS, VOICE_WS_CONNECTIONS
+from app.core.tracing import tracer
+from app.services.admission import BUSY_TEXT, TRANSFER, admission_controller, turn_priority
+from app.services.company_api_client import CompanyAPIClient
+from app.services.speculation import IntentSpeculator
+from app.services.tenant_scheduler import mark_urgent, use_company
+from app.services.tts import tts_service
+from app.services.whisper import whisper_service
+from app.utils.session import session_store
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/voice", tags=["Voice Orchestration"])
+
+# Whisper API upload limit
+MAX_UTTERANCE_BYTES = 25 * 1024 * 1024
+
+# WebSocket close code for a bad start message
+POLICY_VIOLATION = 1008
+
+
+class VoiceConversation:
+    """State of one WebSocket conversation"""
+
+    def __init__(self, websocket: WebSocket, db: Session, api_client: CompanyAPIClient, start: Dict[str, Any]):
+        self.websocket = websocket
+        self.db = db
+        self.api_client = api_client
+        self.account_number = str(start["account_number"])
+        self.company_id = api_client.company_id
+        self.session_id = start.get("session_id") or f"session_{self.account_number}"
+        self.token = start.get("token")
+        self.include_audio = bool(start.get("include_audio", True))
+        self.speculator = IntentSpeculator(
+            api_client,
+            self.account_number,
+            self.token or "demo_token",  # What the intent handlers send when there's no token
+            stable_ms=settings.SPECULATION_STABLE_MS,
+            min_words=settings.SPECULATION_MIN_WORDS
+        )
+
+        self.utterance = bytearray()
+        self.utterance_too_long = False
+        self.turn_task: Optional[asyncio.Task] = None
+        self.speech_task: Optional[asyncio.Task] = None
+
+    async def run(self):
+        """Receive loop; returns when the client disconnects"""
+        # Inherited by the turn, speech and speculation tasks started from here
+        use_company(self.company_id)
+        await self.send({"type": "ready", "session_id": self.session_id})
+        try:
+            while True:
+                message = await self.websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                if message.get("bytes") is not None:
+                    await self.on_audio(message["bytes"])
+                elif message.get("text") is not None:
+                    await self.on_text_frame(message["text"])
+        finally:
+            await self.barge_in()
+            if self.turn_task is not None:
+                # Let a turn in progress finish (it may be confirming a transfer)
+                await asyncio.wait([self.turn_task])
+            self.speculator.close()
+
+    async def on_audio(self, chunk: bytes):
+        if not self.utterance and not self.utterance_too_long:
+            # The user started speaking
+            await self.barge_in()
+
+        if len(self.utterance) + len(chunk) > MAX_UTTERANCE_BYTES:
+            self.utterance = bytearray()
+            self.utterance_too_long = True
+        if not self.utterance_too_long:
+            self.utterance.extend(chunk)
+
+    async def on_text_frame(self, frame: str):
+        try:
+            message = json.loads(frame)
+            message_type = message.get("type")
+        except (ValueError, AttributeError):
+            await self.send({"type": "error", "error": "Messages must be JSON objects"})
+            return
+
+        if message_type == "audio_end":
+            audio = bytes(self.utterance)
+            too_long = self.utterance_too_long
+            self.utterance = bytearray()
+            self.utterance_too_long = False
+
+            if too_long:
+                await self.send({"type": "error", "error": f"Utterance exceeds {MAX_UTTERANCE_BYTES} bytes"})
+            elif not audio:
+                await self.send({"type": "error", "error": "No audio received before audio_end"})
+            else:
+                self.queue_turn(audio=audio, filename=message.get("filename") or "utterance.wav")
+
+        elif message_type == "text":
+            text = str(message.get("text") or "").strip()
+            if not text:
+                await self.send({"type": "error", "error": "text is required"})
+                return
+            await self.barge_in()
+            self.queue_turn(text=text)
+
+        elif message_type == "barge_in":
+            await self.barge_in()
+
+        elif message_type == "partial":
+            # Only while no turn is running: its session changes would make the guess stale
+            idle = self.turn_task is None or self.turn_task.done()
+            if settings.SPECULATION_ENABLED and idle and message.get("text"):
+                self.speculator.observe(str(message["text"]), session_store.get(self.session_id) or {})
+
+        else:
+            await self.send({"type": "error", "error": f"Unknown message type: {message_type}"})
+
+    def queue_turn(self, text: Optional[str] = None, audio: Optional[bytes] = None, filename: str = "utterance.wav"):
+        """Run a turn after the ones already queued"""
+        self.turn_task = asyncio.create_task(self.turn(self.turn_task, text, audio, filename))
+
+    async def turn(self, previous: Optional[asyncio.Task], text: Optional[str], audio: Optional[bytes], filename: str):
+        if previous is not None:
+            await asyncio.wait([previous])
+
+        priority = turn_priority(session_store.get(self.session_id))
+        admission = admission_controller.admit(priority)
+        if admission is None:
+            await self.speculator.resolve("")
+            await self.send_busy()
+            return
+        mark_urgent(priority == TRANSFER)
+
+        turn_start = time.perf_counter()
+        start_deadline(settings.TURN_DEADLINE_SECONDS)
+        input_type = "ws_audio" if audio is not None else "ws_text"
+        response: Optional[VoiceResponse] = None
+
+        with tracer.start_span("WS turn", root=True, session_id=self.session_id, company_id=self.company_id), \
+                INFLIGHT_TURNS.track_inprogress(), admission:
+            try:
+                if audio is not None:
+                    with STAGE_SECONDS.time(stage="stt", company_id=self.company_id, intent="none"):
+                        transcription = await whisper_service.transcribe_bytes(audio, filename)
+
+                    if transcription.get("no_speech"):
+                        await self.speculator.resolve("")
+                        response = no_speech_response(self.session_id)
+                    else:
+                        text = transcription["transcript"]
+                        await self.send({
+                            "type": "transcript",
+                            "text": text,
+                            "confidence": transcription.get("confidence")
+                        })
+
+                if response is None:
+                    intent_result = await self.speculator.resolve(text)
+                    response = await run_voice_turn(
+                        VoiceRequest(
+                            text=text,
+                            account_number=self.account_number,
+                            company_id=self.company_id,
+                            session_id=self.session_id,
+                            token=self.token,
+                            include_audio=False  # Streamed below, clause by clause
+                        ),
+                        self.db,
+                        api_client=self.api_client,
+                        intent_result=intent_result
+                    )
+                    self.api_client.discard_prefetched()
+
+            except DeadlineExceeded:
+                response = deadline_response(self.session_id)
+            except Exception as e:
+                response = VoiceResponse(
+                    success=False,
+                    session_id=self.session_id,
+                    intent="error",
+                    response_text="Sorry, I couldn't understand that. Please try again.",
+                    error=str(e)
+                )
+
+            record_turn_metrics(input_type, self.company_id, response, turn_start)
+            admission.defer()  # Held until the response audio has been streamed
+
+        speaking = False
+        try:
+            await self.send({
+                "type": "response",
+                **response.model_dump(exclude={"response_audio", "audio_url", "audio_format"})
+            })
+
+            if self.include_audio and response.response_text and tts_service.available:
+                if not has_budget(settings.TTS_MIN_BUDGET_SECONDS):
+                    skip_stage("tts")
+                    return
+                await self.barge_in()
+                self.speech_task = asyncio.create_task(self.speak(response.response_text))
+                # Done, failed or cancelled by barge-in
+                self.speech_task.add_done_callback(lambda _: admission.release())
+                speaking = True
+        finally:
+            if not speaking:
+                admission.release()
+
+    async def speak(self, text: str):
+        """Stream response audio; cancelled by barge-in"""
+        try:
+            await self.send({"type": "audio_start", "format": "wav"})
+            async with aclosing(tts_service.stream_speech(text)) as chunks:
+                async for chunk in chunks:
+                    await self.websocket.send_bytes(chunk)
+            await self.send({"type": "audio_end"})
+        except Exception as e:
+            logger.warning("Streaming response audio failed: %s", e, extra={"session_id": self.session_id})
+
+    async def send_busy(self):
+        """Answer a shed turn, with the pre-rendered busy audio"""
+        await self.send({
+            "type": "response",
+            **VoiceResponse(
+                success=False,
+                session_id=self.session_id,
+                intent="busy",
+                response_text=BUSY_TEXT,
+                action="retry",
+                error="Server busy"
+            ).model_dump(exclude={"response_audio", "audio_url", "audio_format"})
+        })
+
+        audio = admission_controller.busy_audio
+        if self.include_audio and audio is not None:
+            await self.barge_in()
+            await self.send({"type": "audio_start", "format": "wav"})
+            try:
+                await self.websocket.send_bytes(audio)
+            except Exception as e:
+                logger.debug("WebSocket send failed: %s", e, extra={"session_id": self.session_id})
+            await self.send({"type": "audio_end"})
+
+    async def barge_in(self):
+        """Stop response audio that is still being synthesized or sent"""
+        task, self.speech_task = self.speech_task, None
+        if task is not None and task.cancel():
+            await self.send({"type": "audio_cancelled"})
+
+    async def send(self, message: Dict[str, Any]):
+        try:
+            await self.websocket.send_json(message)
+        except Exception as e:
+            # Client is gone; the receive loop will see the disconnect
+            logger.debug("WebSocket send failed: %s", e, extra={"session_id": self.session_id})
+
+
+@router.websocket("/ws")
+async def voice_websocket(websocket: WebSocket, db: Session = Depends(get_db)):
+    """
+    Full-duplex voice conversation (see the module docstring for the protocol)
+
+    Integration Example:
+        ```
+        const ws = new WebSocket('wss://api.echobank.ai/api/v1/voice/ws');
+        ws.binaryType = 'arraybuffer';
+        ws.onopen = () => ws.send(JSON.stringify({
+            type: 'start', account_number: '0123456789', company_id: 1, token: userAuthToken
+        }));
+
+        recorder.ondataavailable = (e) => ws.send(e.data);        // audio chunks
+        recorder.onstop = () => ws.send(JSON.stringify({type: 'audio_end', filename: 'utterance.webm'}));
+
+        ws.onmessage = (e) => typeof e.data === 'string'
+            ? handleEvent(JSON.parse(e.data))                      // transcript, response, audio_start...
+            : playPcmChunk(e.data);                                 // WAV stream
+        ```
+    """
+    await websocket.accept()
+
+    try:
+        start = await websocket.receive_json()
+    except (WebSocketDisconnect, ValueError):
+        return
+
+    if not isinstance(start, dict) or start.get("type") != "start" \
+            or not start.get("account_number") or start.get("company_id") is None:
+        await websocket.send_json({
+            "type": "error",
+            "error": "First message must be {\"type\": \"start\", \"account_number\": ..., \"company_id\": ...}"
+        })
+        await websocket.close(code=POLICY_VIOLATION)
+        return
+
+    # Bank calls go through the shared connection pool, which keeps connections warm
+    try:
+        api_client = CompanyAPIClient(company_id=int(start["company_id"]), db=db)
+    except (ValueError, TypeError) as e:
+        await websocket.send_json({"type": "error", "error": str(e)})
+        await websocket.close(code=POLICY_VIOLATION)
+        return
+
+    with VOICE_WS_CONNECTIONS.track_inprogress():
+        await VoiceConversation(websocket, db, api_client, start).run()
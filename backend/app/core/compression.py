@@ -0,0 +1,151 @@
+"""
+Response compression
+
+Voice responses carry recipient lists, transactions and often base64 audio;
+on mobile networks the bytes matter more than the CPU. CompressionMiddleware
+compresses response bodies with the best encoding the client accepts:
+
+    br      when the `brotli` package is installed (smaller than gzip)
+    gzip    otherwise
+
+Skipped for:
+    bodies under COMPRESSION_MIN_BYTES (not worth the CPU or the latency)
+    audio and other already-compressed media types (audio/*, images...)
+    streamed bodies, i.e. no Content-Length (TTS audio streams) - compressing
+    would hold back chunks the client should play right away
+    responses that already have a Content-Encoding
+
+Large bodies are compressed on a worker thread so the event loop isn't held.
+"""
+import gzip
+import logging
+from typing import Optional
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.metrics import RESPONSE_BYTES_TOTAL
+
+logger = logging.getLogger(__name__)
+
+# Try to import brotli, but don't fail if it's not available
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Content types worth compressing (JSON, text, XML, JavaScript)
+_COMPRESSIBLE_PREFIXES = ("application/json", "text/", "application/xml", "application/javascript")
+
+# Bodies larger than this are compressed off the event loop
+_THREAD_THRESHOLD = 64 * 1024
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Best encoding we support from an Accept-Encoding header, or None
+
+    Honors q-values ("gzip;q=0" refuses gzip); prefers br over gzip on a tie.
+    """
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name.strip()] = quality
+
+    wildcard = weights.get("*", 0.0)
+    candidates = (["br"] if BROTLI_AVAILABLE else []) + ["gzip"]
+    best, best_weight = None, 0.0
+    for encoding in candidates:
+        weight = weights.get(encoding, wildcard)
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+class CompressionMiddleware:
+    """Negotiated br/gzip compression of compressible bodies of known length"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        chunks = []
+        passthrough = True
+
+        async def send_compressed(message: Message):
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                passthrough = not self._compressible(message)
+                if passthrough:
+                    await send(message)
+                else:
+                    start = message  # Held until the whole body is in
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            # A body may come in several chunks; collect them
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            compressed = await self._compress(body, encoding)
+            headers = MutableHeaders(raw=start["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if len(compressed) < len(body):
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(compressed))
+                RESPONSE_BYTES_TOTAL.inc(len(body), encoding=encoding, stage="original")
+                RESPONSE_BYTES_TOTAL.inc(len(compressed), encoding=encoding, stage="sent")
+                body = compressed
+            await send(start)
+            await send({"type": "http.response.body", "body": body, "more_body": False})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _compressible(self, start: Message) -> bool:
+        """
+        Only bodies of known length: a response without Content-Length is a
+        stream (TTS audio) whose chunks must go out as they are produced
+        """
+        headers = Headers(raw=start["headers"])
+        if "content-encoding" in headers:
+            return False
+        try:
+            length = int(headers.get("content-length", ""))
+        except ValueError:
+            return False
+        if length < self.minimum_size:
+            return False
+        content_type = headers.get("content-type", "").lower()
+        return content_type.startswith(_COMPRESSIBLE_PREFIXES)
+
+    async def _compress(self, body: bytes, encoding: str) -> bytes:
+        if len(body) > _THREAD_THRESHOLD:
+            return await anyio.to_thread.run_sync(self._encode, body, encoding)
+        return self._encode(body, encoding)
+
+    def _encode(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
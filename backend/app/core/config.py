@@ -52,6 +52,8 @@ class Settings(BaseSettings):
     # Email Configuration
     EMAIL_SENDER: str
     EMAIL_PASSWORD: str
+    SMTP_HOST: str = "smtp.gmail.com"
+    SMTP_PORT: int = 587  # STARTTLS
 
     # Paystack Configuration (Optional)
     PAYSTACK_SECRET_KEY: str | None = None
@@ -68,5 +70,123 @@ class Settings(BaseSettings):
     BEDROCK_ACCESS_KEY_1: str | None = None
     BEDROCK_SECRET_KEY_1: str | None = None
 
+    # Speech-to-text engine
+    STT_BACKEND: str = "remote"  # "remote" (OpenAI Whisper API) or "local" (faster-whisper on CPU)
+    STT_FALLBACK_TO_REMOTE: bool = True  # Use the remote API if the local engine fails
+    STT_LOCAL_MODEL: str = "base.en"  # faster-whisper model name or path
+    STT_LOCAL_MODEL_DIR: str = ""  # Download/cache directory for local models
+    STT_LOCAL_COMPUTE_TYPE: str = "int8"  # Quantisation: int8, int8_float32, float32
+    STT_LOCAL_CPU_THREADS: int = 4
+    STT_BATCH_MAX_SIZE: int = 8  # Concurrent utterances decoded in one inference
+    STT_BATCH_WINDOW_MS: int = 20  # How long to wait for a batch to fill
+
+    # Audio preprocessing before STT (silence trimming, mono, 16 kHz)
+    AUDIO_PREPROCESS_ENABLED: bool = True
+    AUDIO_PREPROCESS_MAX_BYTES: int = 20 * 1024 * 1024  # Bigger uploads go to STT untouched
+    AUDIO_TARGET_SAMPLE_RATE: int = 16000
+    AUDIO_ENCODE_OPUS: bool = False  # Needs soundfile with libsndfile >= 1.0.29
+    VAD_ENERGY_MARGIN_DB: float = 15.0  # Speech must be this much louder than the noise floor
+    VAD_ENERGY_FLOOR_DB: float = -50.0  # Anything quieter is silence (dBFS)
+    VAD_MIN_SPEECH_MS: int = 150  # Less voiced audio than this -> rejected without STT
+    VAD_PADDING_MS: int = 200  # Kept around the detected speech
+
+    # Response audio
+    TTS_AUDIO_FORMATS: str = "ogg,mp3,wav"  # Preference for url/stream modes; ogg/mp3 need soundfile
+    AUDIO_CACHE_TTL_SECONDS: int = 120  # How long audio_url links stay valid
+    AUDIO_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    TTS_STREAM_MIN_CLAUSE_CHARS: int = 30  # Shorter clauses are merged before synthesis when streaming
+    TTS_STREAM_PREFETCH: int = 2  # Clauses rendered ahead of the client when streaming
+
+    # Speculative intent parsing on partial transcripts (voice WebSocket)
+    SPECULATION_ENABLED: bool = True
+    SPECULATION_STABLE_MS: int = 250  # A partial must be unchanged this long before we act on it
+    SPECULATION_MIN_WORDS: int = 2
+
+    # Audio buffers
+    AUDIO_SPOOL_THRESHOLD_BYTES: int = 1024 * 1024  # Larger uploads are streamed from their spool file
+    AUDIO_SCRATCH_DIR: str = ""  # Scratch dir for TTS rendering; default /dev/shm (tmpfs) when available
+
+    # Model capacity shared fairly between companies (weights, caps and rate
+    # limits per company are on the Company record)
+    STT_MAX_CONCURRENCY: int = 8  # Transcriptions in progress at once
+    LLM_MAX_CONCURRENCY: int = 16  # Intent-parsing calls in progress at once
+    TTS_MAX_CONCURRENCY: int = 1  # Matches the single TTS worker thread
+    TENANT_POLICY_CACHE_SECONDS: int = 30  # How long Company scheduling settings are cached
+
+    # Per-turn deadline: STT, LLM and bank reads share this budget; TTS is
+    # skipped when less than TTS_MIN_BUDGET_SECONDS is left
+    TURN_DEADLINE_SECONDS: float = 10.0
+    TTS_MIN_BUDGET_SECONDS: float = 1.0
+
+    # Admission control: shed new conversations under overload, keep finishing transfers
+    ADMISSION_MAX_INFLIGHT_TURNS: int = 64  # Turns in progress at once
+    ADMISSION_TRANSFER_RESERVE: int = 16  # Extra room only for turns that finish a transfer
+    ADMISSION_MAX_QUEUE_DELAY_MS: int = 2000  # Shed new turns once a model call has been queued this long
+    ADMISSION_RETRY_AFTER_SECONDS: int = 2
+
+    # Background jobs (receipts, audit records); persisted in their own SQLite file
+    JOB_QUEUE_PATH: str = "./jobs.db"
+    JOB_WORKERS: int = 4  # Jobs run concurrently
+    JOB_MAX_ATTEMPTS: int = 5  # Then dead-lettered
+    JOB_RETRY_BACKOFF_SECONDS: float = 2.0  # Doubles after each failed attempt
+    JOB_TIMEOUT_SECONDS: float = 60.0
+
+    # Bank endpoint health probing
+    # Off by default: a bank must whitelist the probe account first (INTEGRATION_GUIDE.md)
+    HEALTH_PROBE_ENABLED: bool = False
+    HEALTH_PROBE_INTERVAL_SECONDS: int = 60
+    HEALTH_PROBE_ACCOUNT: str = "0000000000"  # Synthetic account banks can whitelist
+    HEALTH_PROBE_TOKEN: str = "echobank_health_probe"
+    HEALTH_WINDOW_SECONDS: int = 300  # Rolling window for latency stats
+    ADAPTIVE_TIMEOUT_MULTIPLIER: float = 3.0  # Timeout = p99 x multiplier
+    ADAPTIVE_TIMEOUT_FLOOR_SECONDS: float = 2.0
+
+    # Event loop health
+    LOOP_MONITOR_INTERVAL_MS: int = 100  # How often loop lag is sampled
+    LOOP_BLOCK_THRESHOLD_MS: int = 100  # Longer stalls count as blocking
+    LOOP_WATCHDOG_ENABLED: bool = False  # Debugging: capture the stack of blocking calls (/debug/loop)
+
+    # Startup warm-up, run in the background once the port is bound: builds Whisper/
+    # LLM/TTS, loads company settings, connects to each bank, pre-renders fixed
+    # replies and primes the intent cache. /health/ready answers 503 until it's done.
+    # Off = ready at once; each service is built by the first request using it
+    WARMUP_ON_STARTUP: bool = True
+    WARMUP_TIMEOUT_SECONDS: float = 60.0  # Report ready after this even if warm-up isn't finished
+    WARMUP_BANK_CONNECTIONS: int = 2  # Pooled connections opened per bank base_url
+    WARMUP_INTENT_SEEDS: str = "what is my balance,check my balance,show my recipients,show my transaction history,hello,help"  # Comma-separated; empty = no LLM calls at startup
+
+    # Bank HTTP connection pool (shared by all bank calls)
+    BANK_HTTP_MAX_CONNECTIONS: int = 100
+    BANK_HTTP_KEEPALIVE_SECONDS: float = 30.0
+
+    # Intent cache: context-free utterances ("what is my balance") skip the LLM
+    LLM_INTENT_CACHE_SIZE: int = 1000  # 0 disables
+    LLM_INTENT_CACHE_TTL_SECONDS: int = 3600
+
+    # Response compression (br when the brotli package is installed, else gzip),
+    # negotiated with Accept-Encoding. Streamed bodies and audio are sent as is
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_BYTES: int = 1024  # Smaller bodies aren't worth compressing
+    COMPRESSION_GZIP_LEVEL: int = 5
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Admin endpoints (/admin); disabled while the token is empty
+    ADMIN_API_TOKEN: str = ""  # Sent as X-Admin-Token
+    PROFILER_INTERVAL_MS: int = 10  # Sampling profiler: time between stack samples
+    PROFILER_MAX_SECONDS: int = 120  # Longest a profile may run
+
+    # Logging (JSON lines to stdout, written from a background thread)
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: str = ""  # Per-module overrides, e.g. "app.services.llm=DEBUG,app.api=WARNING"
+    LOG_DEBUG_SAMPLE_RATE: float = 1.0  # Fraction of DEBUG records kept
+
+    # Tracing (per-request span trees; exporters: ring, file, otlp)
+    TRACING_ENABLED: bool = True
+    TRACE_EXPORTERS: str = "ring"  # Comma-separated, e.g. "ring,otlp"
+    TRACE_RING_SIZE: int = 500  # Recent traces kept in memory for /debug/traces
+    TRACE_SLOW_TURN_MS: int = 2000  # /debug/traces shows turns slower than this by default
+    TRACE_FILE_PATH: str = "./traces/traces.jsonl"
+    TRACE_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+
 
 settings = Settings()
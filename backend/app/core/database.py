@@ -1,8 +1,11 @@
-from sqlalchemy import create_engine
+import logging
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker, Session
 from app.core.config import settings
 from app.models.base import Base
 
+logger = logging.getLogger(__name__)
+
 # Create database engine
 # SQLite-specific settings: connect_args for threading, pool_pre_ping for connection health
 if settings.DATABASE_URL.startswith("sqlite"):
@@ -46,7 +49,31 @@ def init_db():
     Call this on application startup.
     """
     Base.metadata.create_all(bind=engine)
-    print("Database tables created successfully!")
+    _add_missing_columns()
+    logger.info("Database tables created successfully!")
+
+
+def _add_missing_columns():
+    """
+    Add columns that were added to a model after its table was created
+
+    create_all() only creates missing tables. New columns must be nullable or
+    have a scalar default for this to work.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+                if column.default is not None and column.default.is_scalar:
+                    ddl += f" DEFAULT {column.default.arg!r}"
+                conn.execute(text(ddl))
+                logger.info("Added column %s.%s", table.name, column.name)
 
 
 def reset_db():
@@ -56,4 +83,4 @@ def reset_db():
     """
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
-    print("Database reset complete!")
+    logger.info("Database reset complete!")
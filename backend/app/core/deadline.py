@@ -0,0 +1,119 @@
+"""
+Per-turn deadlines
+
+A voice turn gets a time budget (TURN_DEADLINE_SECONDS) when it starts. The
+deadline lives in a context variable, like the current trace span, so every
+stage can see how much is left without it being passed around:
+
+    start_deadline(settings.TURN_DEADLINE_SECONDS)
+    ...
+    transcript = await within_deadline(backend.transcribe(audio), "stt")
+    response = client.get(url, timeout=remaining_time(30.0))
+    if has_budget(settings.TTS_MIN_BUDGET_SECONDS): ...
+
+Required stages (STT, LLM, bank reads) use the remaining budget as their
+timeout and raise DeadlineExceeded when it runs out. Optional ones (TTS) are
+skipped when too little is left. Outside a turn there is no deadline and
+callers' own timeouts apply.
+"""
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Awaitable, Optional, TypeVar
+from app.core.metrics import DEADLINE_EXCEEDED_TOTAL
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """The turn's time budget ran out during a stage"""
+
+    def __init__(self, stage: str):
+        super().__init__(f"Turn deadline exceeded during {stage}")
+        self.stage = stage
+
+
+class Deadline:
+    """Absolute point in time a turn must be answered by"""
+
+    def __init__(self, seconds: float):
+        self.budget = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() == 0.0
+
+    def extend_to(self, other: Optional["Deadline"]):
+        """Push the expiry out to other's if that is later (None: no deadline at all)"""
+        self.expires_at = max(self.expires_at, other.expires_at if other is not None else float("inf"))
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("echobank_deadline", default=None)
+
+
+def start_deadline(seconds: float) -> Deadline:
+    """Give the current turn (this task and the tasks it starts) a time budget"""
+    deadline = Deadline(seconds)
+    _current_deadline.set(deadline)
+    return deadline
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+def remaining_time(default: float) -> float:
+    """Timeout for a call: `default`, cut down to what is left of the turn's budget"""
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return default
+    return min(default, deadline.remaining())
+
+
+def has_budget(seconds: float) -> bool:
+    """Whether at least `seconds` are left (always True outside a turn)"""
+    deadline = _current_deadline.get()
+    return deadline is None or deadline.remaining() >= seconds
+
+
+def check_deadline(stage: str):
+    """Raise DeadlineExceeded if the budget is already spent"""
+    deadline = _current_deadline.get()
+    if deadline is not None and deadline.expired:
+        DEADLINE_EXCEEDED_TOTAL.inc(stage=stage, action="aborted")
+        raise DeadlineExceeded(stage)
+
+
+def skip_stage(stage: str):
+    """Count an optional stage skipped for lack of budget"""
+    DEADLINE_EXCEEDED_TOTAL.inc(stage=stage, action="skipped")
+
+
+async def within_deadline(awaitable: Awaitable[T], stage: str) -> T:
+    """
+    Await with the remaining budget as the timeout
+
+    Raises:
+        DeadlineExceeded: The budget ran out first (the awaitable is cancelled)
+    """
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return await awaitable
+
+    if deadline.expired:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()  # Never started
+        check_deadline(stage)
+    try:
+        return await asyncio.wait_for(awaitable, timeout=deadline.remaining())
+    except DeadlineExceeded:
+        raise  # A nested stage already ran out
+    except asyncio.TimeoutError:
+        if not deadline.expired:
+            raise  # The stage's own timeout, not ours
+        DEADLINE_EXCEEDED_TOTAL.inc(stage=stage, action="aborted")
+        raise DeadlineExceeded(stage)
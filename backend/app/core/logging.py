@@ -0,0 +1,140 @@
+"""
+Structured, non-blocking logging
+
+Log calls on the request path only put the record on an in-memory queue. A
+background thread (logging.handlers.QueueListener) formats each record as one
+JSON line and writes it to stdout, so a slow terminal or log shipper never
+stalls the event loop.
+
+Levels come from settings:
+    LOG_LEVEL=INFO
+    LOG_LEVELS=app.services.company_api_client=DEBUG,app.services.llm=WARNING
+
+DEBUG records usually carry big payloads (raw LLM output, bank responses), so
+only a fraction (LOG_DEBUG_SAMPLE_RATE) of them are kept.
+
+Usage:
+    import logging
+    logger = logging.getLogger(__name__)
+
+    logger.info("Bank call finished", extra={"endpoint": "get_balance", "status": 200})
+    logger.debug("Raw LLM response: %s", text)  # formatted only if kept
+"""
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from app.core.config import settings
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg plus any `extra` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text  # Rendered when the record was queued
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Keep every INFO+ record but only a sample of DEBUG ones"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+_exception_formatter = logging.Formatter()
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves the JSON encoding to the listener thread
+
+    The message and traceback are rendered here, like the stock handler does:
+    the listener runs later, when the args may have changed or the traceback's
+    frames are gone. Unlike the stock handler we don't format the whole line,
+    so the `extra` fields still reach JSONFormatter as separate keys.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def parse_module_levels(spec: str) -> Dict[str, str]:
+    """Parse 'app.services.llm=DEBUG,app.api=WARNING' into a dict"""
+    levels = {}
+    for part in spec.split(","):
+        if "=" in part:
+            name, level = part.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging():
+    """Route all logging through the background JSON writer (idempotent)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JSONFormatter())
+
+    queue_handler = _DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(DebugSamplingFilter(settings.LOG_DEBUG_SAMPLE_RATE))
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    # httpx logs every request URL at INFO; that's per bank call, so keep it quiet
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    for name, level in parse_module_levels(settings.LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=False)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,196 @@
+"""
+Event loop health
+
+A small task on the loop sleeps LOOP_MONITOR_INTERVAL_MS at a time and
+records how late it wakes up (echobank_event_loop_lag_seconds). Lag is time
+every request on the process spends waiting for the loop; it comes from
+blocking calls in `async def` code (sync SQLAlchemy, bcrypt, pyttsx3, a sync
+SDK call) or from CPU-heavy work.
+
+With LOOP_WATCHDOG_ENABLED (debugging only), a watchdog thread also notices
+when the loop has been stuck for LOOP_BLOCK_THRESHOLD_MS. It then captures the
+loop thread's stack, which points at the blocking call. Reports are grouped
+by the endpoint that was running and served on /debug/loop.
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.metrics import LOOP_BLOCKED_TOTAL, LOOP_LAG_SECONDS
+
+logger = logging.getLogger(__name__)
+
+_API_DIR = os.path.join("app", "api") + os.sep
+_APP_DIR = os.sep + "app" + os.sep
+_MAX_STACK_FRAMES = 25
+
+
+class LoopMonitor:
+    """Measures event loop lag; optionally captures stacks of blocking calls"""
+
+    def __init__(
+        self,
+        interval_seconds: float = 0.1,
+        block_threshold_seconds: float = 0.1,
+        watchdog: bool = False,
+        max_reports: int = 100
+    ):
+        self.interval_seconds = interval_seconds
+        self.block_threshold_seconds = block_threshold_seconds
+        self.watchdog = watchdog
+
+        self.reports: Deque[Dict[str, Any]] = deque(maxlen=max_reports)
+        self.by_endpoint: Dict[str, Dict[str, Any]] = {}
+        self.max_lag_seconds = 0.0
+
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._captured: Optional[Tuple[str, List[str]]] = None  # Stall in progress
+        self._routes: Dict[Tuple[str, str], str] = {}
+
+    def register_routes(self, routes):
+        """Name stalls by route ("POST /api/v1/voice/process-text") instead of handler function"""
+        for route in routes:
+            endpoint = getattr(route, "endpoint", None)
+            if endpoint is None:
+                continue
+            methods = ",".join(sorted(getattr(route, "methods", None) or ["WS"]))
+            self._routes[(endpoint.__module__, endpoint.__name__)] = f"{methods} {route.path}"
+
+    def start(self):
+        """Start measuring (call from the app's startup hook)"""
+        if self._task is not None and not self._task.done():
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._task = asyncio.create_task(self._probe())
+
+        if self.watchdog:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._thread.start()
+
+    async def stop(self):
+        self._stopping.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Blocking reports for /debug/loop, worst endpoints first"""
+        with self._lock:
+            endpoints = sorted(self.by_endpoint.values(), key=lambda e: e["total_blocked_ms"], reverse=True)
+            return {
+                "watchdog": self.watchdog,
+                "block_threshold_ms": self.block_threshold_seconds * 1000,
+                "max_lag_ms": round(self.max_lag_seconds * 1000, 1),
+                "endpoints": [dict(e) for e in endpoints],
+                "recent": list(self.reports)[::-1],
+            }
+
+    async def _probe(self):
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval_seconds)
+            now = time.monotonic()
+            lag = max(0.0, now - started - self.interval_seconds)
+            self._heartbeat = now
+
+            LOOP_LAG_SECONDS.observe(lag)
+            self.max_lag_seconds = max(self.max_lag_seconds, lag)
+
+            with self._lock:
+                captured, self._captured = self._captured, None
+            if captured is not None:
+                self._record(captured, lag)
+            elif lag >= self.block_threshold_seconds:
+                LOOP_BLOCKED_TOTAL.inc(endpoint="unknown")
+
+    def _watch(self):
+        """Watchdog thread: grab the loop thread's stack while it is stuck"""
+        check_every = max(self.block_threshold_seconds / 4, 0.005)
+        while not self._stopping.wait(check_every):
+            stalled_for = time.monotonic() - self._heartbeat - self.interval_seconds
+            if stalled_for < self.block_threshold_seconds:
+                continue
+            with self._lock:
+                if self._captured is not None:
+                    continue  # Already have this stall
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            captured = self._describe(frame)
+            with self._lock:
+                self._captured = captured
+
+    def _describe(self, frame) -> Tuple[str, List[str]]:
+        """(endpoint, formatted stack) for a frame of the loop thread"""
+        summary = traceback.extract_stack(frame)
+        endpoint = None
+        # walk_stack goes innermost first, so this ends on the outermost API handler
+        for f, _ in traceback.walk_stack(frame):
+            if _API_DIR in f.f_code.co_filename:
+                module = f.f_globals.get("__name__", "")
+                endpoint = self._routes.get((module, f.f_code.co_name), f"{module}.{f.f_code.co_name}")
+        if endpoint is None:
+            app_frames = [f for f, _ in traceback.walk_stack(frame) if _APP_DIR in f.f_code.co_filename]
+            if app_frames:
+                outer = app_frames[-1]
+                endpoint = f"{outer.f_globals.get('__name__', '')}.{outer.f_code.co_name}"
+        stack = [
+            f"{entry.filename}:{entry.lineno} in {entry.name}" + (f": {entry.line}" if entry.line else "")
+            for entry in summary[-_MAX_STACK_FRAMES:]
+        ]
+        return endpoint or "unknown", stack
+
+    def _record(self, captured: Tuple[str, List[str]], blocked_seconds: float):
+        endpoint, stack = captured
+        blocked_ms = round(blocked_seconds * 1000, 1)
+        LOOP_BLOCKED_TOTAL.inc(endpoint=endpoint)
+        logger.warning(
+            "Event loop blocked for %.0fms in %s", blocked_ms, endpoint,
+            extra={"endpoint": endpoint, "blocked_ms": blocked_ms, "stack_top": stack[-1] if stack else None}
+        )
+
+        with self._lock:
+            self.reports.append({
+                "endpoint": endpoint,
+                "blocked_ms": blocked_ms,
+                "at": time.time(),
+                "stack": stack,
+            })
+            stats = self.by_endpoint.get(endpoint)
+            if stats is None:
+                stats = self.by_endpoint[endpoint] = {
+                    "endpoint": endpoint, "count": 0, "total_blocked_ms": 0.0, "max_blocked_ms": 0.0, "worst_stack": []
+                }
+            stats["count"] += 1
+            stats["total_blocked_ms"] = round(stats["total_blocked_ms"] + blocked_ms, 1)
+            if blocked_ms >= stats["max_blocked_ms"]:
+                stats["max_blocked_ms"] = blocked_ms
+                stats["worst_stack"] = stack
+
+
+# Global loop monitor instance
+loop_monitor = LoopMonitor(
+    interval_seconds=settings.LOOP_MONITOR_INTERVAL_MS / 1000,
+    block_threshold_seconds=settings.LOOP_BLOCK_THRESHOLD_MS / 1000,
+    watchdog=settings.LOOP_WATCHDOG_ENABLED
+)
@@ -0,0 +1,398 @@
+"""
+In-process metrics with Prometheus text export
+
+A deliberately small subset of the Prometheus client model: counters, gauges
+and fixed-bucket histograms, each optionally labelled. Recording is a dict
+lookup plus an integer/float add, so it is safe to call on every voice turn.
+Everything is exported on GET /metrics.
+
+Usage:
+    from app.core.metrics import STAGE_SECONDS
+
+    with STAGE_SECONDS.time(stage="llm", company_id=1, intent="none"):
+        ...
+    STAGE_SECONDS.observe(0.42, stage="tts", company_id=1, intent="check_balance")
+"""
+import bisect
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# Seconds; spans fast bank calls up to very slow model stages
+DEFAULT_BUCKETS: List[float] = [
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict) -> LabelValues:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def collect(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.collect())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def collect(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in list(self._values.items())
+        ]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, or is computed at scrape time"""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._functions: Dict[LabelValues, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float], **labels):
+        """Compute the value lazily on each scrape (costs nothing on the hot path)"""
+        self._functions[self._key(labels)] = function
+
+    @contextmanager
+    def track_inprogress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def value(self, **labels) -> float:
+        key = self._key(labels)
+        if key in self._functions:
+            return float(self._functions[key]())
+        return self._values.get(key, 0.0)
+
+    def collect(self) -> List[str]:
+        lines = []
+        values = dict(self._values)
+        for key, function in list(self._functions.items()):
+            try:
+                values[key] = float(function())
+            except Exception:
+                continue
+        for key, value in values.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class _HistogramChild:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, n_buckets: int):
+        self.counts = [0] * n_buckets
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    """Distribution of observations in fixed buckets"""
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Optional[List[float]] = None
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = sorted(buckets or DEFAULT_BUCKETS)
+        self._children: Dict[LabelValues, _HistogramChild] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = _HistogramChild(len(self.buckets) + 1)
+        child.counts[bisect.bisect_left(self.buckets, value)] += 1
+        child.sum += value
+        child.count += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the `with` block in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def collect(self) -> List[str]:
+        lines = []
+        bounds = [_format_value(b) for b in self.buckets] + ["+Inf"]
+        for key, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, child.counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds all metrics and renders the /metrics payload"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Optional[List[float]] = None
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+# Global registry instance
+registry = MetricsRegistry()
+
+
+# ============================================================================
+# METRICS
+# ============================================================================
+
+STAGE_SECONDS = registry.histogram(
+    "echobank_stage_duration_seconds",
+    "Time spent in each voice pipeline stage (stt, llm, tts)",
+    ["stage", "company_id", "intent"],
+)
+
+MODEL_QUEUE_SECONDS = registry.histogram(
+    "echobank_model_queue_seconds",
+    "Time a company's STT/LLM/TTS call waited for a slot in the shared capacity",
+    ["stage", "company_id"],
+)
+
+MODEL_QUEUE_WAITING = registry.gauge(
+    "echobank_model_queue_waiting",
+    "STT/LLM/TTS calls currently waiting for a slot",
+    ["stage"],
+)
+
+TURN_SECONDS = registry.histogram(
+    "echobank_turn_duration_seconds",
+    "Total time to handle one voice turn",
+    ["input", "company_id", "intent"],
+)
+
+BANK_API_SECONDS = registry.histogram(
+    "echobank_bank_api_duration_seconds",
+    "Latency of calls to a company's bank API, by the intent of the turn that made them",
+    ["company_id", "endpoint", "intent", "outcome"],
+)
+
+BANK_API_COALESCED_TOTAL = registry.counter(
+    "echobank_bank_api_coalesced_total",
+    "Bank reads that joined an identical call already in flight instead of making their own",
+    ["company_id", "endpoint"],
+)
+
+TURNS_TOTAL = registry.counter(
+    "echobank_turns_total",
+    "Voice turns handled",
+    ["input", "company_id", "intent", "success"],
+)
+
+INTENT_SOURCE_TOTAL = registry.counter(
+    "echobank_intent_source_total",
+    "How each turn's intent was resolved: session_state (fast path, no LLM), llm, or keyword_fallback",
+    ["source"],
+)
+
+CACHE_REQUESTS_TOTAL = registry.counter(
+    "echobank_cache_requests_total",
+    "Cache lookups by cache and result (hit/miss)",
+    ["cache", "result"],
+)
+
+STT_BATCH_SIZE = registry.histogram(
+    "echobank_stt_batch_size",
+    "Utterances decoded together per local STT inference",
+    buckets=[1, 2, 4, 8, 16, 32],
+)
+
+AUDIO_PREPROCESS_TOTAL = registry.counter(
+    "echobank_audio_preprocess_total",
+    "Uploads by preprocessing outcome: trimmed, no_speech (STT skipped) or passthrough (undecodable)",
+    ["result"],
+)
+
+SPECULATION_TOTAL = registry.counter(
+    "echobank_speculation_total",
+    "Speculative intent parses at the final transcript: hit (committed), miss (words changed), "
+    "superseded (newer partial), error, or none (no speculation was running)",
+    ["result"],
+)
+
+SPECULATIVE_WORK_TOTAL = registry.counter(
+    "echobank_speculative_work_total",
+    "Work started from partial transcripts (llm, bank.<endpoint>) by outcome: used or wasted",
+    ["work", "outcome"],
+)
+
+TTS_FIRST_AUDIO_SECONDS = registry.histogram(
+    "echobank_tts_first_audio_seconds",
+    "Streamed TTS: time until the first clause's audio is ready to send",
+)
+
+JOBS_TOTAL = registry.counter(
+    "echobank_jobs_total",
+    "Background job attempts by outcome: done, retry (failed, will run again) or dead (out of attempts)",
+    ["job", "outcome"],
+)
+
+JOB_SECONDS = registry.histogram(
+    "echobank_job_duration_seconds",
+    "Time spent running one background job attempt",
+    ["job"],
+)
+
+JOB_QUEUE_DEPTH = registry.gauge(
+    "echobank_job_queue_depth",
+    "Background jobs waiting to run (queued) or dead-lettered (dead)",
+    ["status"],
+)
+
+DEADLINE_EXCEEDED_TOTAL = registry.counter(
+    "echobank_deadline_exceeded_total",
+    "Stages cut short by the turn deadline: aborted (required stage timed out) or skipped (optional stage, e.g. tts)",
+    ["stage", "action"],
+)
+
+ADMISSION_TOTAL = registry.counter(
+    "echobank_admission_total",
+    "Voice turns by admission decision (admitted, shed_inflight, shed_queue_delay)",
+    ["priority", "decision"],
+)
+
+LOOP_LAG_SECONDS = registry.histogram(
+    "echobank_event_loop_lag_seconds",
+    "How late the event loop ran a timer; time every request waits behind blocking code",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+LOOP_BLOCKED_TOTAL = registry.counter(
+    "echobank_event_loop_blocked_total",
+    "Times the event loop was held longer than LOOP_BLOCK_THRESHOLD_MS, by endpoint (unknown without the watchdog)",
+    ["endpoint"],
+)
+
+INFLIGHT_TURNS = registry.gauge(
+    "echobank_inflight_turns",
+    "Voice turns currently being processed",
+)
+INFLIGHT_TURNS.set(0)
+
+VOICE_WS_CONNECTIONS = registry.gauge(
+    "echobank_voice_ws_connections",
+    "Open voice WebSocket conversations",
+)
+VOICE_WS_CONNECTIONS.set(0)
+
+ACTIVE_SESSIONS = registry.gauge(
+    "echobank_active_sessions",
+    "Voice sessions held in the session store",
+)
+
+SERVICE_INIT_SECONDS = registry.gauge(
+    "echobank_service_init_seconds",
+    "Time it took to construct a lazily built service (whisper, llm, tts)",
+    ["service"],
+)
+
+WARMUP_PHASE_SECONDS = registry.gauge(
+    "echobank_warmup_phase_seconds",
+    "Time each startup warm-up phase took",
+    ["phase"],
+)
+
+RESPONSE_BYTES_TOTAL = registry.counter(
+    "echobank_response_bytes_total",
+    "Bytes of compressed response bodies, before (original) and after (sent) compression",
+    ["encoding", "stage"],
+)
@@ -0,0 +1,232 @@
+"""
+On-demand sampling profiler
+
+A thread wakes every PROFILER_INTERVAL_MS, reads every thread's current stack
+(sys._current_frames, the same trick as the loop watchdog) and counts how
+often each stack is seen. Nothing is installed in the interpreter, so the
+cost is one stack walk per thread per tick and only while a profile runs.
+
+Two ways to run it (see /admin/profile):
+    for N seconds           everything the process does in that window
+    for the next N requests sampling only counts while a request to the given
+    to a route              path is in flight; stops when N of them finished
+
+Output is in collapsed-stack format, one "root;caller;callee count" line per
+distinct stack, which flamegraph.pl, speedscope and inferno read directly.
+The root frame is the thread ("MainThread" is the event loop, "asyncio" the
+to_thread pool running Whisper/LLM/TTS calls). Idle threads (waiting in
+select, on a lock or for pool work) are left out unless asked for.
+"""
+import asyncio
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_MAX_STACK_FRAMES = 128
+
+# Innermost frames of a thread that is waiting, not working
+_IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),  # concurrent.futures pool thread waiting for work
+    ("handlers.py", "dequeue"),  # Log writer thread (QueueListener)
+}
+
+
+class ProfilerBusy(Exception):
+    """Another profile is already running"""
+
+
+class SamplingProfiler:
+    """Statistical profiler over all threads, producing collapsed stacks"""
+
+    def __init__(self, interval_seconds: float = 0.01, max_seconds: float = 120.0):
+        self.interval_seconds = interval_seconds
+        self.max_seconds = max_seconds
+
+        self._lock = threading.Lock()
+        self._running = False
+        self._route: Optional[str] = None
+        self._route_active = 0  # Matching requests in flight
+        self._route_remaining = 0
+        self._route_done: Optional[asyncio.Event] = None
+        self._labels: Dict[object, str] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    async def profile_for(self, seconds: float, include_idle: bool = False) -> Dict:
+        """
+        Sample the whole process for `seconds`
+
+        Raises:
+            ProfilerBusy: A profile is already running
+        """
+        self._claim()
+        try:
+            stop = threading.Event()
+            sampler = self._start_sampler(stop, include_idle)
+            await asyncio.sleep(min(seconds, self.max_seconds))
+            return await self._finish(stop, sampler, mode="seconds")
+        finally:
+            self._release()
+
+    async def profile_requests(self, route: str, requests: int, include_idle: bool = False) -> Dict:
+        """
+        Sample while requests to `route` run, until `requests` of them finished
+
+        Gives up after max_seconds; the result says how many were profiled.
+
+        Raises:
+            ProfilerBusy: A profile is already running
+        """
+        self._claim()
+        try:
+            self._route_done = asyncio.Event()
+            self._route_remaining = requests
+            self._route_active = 0
+            self._route = route
+
+            stop = threading.Event()
+            sampler = self._start_sampler(stop, include_idle)
+            try:
+                await asyncio.wait_for(self._route_done.wait(), timeout=self.max_seconds)
+            except asyncio.TimeoutError:
+                logger.info("Profile of %s timed out after %ss", route, self.max_seconds)
+            profiled = requests - max(self._route_remaining, 0)
+            self._route = None
+            result = await self._finish(stop, sampler, mode="requests")
+            result["route"] = route
+            result["requests"] = profiled
+            return result
+        finally:
+            self._route = None
+            self._route_done = None
+            self._release()
+
+    def request_started(self, path: str) -> bool:
+        """Called by the HTTP middleware; True when the request is being profiled"""
+        if self._route is None or path != self._route or self._route_remaining <= 0:
+            return False
+        with self._lock:
+            self._route_active += 1
+        return True
+
+    def request_finished(self):
+        """Counterpart of a request_started that returned True"""
+        with self._lock:
+            self._route_active -= 1
+            self._route_remaining -= 1
+            finished = self._route_remaining <= 0
+        if finished and self._route_done is not None:
+            self._route_done.set()
+
+    def _claim(self):
+        with self._lock:
+            if self._running:
+                raise ProfilerBusy("A profile is already running")
+            self._running = True
+
+    def _release(self):
+        with self._lock:
+            self._running = False
+
+    def _start_sampler(self, stop: threading.Event, include_idle: bool):
+        result: Dict = {}
+        thread = threading.Thread(
+            target=self._sample, args=(stop, include_idle, result), name="profiler", daemon=True
+        )
+        thread.start()
+        return thread, result
+
+    async def _finish(self, stop: threading.Event, sampler, mode: str) -> Dict:
+        thread, result = sampler
+        stop.set()
+        await asyncio.to_thread(thread.join)
+        result["mode"] = mode
+        return result
+
+    def _sample(self, stop: threading.Event, include_idle: bool, result: Dict):
+        """Sampler thread: count stacks until `stop` is set"""
+        stacks: Counter = Counter()
+        samples = 0
+        own_id = threading.get_ident()
+        started = time.monotonic()
+
+        while not stop.wait(self.interval_seconds):
+            if self._route is not None and self._route_active <= 0:
+                continue  # Route mode, and no matching request in flight
+            names = {t.ident: t.name for t in threading.enumerate()}
+            samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if not include_idle and self._idle(frame):
+                    continue
+                stacks[self._collapse(_thread_label(names.get(thread_id, "thread")), frame)] += 1
+
+        result.update({
+            "duration_seconds": round(time.monotonic() - started, 3),
+            "interval_ms": self.interval_seconds * 1000,
+            "samples": samples,
+            "stacks": stacks,
+        })
+
+    @staticmethod
+    def _idle(frame) -> bool:
+        code = frame.f_code
+        return (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES
+
+    def _collapse(self, root: str, frame) -> str:
+        labels = []
+        while frame is not None and len(labels) < _MAX_STACK_FRAMES:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        labels.append(root)
+        return ";".join(reversed(labels))
+
+    def _label(self, code) -> str:
+        """'qualname (path)' for a code object, cached"""
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_qualname} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+            label = self._labels[code] = label.replace(";", ",")
+        return label
+
+
+def collapsed(stacks: Counter) -> str:
+    """Collapsed-stack text, heaviest stacks first"""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def _thread_label(name: str) -> str:
+    """Pool threads share one root frame ("asyncio_3" -> "asyncio", "Thread-2 (_watch)" -> "_watch")"""
+    name = re.sub(r"^Thread-\d+ \((.+)\)$", r"\1", name)
+    return re.sub(r"[_-]\d+$", "", name).replace(";", ",").replace(" ", "_")
+
+
+def _short_path(filename: str) -> str:
+    """app/... for our code, the last two path parts for libraries"""
+    marker = os.sep + "app" + os.sep
+    if marker in filename:
+        return "app" + os.sep + filename.rsplit(marker, 1)[1]
+    parts = filename.split(os.sep)
+    return os.sep.join(parts[-2:])
+
+
+# Global profiler instance
+profiler = SamplingProfiler(
+    interval_seconds=settings.PROFILER_INTERVAL_MS / 1000,
+    max_seconds=settings.PROFILER_MAX_SECONDS
+)
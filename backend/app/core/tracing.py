@@ -0,0 +1,373 @@
+"""
+Lightweight in-process request tracing
+
+Each HTTP request gets a root span (opened by the middleware in main.py); code
+underneath opens child spans with `span(...)`. The current span is carried in
+a contextvar, so nesting follows async calls without passing anything around.
+When the root span ends, the whole trace is handed to the configured exporters:
+
+    ring  - keeps recent traces in memory, indexed by session (/debug/traces)
+    file  - appends one JSON line per trace to TRACE_FILE_PATH
+    otlp  - POSTs OTLP/HTTP JSON to TRACE_OTLP_ENDPOINT (Jaeger, Tempo, collector...)
+
+File and OTLP export run on a background thread so the request path only pays
+for a queue put.
+
+Usage:
+    from app.core.tracing import span, set_trace_attribute
+
+    with span("llm.parse_intent", model="llama-3.1-8b"):
+        ...
+    set_trace_attribute("session_id", session_id)
+"""
+import json
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("echobank_current_span", default=None)
+
+
+class Span:
+    """One timed operation within a trace"""
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+        "attributes", "status", "error", "root", "_trace_spans",
+    )
+
+    def __init__(self, name: str, parent: Optional["Span"] = None,
+                 trace_id: Optional[str] = None, parent_id: Optional[str] = None):
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = {}
+        self.status = "ok"
+        self.error: Optional[str] = None
+
+        if parent is not None:
+            self.trace_id = parent.trace_id
+            self.parent_id = parent.span_id
+            self.root = parent.root
+            self.root._trace_spans.append(self)
+        else:
+            # Root span; may continue a trace started by the caller (traceparent)
+            self.trace_id = trace_id or secrets.token_hex(16)
+            self.parent_id = parent_id
+            self.root = self
+            self._trace_spans = [self]
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1_000_000
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def record_error(self, exc: BaseException):
+        self.status = "error"
+        self.error = f"{type(exc).__name__}: {exc}"
+
+    @property
+    def traceparent(self) -> str:
+        """W3C trace context header value for outgoing calls"""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class CompletedTrace:
+    """All spans of one finished request"""
+
+    def __init__(self, root: Span):
+        self.root = root
+        self.spans: List[Span] = list(root._trace_spans)
+
+    @property
+    def trace_id(self) -> str:
+        return self.root.trace_id
+
+    @property
+    def duration_ms(self) -> float:
+        return self.root.duration_ms or 0.0
+
+    @property
+    def session_id(self) -> Optional[str]:
+        return self.root.attributes.get("session_id")
+
+    def tree(self) -> Dict:
+        """Nested span tree, children in start order"""
+        nodes = {s.span_id: dict(s.to_dict(), children=[]) for s in self.spans}
+        for s in sorted(self.spans, key=lambda s: s.start_ns):
+            if s is not self.root and s.parent_id in nodes:
+                nodes[s.parent_id]["children"].append(nodes[s.span_id])
+        return nodes[self.root.span_id]
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace_id,
+            "session_id": self.session_id,
+            "duration_ms": self.duration_ms,
+            "root": self.tree(),
+        }
+
+
+# ============================================================================
+# EXPORTERS
+# ============================================================================
+
+class RingBufferExporter:
+    """Keeps the most recent traces in memory"""
+
+    def __init__(self, capacity: int = 500):
+        self._traces: Deque[CompletedTrace] = deque(maxlen=capacity)
+
+    def export(self, trace: CompletedTrace):
+        self._traces.append(trace)
+
+    def recent(self, session_id: Optional[str] = None, min_duration_ms: float = 0.0,
+               limit: int = 20) -> List[CompletedTrace]:
+        """Newest first, optionally filtered by session and minimum duration"""
+        result = []
+        for trace in reversed(self._traces):
+            if session_id is not None and trace.session_id != session_id:
+                continue
+            if trace.duration_ms < min_duration_ms:
+                continue
+            result.append(trace)
+            if len(result) >= limit:
+                break
+        return result
+
+    def clear(self):
+        self._traces.clear()
+
+
+class _BackgroundExporter:
+    """Batches traces on a queue and ships them from a daemon thread"""
+
+    def __init__(self, batch_size: int = 50, flush_interval: float = 2.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[CompletedTrace]" = queue.Queue(maxsize=10_000)
+        self._thread = threading.Thread(target=self._worker, name=type(self).__name__, daemon=True)
+        self._thread.start()
+
+    def export(self, trace: CompletedTrace):
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            pass  # Dropping a trace beats blocking a request
+
+    def _worker(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            try:
+                self.ship(batch)
+            except Exception as e:
+                logger.warning("Trace export failed: %s", e, extra={"exporter": type(self).__name__})
+
+    def ship(self, batch: List[CompletedTrace]):
+        raise NotImplementedError
+
+
+class FileExporter(_BackgroundExporter):
+    """Appends one JSON line per trace"""
+
+    def __init__(self, path: str, **kwargs):
+        self.path = path
+        super().__init__(**kwargs)
+
+    def ship(self, batch: List[CompletedTrace]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for trace in batch:
+                f.write(json.dumps(trace.to_dict(), default=str) + "\n")
+
+
+class OTLPExporter(_BackgroundExporter):
+    """OTLP/HTTP JSON exporter (POST {endpoint} with resourceSpans)"""
+
+    def __init__(self, endpoint: str, service_name: str = "echobank-api", **kwargs):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        super().__init__(**kwargs)
+
+    @staticmethod
+    def _attribute(key: str, value: Any) -> Dict:
+        if isinstance(value, bool):
+            wrapped = {"boolValue": value}
+        elif isinstance(value, int):
+            wrapped = {"intValue": str(value)}
+        elif isinstance(value, float):
+            wrapped = {"doubleValue": value}
+        else:
+            wrapped = {"stringValue": str(value)}
+        return {"key": key, "value": wrapped}
+
+    def _span(self, s: Span) -> Dict:
+        span = {
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": 2 if s.root is s else 1,  # SERVER for roots, INTERNAL otherwise
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns or s.start_ns),
+            "attributes": [self._attribute(k, v) for k, v in s.attributes.items()],
+            "status": {"code": 2, "message": s.error} if s.status == "error" else {"code": 1},
+        }
+        if s.parent_id:
+            span["parentSpanId"] = s.parent_id
+        return span
+
+    def payload(self, batch: List[CompletedTrace]) -> Dict:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [self._attribute("service.name", self.service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "app.core.tracing"},
+                    "spans": [self._span(s) for trace in batch for s in trace.spans],
+                }],
+            }]
+        }
+
+    def ship(self, batch: List[CompletedTrace]):
+        import httpx
+        response = httpx.post(self.endpoint, json=self.payload(batch), timeout=5.0)
+        response.raise_for_status()
+
+
+# ============================================================================
+# TRACER
+# ============================================================================
+
+class Tracer:
+    """Creates spans and hands finished traces to exporters"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.exporters: List[Any] = []
+        self.ring: Optional[RingBufferExporter] = None
+
+    def add_exporter(self, exporter):
+        if isinstance(exporter, RingBufferExporter):
+            self.ring = exporter
+        self.exporters.append(exporter)
+
+    @contextmanager
+    def start_span(self, name: str, root: bool = False, traceparent: Optional[str] = None, **attributes):
+        """
+        Open a span as a child of the current one (or a new root)
+
+        Yields None when tracing is disabled or when a child span is requested
+        outside any trace, so callers should treat the yielded span as optional.
+        """
+        parent = None if root else _current_span.get()
+        if not self.enabled or (parent is None and not root):
+            yield None
+            return
+
+        if parent is None:
+            trace_id, parent_id = _parse_traceparent(traceparent)
+            current = Span(name, trace_id=trace_id, parent_id=parent_id)
+        else:
+            current = Span(name, parent=parent)
+        current.attributes.update(attributes)
+
+        token = _current_span.set(current)
+        try:
+            yield current
+        except BaseException as e:
+            current.record_error(e)
+            raise
+        finally:
+            current.end_ns = time.time_ns()
+            _current_span.reset(token)
+            if current.root is current:
+                self._export(CompletedTrace(current))
+
+    def _export(self, trace: CompletedTrace):
+        for exporter in self.exporters:
+            try:
+                exporter.export(trace)
+            except Exception as e:
+                logger.warning("Trace export failed: %s", e)
+
+
+def _parse_traceparent(header: Optional[str]):
+    """Extract (trace_id, parent_span_id) from a W3C traceparent header"""
+    if not header:
+        return None, None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None, None
+    return parts[1], parts[2]
+
+
+def build_tracer() -> Tracer:
+    """Tracer configured from settings"""
+    tracer = Tracer(enabled=settings.TRACING_ENABLED)
+    for name in (e.strip() for e in settings.TRACE_EXPORTERS.split(",")):
+        if name == "ring":
+            tracer.add_exporter(RingBufferExporter(capacity=settings.TRACE_RING_SIZE))
+        elif name == "file":
+            os.makedirs(os.path.dirname(os.path.abspath(settings.TRACE_FILE_PATH)), exist_ok=True)
+            tracer.add_exporter(FileExporter(settings.TRACE_FILE_PATH))
+        elif name == "otlp":
+            tracer.add_exporter(OTLPExporter(settings.TRACE_OTLP_ENDPOINT))
+        elif name:
+            logger.warning("Unknown trace exporter %r ignored", name)
+    return tracer
+
+
+# Global tracer instance
+tracer = build_tracer()
+
+
+def span(name: str, **attributes):
+    """Child span of whatever span is current (no-op outside a trace)"""
+    return tracer.start_span(name, **attributes)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def set_trace_attribute(key: str, value: Any):
+    """Set an attribute on the current request's root span"""
+    current = _current_span.get()
+    if current is not None:
+        current.root.set_attribute(key, value)
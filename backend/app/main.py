@@ -1,20 +1,105 @@
-from fastapi import FastAPI
+import logging
+from app.core.logging import setup_logging, shutdown_logging
+
+# Configure logging before the services below log anything at import time
+setup_logging()
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.datastructures import MutableHeaders
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
 from app.core.database import init_db
-from app.api import voice, transfers, recipients, voice_orchestrator, companies
+from app.core.loop_monitor import loop_monitor
+from app.core.metrics import registry
+from app.core.responses import FastJSONResponse
+from app.core.profiler import profiler
+from app.core.tracing import tracer
+from app.api import voice, transfers, recipients, voice_orchestrator, voice_ws, companies, debug, admin
+from app.services.health_prober import health_prober
+from app.services.job_queue import job_queue
+from app.services.company_api_client import close_bank_http_pool
+from app.services.warmup import warmup
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="EchoBank API",
     description="Voice-powered banking assistant API - Integrates into existing bank apps",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # Initialize database on startup
 @app.on_event("startup")
 async def startup_event():
     init_db()
-    print("EchoBank API started successfully!")
+    loop_monitor.register_routes(app.routes)
+    loop_monitor.start()
+    if settings.HEALTH_PROBE_ENABLED:
+        health_prober.start()
+    job_queue.start()
+    # Services, caches and bank connections are warmed in the background once the
+    # port is bound; /health/ready reports when that's done
+    warmup.start()
+    logger.info("EchoBank API started successfully!")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await warmup.stop()
+    await health_prober.stop()
+    await job_queue.stop()
+    await loop_monitor.stop()
+    await close_bank_http_pool()
+    shutdown_logging()
+
+
+class TraceRequests:
+    """
+    Open the root span of each request's trace
+
+    Pure ASGI rather than @app.middleware("http"): the span (and a running
+    profile) must stay open until the body has been sent, which for streamed
+    TTS audio is long after the endpoint returned.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        with tracer.start_span(
+            f"{request.method} {request.url.path}",
+            root=True,
+            traceparent=request.headers.get("traceparent"),
+            **{"http.method": request.method, "http.path": request.url.path}
+        ) as root_span:
+            session_id = request.headers.get("session-id")
+            if root_span is not None and session_id:
+                root_span.set_attribute("session_id", session_id)
+
+            async def send_traced(message):
+                if message["type"] == "http.response.start" and root_span is not None:
+                    root_span.set_attribute("http.status_code", message["status"])
+                    MutableHeaders(scope=message)["X-Trace-Id"] = root_span.trace_id
+                await send(message)
+
+            profiled = profiler.request_started(request.url.path)
+            try:
+                await self.app(scope, receive, send_traced)
+            finally:
+                if profiled:
+                    profiler.request_finished()
+
+
+app.add_middleware(TraceRequests)
+
 
 # CORS Configuration
 app.add_middleware(
@@ -25,6 +110,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so it sees the final body and headers
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_BYTES,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
 @app.get("/")
 async def root():
     return {
@@ -37,16 +131,42 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+
+@app.get("/health/live")
+async def liveness():
+    """The process is up and serving (restart it if this fails)"""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """Whether to route traffic here: 503 until the startup warm-up has finished"""
+    if not warmup.ready:
+        return JSONResponse(status_code=503, content={"status": "warming_up", "warmup": warmup.status()})
+    return {"status": "ready", "warmup": warmup.status()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 # Register API routers
 # Company Registration - Banks sign up here
 app.include_router(companies.router)
 
 # Main Voice Orchestrator - Primary integration endpoint for banks
 app.include_router(voice_orchestrator.router)
+app.include_router(voice_ws.router)
 
 # Developer 2: Transfers and Recipients endpoints (legacy/direct access)
 app.include_router(transfers.router)
 app.include_router(recipients.router)
 
+# Operator tools (sampling profiler) and debugging (traces, event loop stalls);
+# token-protected, so mounted everywhere
+app.include_router(admin.router)
+app.include_router(debug.router)
+
 # Verify all routers are loaded
-print(f"All API routers loaded successfully! Total routes: {len(app.routes)}")
+logger.info("All API routers loaded successfully! Total routes: %d", len(app.routes))
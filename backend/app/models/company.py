@@ -1,7 +1,7 @@
 """
 Company Model - Banks/Financial institutions that use EchoBank API
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, Text, JSON
 from datetime import datetime
 from app.models.base import Base
 
@@ -28,6 +28,12 @@ class Company(Base):
     is_active = Column(Boolean, default=True)
     is_verified = Column(Boolean, default=False)
 
+    # Share of model capacity (STT, LLM, TTS), applied per stage
+    scheduling_weight = Column(Float, default=1.0)  # Relative share when stages are contended
+    model_concurrency_limit = Column(Integer, nullable=True)  # Calls in progress at once; null = no cap
+    model_rate_limit = Column(Float, nullable=True)  # Calls started per second; null = unlimited
+    model_rate_burst = Column(Integer, nullable=True)  # Token bucket size; defaults to the rate
+
     # Metadata
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,130 @@
+"""
+Admission Control
+
+Decides, before any STT/LLM work is spent on it, whether a voice turn is
+taken on. Without it, a slow LLM provider makes turns pile up until every
+user times out; with it, the turns we can't serve in time get an immediate
+"please try again" (with pre-rendered audio) and the rest stay fast.
+
+Two kinds of turn:
+    transfer   the session has a transfer waiting for PIN/confirmation.
+               Always admitted while under ADMISSION_MAX_INFLIGHT_TURNS +
+               ADMISSION_TRANSFER_RESERVE, and served ahead of queued model
+               calls (see tenant_scheduler.mark_urgent).
+    normal     everything else. Shed when ADMISSION_MAX_INFLIGHT_TURNS turns
+               are in flight, or when a model call has already been queued
+               for longer than ADMISSION_MAX_QUEUE_DELAY_MS (taking on more
+               work would only make that wait longer).
+"""
+import logging
+from typing import Dict, Optional
+from app.core.config import settings
+from app.core.metrics import ADMISSION_TOTAL
+from app.services.tenant_scheduler import model_queue_delay
+from app.services.tts import tts_service
+
+logger = logging.getLogger(__name__)
+
+TRANSFER = "transfer"
+NORMAL = "normal"
+
+BUSY_TEXT = "Sorry, I'm handling a lot of requests right now. Please try again in a moment."
+
+
+def turn_priority(session_data: Optional[Dict]) -> str:
+    """TRANSFER when the turn may finish an in-progress transfer, else NORMAL"""
+    if session_data and (session_data.get("awaiting_pin") or session_data.get("pending_transfer")):
+        return TRANSFER
+    return NORMAL
+
+
+class Admission:
+    """
+    An admitted turn; leaving the `with` block frees its place
+
+    A turn whose audio is synthesized while it is being sent (streamed WAV,
+    WebSocket audio) calls defer() inside the block, and release() once the
+    audio is out.
+    """
+
+    def __init__(self, controller: "AdmissionController", priority: str):
+        self.controller = controller
+        self.priority = priority
+        self._held = True
+        self._deferred = False
+
+    def defer(self):
+        """Keep the place after the `with` block; release() frees it"""
+        self._deferred = True
+
+    def release(self):
+        """Free the place (safe to call more than once)"""
+        if self._held:
+            self._held = False
+            self.controller.in_flight -= 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self._deferred or exc_type is not None:
+            self.release()
+        return False
+
+
+class AdmissionController:
+    """Counts turns in flight and sheds new ones under overload"""
+
+    def __init__(self, max_inflight: int = 64, transfer_reserve: int = 16, max_queue_delay_seconds: float = 2.0):
+        self.max_inflight = max_inflight
+        self.transfer_reserve = transfer_reserve
+        self.max_queue_delay_seconds = max_queue_delay_seconds
+        self.in_flight = 0
+        self.busy_audio: Optional[bytes] = None  # BUSY_TEXT as WAV, once prepare() has run
+
+    def admit(self, priority: str) -> Optional[Admission]:
+        """
+        Take on a turn or refuse it
+
+        Returns:
+            An Admission to hold for the length of the turn, or None when the
+            turn should be answered with BUSY_TEXT
+        """
+        if priority == TRANSFER:
+            limit = self.max_inflight + self.transfer_reserve
+            decision = "admitted" if self.in_flight < limit else "shed_inflight"
+        elif self.in_flight >= self.max_inflight:
+            decision = "shed_inflight"
+        elif model_queue_delay() > self.max_queue_delay_seconds:
+            decision = "shed_queue_delay"
+        else:
+            decision = "admitted"
+
+        ADMISSION_TOTAL.inc(priority=priority, decision=decision)
+        if decision != "admitted":
+            logger.warning(
+                "Turn shed under load",
+                extra={"priority": priority, "decision": decision, "in_flight": self.in_flight}
+            )
+            return None
+
+        self.in_flight += 1
+        return Admission(self, priority)
+
+    async def prepare(self):
+        """Render the busy message once, so shedding never needs TTS"""
+        if self.busy_audio is not None or not tts_service.available:
+            return
+        result = await tts_service.text_to_speech(BUSY_TEXT, return_format="bytes")
+        if result.get("success"):
+            self.busy_audio = result["audio_bytes"]
+        else:
+            logger.warning("Couldn't render the busy message: %s", result.get("error"))
+
+
+# Global admission controller instance
+admission_controller = AdmissionController(
+    max_inflight=settings.ADMISSION_MAX_INFLIGHT_TURNS,
+    transfer_reserve=settings.ADMISSION_TRANSFER_RESERVE,
+    max_queue_delay_seconds=settings.ADMISSION_MAX_QUEUE_DELAY_MS / 1000
+)
@@ -0,0 +1,83 @@
+"""
+Short-lived cache for synthesized response audio
+
+Voice responses in "url" mode carry an audio_url instead of base64 audio;
+the bytes wait here until the client fetches them from
+GET /api/v1/voice/audio/{audio_id}. Entries expire after AUDIO_CACHE_TTL_SECONDS
+and the oldest are evicted once AUDIO_CACHE_MAX_BYTES is reached.
+"""
+import secrets
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS_TOTAL
+
+
+class AudioCache:
+    """In-memory TTL + size-bounded store of encoded audio clips"""
+
+    def __init__(self, ttl_seconds: int = 120, max_bytes: int = 64 * 1024 * 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._bytes = 0
+
+    def put(self, audio: bytes, media_type: str, **metadata) -> str:
+        """
+        Store one clip
+
+        Returns:
+            audio_id to fetch it with (unguessable; it is the only access check)
+        """
+        self._expire()
+        audio_id = secrets.token_urlsafe(16)
+        self._entries[audio_id] = {
+            "audio": audio,
+            "media_type": media_type,
+            "expires_at": time.monotonic() + self.ttl_seconds,
+            "metadata": metadata,
+        }
+        self._bytes += len(audio)
+
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            self._evict(next(iter(self._entries)))
+        return audio_id
+
+    def get(self, audio_id: str) -> Optional[Dict]:
+        """
+        Returns:
+            {"audio": bytes, "media_type": str, "expires_at": float, "metadata": dict} or None
+        """
+        entry = self._entries.get(audio_id)
+        if entry is None or entry["expires_at"] < time.monotonic():
+            if entry is not None:
+                self._evict(audio_id)
+            CACHE_REQUESTS_TOTAL.inc(cache="response_audio", result="miss")
+            return None
+        CACHE_REQUESTS_TOTAL.inc(cache="response_audio", result="hit")
+        return entry
+
+    def _evict(self, audio_id: str):
+        entry = self._entries.pop(audio_id, None)
+        if entry is not None:
+            self._bytes -= len(entry["audio"])
+
+    def _expire(self):
+        # Entries are in insertion order and share one TTL, so expired ones are at the front
+        now = time.monotonic()
+        while self._entries:
+            audio_id, entry = next(iter(self._entries.items()))
+            if entry["expires_at"] >= now:
+                break
+            self._evict(audio_id)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Global audio cache instance
+audio_cache = AudioCache(
+    ttl_seconds=settings.AUDIO_CACHE_TTL_SECONDS,
+    max_bytes=settings.AUDIO_CACHE_MAX_BYTES
+)
@@ -0,0 +1,186 @@
+"""
+Audio Preprocessing Service
+
+Runs in front of speech-to-text:
+
+    1. decode (WAV natively; OGG/FLAC with soundfile)
+    2. downmix to mono
+    3. resample to 16 kHz (what Whisper works at internally)
+    4. energy-based voice activity detection: trim leading/trailing silence,
+       and flag clips with no speech at all so they never reach STT
+    5. re-encode as 16-bit WAV, or Opus if AUDIO_ENCODE_OPUS is on
+
+A 48 kHz stereo recording with a second of silence on each end typically
+shrinks by well over 80%, which cuts upload time to the Whisper API and the
+work a local model has to do. Formats we can't decode (e.g. webm without
+soundfile) are passed through untouched.
+"""
+import asyncio
+import logging
+from typing import Dict
+import numpy as np
+from app.core.config import settings
+from app.core.metrics import AUDIO_PREPROCESS_TOTAL
+from app.core.tracing import span
+from app.utils.audio import decode_audio, encode_opus, encode_wav, resample, to_mono
+
+logger = logging.getLogger(__name__)
+
+FRAME_MS = 20
+
+
+class AudioPreprocessor:
+    """Silence trimming, downmix, resampling and re-encoding for STT input"""
+
+    def __init__(
+        self,
+        target_sample_rate: int = 16000,
+        energy_margin_db: float = 15.0,
+        energy_floor_db: float = -50.0,
+        min_speech_ms: int = 150,
+        padding_ms: int = 200,
+        encode_opus: bool = False
+    ):
+        self.target_sample_rate = target_sample_rate
+        self.energy_margin_db = energy_margin_db
+        self.energy_floor_db = energy_floor_db
+        self.min_speech_ms = min_speech_ms
+        self.padding_ms = padding_ms
+        self.encode_opus = encode_opus
+
+    async def process(self, data: bytes, filename: str = "audio.wav") -> Dict:
+        """
+        Prepare one upload for STT (CPU work runs on a worker thread)
+
+        Args:
+            data: Uploaded audio bytes
+            filename: Original filename
+
+        Returns:
+            {
+                "audio": bytes,         # What to send to STT
+                "filename": str,        # Matches the new encoding
+                "speech": bool,         # False -> skip STT, nothing was said
+                "processed": bool,      # False -> format not decodable, passed through
+                "bytes_in": int,
+                "bytes_out": int,
+                "duration_in": float,   # Seconds
+                "duration_out": float
+            }
+        """
+        with span("audio.preprocess", bytes_in=len(data)) as prep_span:
+            result = await asyncio.to_thread(self.process_sync, data, filename)
+            if prep_span is not None:
+                prep_span.set_attribute("bytes_out", result["bytes_out"])
+                prep_span.set_attribute("speech", result["speech"])
+
+        if not result["processed"]:
+            AUDIO_PREPROCESS_TOTAL.inc(result="passthrough")
+        elif not result["speech"]:
+            AUDIO_PREPROCESS_TOTAL.inc(result="no_speech")
+        else:
+            AUDIO_PREPROCESS_TOTAL.inc(result="trimmed")
+        return result
+
+    def process_sync(self, data: bytes, filename: str = "audio.wav") -> Dict:
+        decoded = decode_audio(data)
+        if decoded is None:
+            return self._passthrough(data, filename)
+
+        samples, sample_rate = decoded
+        duration_in = len(samples) / sample_rate if sample_rate else 0.0
+
+        mono = resample(to_mono(samples), sample_rate, self.target_sample_rate)
+        start, end = self.speech_bounds(mono, self.target_sample_rate)
+
+        if start is None:
+            return {
+                "audio": b"",
+                "filename": filename,
+                "speech": False,
+                "processed": True,
+                "bytes_in": len(data),
+                "bytes_out": 0,
+                "duration_in": duration_in,
+                "duration_out": 0.0
+            }
+
+        trimmed = mono[start:end]
+        audio = encode_opus(trimmed, self.target_sample_rate) if self.encode_opus else None
+        if audio is not None:
+            out_name = _with_extension(filename, "ogg")
+        else:
+            audio = encode_wav(trimmed, self.target_sample_rate)
+            out_name = _with_extension(filename, "wav")
+
+        return {
+            "audio": audio,
+            "filename": out_name,
+            "speech": True,
+            "processed": True,
+            "bytes_in": len(data),
+            "bytes_out": len(audio),
+            "duration_in": duration_in,
+            "duration_out": len(trimmed) / self.target_sample_rate
+        }
+
+    def speech_bounds(self, samples: np.ndarray, sample_rate: int):
+        """
+        Sample range [start, end) containing speech, or (None, None) if there is none
+
+        Frame energy (RMS in dBFS, 20ms frames) is compared against the clip's
+        own noise floor (10th percentile) plus a margin. The threshold is capped
+        at the loudest frame minus the margin (clips that are speech throughout)
+        and never goes below an absolute floor (digital silence). Less than
+        min_speech_ms of voiced frames in total counts as no speech (clicks, bumps).
+        """
+        frame_len = sample_rate * FRAME_MS // 1000
+        n_frames = len(samples) // frame_len
+        if n_frames == 0:
+            return None, None
+
+        frames = samples[:n_frames * frame_len].reshape(n_frames, frame_len)
+        rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+        db = 20 * np.log10(np.maximum(rms, 1e-10))
+
+        noise_floor = np.percentile(db, 10)
+        threshold = min(noise_floor, db.max() - 2 * self.energy_margin_db) + self.energy_margin_db
+        threshold = max(threshold, self.energy_floor_db)
+        voiced = np.flatnonzero(db > threshold)
+
+        if len(voiced) * FRAME_MS < self.min_speech_ms:
+            return None, None
+
+        pad = self.padding_ms // FRAME_MS
+        first = max(voiced[0] - pad, 0)
+        last = min(voiced[-1] + 1 + pad, n_frames)
+        return first * frame_len, min(last * frame_len, len(samples))
+
+    @staticmethod
+    def _passthrough(data: bytes, filename: str) -> Dict:
+        return {
+            "audio": data,
+            "filename": filename,
+            "speech": True,  # Unknown; let STT decide
+            "processed": False,
+            "bytes_in": len(data),
+            "bytes_out": len(data),
+            "duration_in": 0.0,
+            "duration_out": 0.0
+        }
+
+
+def _with_extension(filename: str, extension: str) -> str:
+    stem = filename.rsplit(".", 1)[0] if "." in filename else filename
+    return f"{stem}.{extension}"
+
+
+# Singleton instance
+audio_preprocessor = AudioPreprocessor(
+    target_sample_rate=settings.AUDIO_TARGET_SAMPLE_RATE,
+    energy_margin_db=settings.VAD_ENERGY_MARGIN_DB,
+    energy_floor_db=settings.VAD_ENERGY_FLOOR_DB,
+    min_speech_ms=settings.VAD_MIN_SPEECH_MS,
+    padding_ms=settings.VAD_PADDING_MS,
+    encode_opus=settings.AUDIO_ENCODE_OPUS
+)
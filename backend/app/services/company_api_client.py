@@ -4,10 +4,87 @@ Company API Client
 This service calls the COMPANY'S (bank's) API endpoints
 Instead of using mock data, we call the real bank's API
 """
+import asyncio
+import hashlib
 import httpx
-from typing import Dict, Any, Optional
+import logging
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, Any, Optional, Tuple
 from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.deadline import check_deadline, remaining_time
+from app.core.metrics import BANK_API_COALESCED_TOTAL, BANK_API_SECONDS, SPECULATIVE_WORK_TOTAL
+from app.core.tracing import current_span, span
 from app.models.company import Company, CompanyEndpoints
+from app.services.endpoint_scoreboard import endpoint_scoreboard
+from app.services.response_mapping import mapping_cache
+from app.utils.json_stream import stream_json_array
+from app.utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Identical reads in flight at the same time (double taps, client retries,
+# speculative prefetches) share one bank call. Process-wide: API clients are
+# per request.
+_read_flights = SingleFlight()
+
+# Intent of the turn making bank calls, for the latency metric's intent label
+_current_intent: ContextVar[str] = ContextVar("echobank_bank_intent", default="none")
+
+
+def use_intent(intent: str):
+    """Label bank calls made from here on (in this task and its children) with a turn's intent"""
+    _current_intent.set(intent)
+
+# One connection pool for all bank calls, so turns reuse open (TLS) connections
+# instead of handshaking per call. Bound to the loop it was created on.
+_pool: Optional[httpx.AsyncClient] = None
+_pool_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def bank_http_pool() -> httpx.AsyncClient:
+    """The process-wide pooled client for bank calls (created on first use)"""
+    global _pool, _pool_loop
+    loop = asyncio.get_running_loop()
+    if _pool is None or _pool.is_closed or _pool_loop is not loop:
+        _pool = httpx.AsyncClient(limits=httpx.Limits(
+            max_connections=settings.BANK_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.BANK_HTTP_MAX_CONNECTIONS,
+            keepalive_expiry=settings.BANK_HTTP_KEEPALIVE_SECONDS
+        ))
+        _pool_loop = loop
+    return _pool
+
+
+async def close_bank_http_pool():
+    global _pool
+    if _pool is not None and _pool_loop is asyncio.get_running_loop():
+        await _pool.aclose()
+    _pool = None
+
+
+async def open_bank_connections(base_url: str, connections: int = 2, timeout: float = 5.0) -> int:
+    """
+    Open `connections` pooled connections to a bank ahead of its first turn
+
+    Any HTTP answer counts (the base URL usually has no route); only the
+    connection and TLS handshake matter.
+
+    Returns:
+        How many connections were opened
+    """
+    client = bank_http_pool()
+
+    async def connect():
+        await client.head(base_url, timeout=timeout)
+
+    results = await asyncio.gather(*(connect() for _ in range(connections)), return_exceptions=True)
+    failures = [r for r in results if isinstance(r, Exception)]
+    if failures:
+        logger.info("Couldn't pre-connect to %s: %s", base_url, failures[0])
+    return len(results) - len(failures)
 
 
 class CompanyAPIClient:
@@ -15,15 +92,44 @@ class CompanyAPIClient:
     Client to call company's registered API endpoints
     """
 
-    def __init__(self, company_id: int, db: Session):
+    # Upper bound for any single bank call; the scoreboard may pick a shorter one
+    DEFAULT_TIMEOUT = 30.0
+
+    # Only idempotent reads get adaptive timeouts (and the turn deadline). Cutting
+    # a transfer call short could leave us unsure whether money moved.
+    ADAPTIVE_TIMEOUT_ENDPOINTS = {"get_balance", "get_recipients", "get_transactions"}
+
+    def __init__(
+        self,
+        company_id: int,
+        db: Session,
+        http_client: Optional[httpx.AsyncClient] = None,
+        probe: bool = False
+    ):
+        """
+        Args:
+            company_id: Company whose endpoints to call
+            db: Database session (company and endpoints are loaded once, here)
+            http_client: Client to make the calls with; defaults to the
+                process-wide pool (bank_http_pool)
+            probe: Synthetic calls of the health prober. Recorded apart from
+                real traffic; any answer below 500 counts as the bank being up
+        """
         self.company_id = company_id
         self.db = db
+        self.http_client = http_client
+        self.probe = probe
+        # Reads started ahead of time, keyed (endpoint, account_number, user_token)
+        self._prefetched: Dict[Tuple[str, str, str], asyncio.Task] = {}
         self.company = self._get_company()
         self.endpoints = self._get_endpoints()
 
         if not self.endpoints:
             raise ValueError(f"No endpoints configured for company {company_id}")
 
+        # Precompiled response_mapping accessors (cached per company)
+        self.mapping = mapping_cache.get(company_id, self.endpoints.response_mapping)
+
     def _get_company(self) -> Company:
         """Get company from database"""
         company = self.db.query(Company).filter(Company.id == self.company_id).first()
@@ -64,8 +170,102 @@ class CompanyAPIClient:
         elif self.endpoints.auth_type == "api_key":
             headers[self.endpoints.auth_header_name] = user_token
 
+        # Propagate the trace so bank-side logs can be correlated with ours
+        active = current_span()
+        if active is not None:
+            headers["traceparent"] = active.traceparent
+
         return headers
 
+    def _timeout(self, endpoint: str) -> float:
+        """Timeout for a call, adapted to the endpoint's recent latency and the turn's remaining budget"""
+        if endpoint not in self.ADAPTIVE_TIMEOUT_ENDPOINTS:
+            return self.DEFAULT_TIMEOUT
+        return remaining_time(endpoint_scoreboard.suggest_timeout(self.company_id, endpoint, self.DEFAULT_TIMEOUT))
+
+    def adopt_prefetched(self, endpoint: str, account_number: str, user_token: str, task: asyncio.Task):
+        """
+        Let the next matching read use a call that is already running (or done)
+
+        Speculative intent parsing starts get_balance / get_recipients /
+        get_transactions (default page) for the predicted intent and hands
+        them over here once the prediction is confirmed.
+        """
+        self._prefetched[(endpoint, account_number, user_token)] = task
+
+    def discard_prefetched(self):
+        """Drop handed-over reads that the turn didn't need"""
+        for (endpoint, _, _), task in self._prefetched.items():
+            task.cancel()
+            SPECULATIVE_WORK_TOTAL.inc(work=f"bank.{endpoint}", outcome="wasted")
+        self._prefetched.clear()
+
+    def _take_prefetched(self, endpoint: str, account_number: str, user_token: str) -> Optional[asyncio.Task]:
+        task = self._prefetched.pop((endpoint, account_number, user_token), None)
+        if task is not None:
+            SPECULATIVE_WORK_TOTAL.inc(work=f"bank.{endpoint}", outcome="used")
+        return task
+
+    async def _coalesced(
+        self,
+        endpoint: str,
+        account_number: str,
+        user_token: str,
+        call: Callable[[], Awaitable[Dict[str, Any]]],
+        *params: Any
+    ) -> Dict[str, Any]:
+        """
+        Share one bank call between concurrent identical reads
+
+        The shared call runs outside any caller's trace and deadline (see
+        app/utils/singleflight.py); each caller's trace gets a bank.<endpoint>.wait
+        span for its share, and the call keeps the intent label it was started with.
+        """
+        # Keyed on the token's scope without keeping the token itself around
+        token_scope = hashlib.sha256(user_token.encode()).hexdigest()[:16]
+        key = (self.company_id, endpoint, account_number, token_scope, *params)
+        intent = _current_intent.get()
+
+        async def shared_call():
+            use_intent(intent)
+            return await call()
+
+        with span(f"bank.{endpoint}.wait", company_id=self.company_id, endpoint=endpoint) as wait_span:
+            def coalesced():
+                BANK_API_COALESCED_TOTAL.inc(company_id=self.company_id, endpoint=endpoint)
+                if wait_span is not None:
+                    wait_span.set_attribute("coalesced", True)
+
+            return await _read_flights.do(key, shared_call, on_coalesced=coalesced, stage=f"bank.{endpoint}")
+
+    @asynccontextmanager
+    async def _http(self):
+        """HTTP client for one call: the one passed in, else the shared pool"""
+        yield self.http_client if self.http_client is not None else bank_http_pool()
+
+    @asynccontextmanager
+    async def _track(self, endpoint: str):
+        """Record latency and success of one bank call (scoreboard + metrics + trace span)"""
+        start = time.perf_counter()
+        ok = False
+        with span(f"bank.{endpoint}", company_id=self.company_id, endpoint=endpoint):
+            try:
+                yield
+                ok = True
+            except httpx.HTTPStatusError as e:
+                # The synthetic account gets 401/404 from a healthy bank
+                ok = self.probe and e.response.status_code < 500
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                endpoint_scoreboard.record(self.company_id, endpoint, elapsed, ok, probe=self.probe)
+                if not self.probe:
+                    BANK_API_SECONDS.observe(
+                        elapsed,
+                        company_id=self.company_id, endpoint=endpoint, intent=_current_intent.get(),
+                        outcome="ok" if ok else "error"
+                    )
+
     async def get_balance(self, account_number: str, user_token: str) -> Dict[str, Any]:
         """
         Get account balance from company's API
@@ -77,8 +277,19 @@ class CompanyAPIClient:
         Returns:
             {"success": True, "balance": 95000.00}
         """
+        prefetched = self._take_prefetched("get_balance", account_number, user_token)
+        if prefetched is not None:
+            return await prefetched
+
+        return await self._coalesced(
+            "get_balance", account_number, user_token,
+            lambda: self._fetch_balance(account_number, user_token)
+        )
+
+    async def _fetch_balance(self, account_number: str, user_token: str) -> Dict[str, Any]:
         max_retries = 3
         for attempt in range(max_retries):
+            check_deadline("bank.get_balance")  # No retry once the turn is out of time
             try:
                 url = self._build_url(
                     self.endpoints.get_balance_endpoint,
@@ -86,15 +297,16 @@ class CompanyAPIClient:
                 )
                 headers = self._get_headers(user_token)
 
-                print(f"\n[API CLIENT] Attempt {attempt + 1}/{max_retries} - GET Balance")
-                print(f"[API CLIENT] URL: {url}")
-                print(f"[API CLIENT] Headers: {headers}")
+                async with self._track("get_balance"), self._http() as client:
+                    response = await client.get(url, headers=headers, timeout=self._timeout("get_balance"))
 
-                async with httpx.AsyncClient(timeout=30.0) as client:
-                    response = await client.get(url, headers=headers)
-
-                    print(f"[API CLIENT] Response Status: {response.status_code}")
-                    print(f"[API CLIENT] Response Body: {response.text[:500]}")
+                    # Never log headers: they carry the user's bank token
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(
+                            "Bank balance response: %s",
+                            response.text[:500],
+                            extra={"company_id": self.company_id, "status": response.status_code, "attempt": attempt + 1}
+                        )
 
                     response.raise_for_status()
 
@@ -103,9 +315,7 @@ class CompanyAPIClient:
                     # Map their response to our format
                     # They might return {"data": {"balance": 95000}}
                     # We need {"balance": 95000}
-                    balance = self._extract_balance(data)
-
-                    print(f"[API CLIENT] Successfully got balance: {balance}")
+                    balance = self.mapping.extract_balance(data)
 
                     return {
                         "success": True,
@@ -113,14 +323,23 @@ class CompanyAPIClient:
                     }
 
             except httpx.TimeoutException as e:
-                print(f"[API CLIENT ERROR] Timeout on attempt {attempt + 1}: {str(e)}")
+                logger.warning(
+                    "Bank API timeout",
+                    extra={"company_id": self.company_id, "endpoint": "get_balance", "attempt": attempt + 1}
+                )
                 if attempt == max_retries - 1:
                     return {"success": False, "error": f"Connection timeout to bank API after {max_retries} attempts"}
             except httpx.HTTPStatusError as e:
-                print(f"[API CLIENT ERROR] HTTP {e.response.status_code}: {e.response.text}")
+                logger.warning(
+                    "Bank API error response",
+                    extra={"company_id": self.company_id, "endpoint": "get_balance", "status": e.response.status_code}
+                )
                 return {"success": False, "error": f"Bank API error: {e.response.status_code}"}
             except Exception as e:
-                print(f"[API CLIENT ERROR] Unexpected error on attempt {attempt + 1}: {type(e).__name__}: {str(e)}")
+                logger.warning(
+                    "Bank API call failed: %s: %s", type(e).__name__, e,
+                    extra={"company_id": self.company_id, "endpoint": "get_balance", "attempt": attempt + 1}
+                )
                 if attempt == max_retries - 1:
                     return {"success": False, "error": f"Failed to connect to bank API: {str(e)}"}
 
@@ -137,6 +356,17 @@ class CompanyAPIClient:
                 ]
             }
         """
+        prefetched = self._take_prefetched("get_recipients", account_number, user_token)
+        if prefetched is not None:
+            return await prefetched
+
+        return await self._coalesced(
+            "get_recipients", account_number, user_token,
+            lambda: self._fetch_recipients(account_number, user_token)
+        )
+
+    async def _fetch_recipients(self, account_number: str, user_token: str) -> Dict[str, Any]:
+        check_deadline("bank.get_recipients")
         try:
             url = self._build_url(
                 self.endpoints.get_recipients_endpoint,
@@ -144,12 +374,12 @@ class CompanyAPIClient:
             )
             headers = self._get_headers(user_token)
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(url, headers=headers)
+            async with self._track("get_recipients"), self._http() as client:
+                response = await client.get(url, headers=headers, timeout=self._timeout("get_recipients"))
                 response.raise_for_status()
 
                 data = response.json()
-                recipients = self._extract_recipients(data)
+                recipients = self.mapping.extract_recipients(data)
 
                 return {
                     "success": True,
@@ -162,6 +392,98 @@ class CompanyAPIClient:
                 "error": str(e)
             }
 
+    async def get_transactions(
+        self,
+        account_number: str,
+        user_token: str,
+        limit: int = 10,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get recent transactions from company's API
+
+        The limit/cursor are sent to the bank as query parameters. The body is
+        parsed incrementally as it streams in, and we stop reading once `limit`
+        transactions have been decoded, so banks that ignore the limit and send
+        their whole history don't cost us a full download and json.loads.
+        Such a response comes back with truncated=True and no cursor: the
+        bank's cursor would point past the items we skipped.
+
+        Returns:
+            {
+                "success": True,
+                "transactions": [...],
+                "next_cursor": "abc123",  # None if the bank didn't send one, or truncated
+                "truncated": False  # True if the bank sent more than limit
+            }
+        """
+        if not self.endpoints.get_transactions_endpoint:
+            return {
+                "success": False,
+                "error": "Transaction history is not available for this bank"
+            }
+
+        if limit == 10 and cursor is None:
+            prefetched = self._take_prefetched("get_transactions", account_number, user_token)
+            if prefetched is not None:
+                return await prefetched
+
+        return await self._coalesced(
+            "get_transactions", account_number, user_token,
+            lambda: self._fetch_transactions(account_number, user_token, limit, cursor),
+            limit, cursor
+        )
+
+    async def _fetch_transactions(
+        self,
+        account_number: str,
+        user_token: str,
+        limit: int,
+        cursor: Optional[str]
+    ) -> Dict[str, Any]:
+        check_deadline("bank.get_transactions")
+        mapping = self.mapping
+
+        try:
+            url = self._build_url(
+                self.endpoints.get_transactions_endpoint,
+                account_number=account_number
+            )
+            headers = self._get_headers(user_token)
+
+            params = {mapping.limit_param: limit}
+            if cursor:
+                params[mapping.cursor_param] = cursor
+
+            async with self._track("get_transactions"), self._http() as client:
+                async with client.stream(
+                    "GET", url, headers=headers, params=params, timeout=self._timeout("get_transactions")
+                ) as response:
+                    response.raise_for_status()
+
+                    reader = await stream_json_array(
+                        response.aiter_bytes(),
+                        item_paths=mapping.transactions_paths,
+                        capture_paths={"next_cursor": mapping.next_cursor_path},
+                        limit=limit
+                    )
+
+            if not reader.found:
+                raise ValueError("Could not extract transactions from response")
+
+            return {
+                "success": True,
+                "transactions": mapping.normalize_transactions(reader.items),
+                "next_cursor": None if reader.truncated else reader.captured.get("next_cursor"),
+                "truncated": reader.truncated
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
     async def initiate_transfer(
         self,
         sender_account: str,
@@ -194,8 +516,10 @@ class CompanyAPIClient:
                 "narration": narration
             }
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(url, headers=headers, json=payload)
+            async with self._track("initiate_transfer"), self._http() as client:
+                response = await client.post(
+                    url, headers=headers, json=payload, timeout=self._timeout("initiate_transfer")
+                )
                 response.raise_for_status()
 
                 data = response.json()
@@ -238,8 +562,8 @@ class CompanyAPIClient:
 
             payload = {"pin": pin}
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(url, headers=headers, json=payload)
+            async with self._track("confirm_transfer"), self._http() as client:
+                response = await client.post(url, headers=headers, json=payload, timeout=self._timeout("confirm_transfer"))
                 response.raise_for_status()
 
                 data = response.json()
@@ -272,8 +596,8 @@ class CompanyAPIClient:
             )
             headers = self._get_headers(user_token)
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(url, headers=headers)
+            async with self._track("cancel_transfer"), self._http() as client:
+                response = await client.post(url, headers=headers, timeout=self._timeout("cancel_transfer"))
                 response.raise_for_status()
 
                 return {"success": True, "message": "Transfer cancelled"}
@@ -281,54 +605,6 @@ class CompanyAPIClient:
         except Exception as e:
             return {"success": False, "error": str(e)}
 
-    # Helper methods to extract data from company's response format
-    def _extract_balance(self, response_data: Dict) -> float:
-        """Extract balance from company's response format"""
-        # Try common response formats
-        if "balance" in response_data:
-            return float(response_data["balance"])
-        elif "data" in response_data and "balance" in response_data["data"]:
-            return float(response_data["data"]["balance"])
-        elif "account" in response_data and "balance" in response_data["account"]:
-            return float(response_data["account"]["balance"])
-
-        # Use custom mapping if provided
-        if self.endpoints.response_mapping and "balance_path" in self.endpoints.response_mapping:
-            path = self.endpoints.response_mapping["balance_path"].split(".")
-            value = response_data
-            for key in path:
-                value = value[key]
-            return float(value)
-
-        raise ValueError("Could not extract balance from response")
-
-    def _extract_recipients(self, response_data: Dict) -> list:
-        """Extract recipients list from company's response format"""
-        # If response is directly a list (Demo Bank format)
-        if isinstance(response_data, list):
-            return response_data
-
-        # Try common response formats
-        if "recipients" in response_data:
-            return response_data["recipients"]
-        elif "beneficiaries" in response_data:
-            return response_data["beneficiaries"]
-        elif "data" in response_data:
-            if isinstance(response_data["data"], list):
-                return response_data["data"]
-            elif "recipients" in response_data["data"]:
-                return response_data["data"]["recipients"]
-
-        # Use custom mapping if provided
-        if self.endpoints.response_mapping and "recipients_path" in self.endpoints.response_mapping:
-            path = self.endpoints.response_mapping["recipients_path"].split(".")
-            value = response_data
-            for key in path:
-                value = value[key]
-            return value
-
-        raise ValueError("Could not extract recipients from response")
-
 
 # Factory function to get client for a company
 def get_company_api_client(company_id: int, db: Session) -> CompanyAPIClient:
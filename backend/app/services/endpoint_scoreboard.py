@@ -0,0 +1,89 @@
+"""
+Endpoint Latency Scoreboard
+
+Keeps a rolling latency histogram per (company, endpoint). Every call made by
+CompanyAPIClient lands here, so the scoreboard reflects how each bank is
+behaving right now. The client consults it to size its timeouts instead of
+always waiting 30 seconds.
+
+The health prober's synthetic calls are kept in histograms of their own: a
+bank answers the synthetic account with fast 4xx responses, which would
+otherwise drag p99 (and with it the timeouts) down and inflate the error rate
+of companies with little real traffic.
+"""
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from app.core.config import settings
+from app.utils.latency import RollingHistogram
+
+
+class EndpointScoreboard:
+    """Rolling p50/p95/p99 latency and error rate per bank endpoint"""
+
+    # Need this many recent samples before we trust the numbers for timeouts
+    MIN_SAMPLES_FOR_TIMEOUT = 20
+
+    def __init__(self, window_seconds: float = 300.0):
+        self.window_seconds = window_seconds
+        self._histograms: Dict[Tuple[int, str], RollingHistogram] = {}
+        self._probe_histograms: Dict[Tuple[int, str], RollingHistogram] = {}
+
+    def record(self, company_id: int, endpoint: str, seconds: float, ok: bool, probe: bool = False):
+        """Record one call to a bank endpoint (probe=True for the health prober's calls)"""
+        histograms = self._probe_histograms if probe else self._histograms
+        key = (company_id, endpoint)
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = RollingHistogram(window_seconds=self.window_seconds)
+            histograms[key] = histogram
+        histogram.observe(seconds, ok)
+
+    def endpoint_stats(self, company_id: int, endpoint: str) -> Dict:
+        histogram = self._histograms.get((company_id, endpoint))
+        if histogram is None:
+            return RollingHistogram(window_seconds=self.window_seconds).summary()
+        return histogram.summary()
+
+    def snapshot(self, company_id: int) -> Dict[str, Dict]:
+        """
+        Stats for every endpoint we've seen for a company
+
+        Real traffic at the top level, the prober's calls under "probe".
+        """
+        endpoints = {
+            endpoint for cid, endpoint in (*self._histograms, *self._probe_histograms) if cid == company_id
+        }
+        result = {}
+        for endpoint in sorted(endpoints):
+            stats = self._stats(self._histograms.get((company_id, endpoint)))
+            stats["probe"] = self._stats(self._probe_histograms.get((company_id, endpoint)))
+            result[endpoint] = stats
+        return result
+
+    def _stats(self, histogram: Optional[RollingHistogram]) -> Dict:
+        if histogram is None:
+            histogram = RollingHistogram(window_seconds=self.window_seconds)
+        stats = histogram.summary()
+        stats["last_call_at"] = (
+            datetime.utcfromtimestamp(histogram.last_observed_at).isoformat()
+            if histogram.last_observed_at else None
+        )
+        return stats
+
+    def suggest_timeout(self, company_id: int, endpoint: str, default: float) -> float:
+        """
+        Pick a request timeout from recent latency
+
+        Uses a multiple of the observed p99, clamped between the configured
+        floor and `default`. Falls back to `default` until we have enough data.
+        """
+        stats = self.endpoint_stats(company_id, endpoint)
+        if stats["samples"] < self.MIN_SAMPLES_FOR_TIMEOUT or stats["p99_ms"] is None:
+            return default
+
+        adaptive = stats["p99_ms"] / 1000 * settings.ADAPTIVE_TIMEOUT_MULTIPLIER
+        return max(settings.ADAPTIVE_TIMEOUT_FLOOR_SECONDS, min(default, adaptive))
+
+
+# Global scoreboard instance
+endpoint_scoreboard = EndpointScoreboard(window_seconds=settings.HEALTH_WINDOW_SECONDS)
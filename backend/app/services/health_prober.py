@@ -0,0 +1,103 @@
+"""
+Bank Endpoint Health Prober
+
+Periodically calls the cheap read endpoints (balance, recipients, transactions)
+of every active company against a synthetic account. The calls go through
+CompanyAPIClient in probe mode: they land on the endpoint scoreboard next to,
+not mixed with, real traffic, and only transport errors and 5xx count as
+failures (a healthy bank answers the synthetic account with 401/404). This way
+a slow or broken bank shows up on /api/v1/companies/{id}/health before users
+start timing out.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.company import Company, CompanyEndpoints
+from app.services.company_api_client import CompanyAPIClient
+
+logger = logging.getLogger(__name__)
+
+
+class HealthProber:
+    """Background task that probes every active company's read endpoints"""
+
+    def __init__(self, interval_seconds: int = 60):
+        self.interval_seconds = interval_seconds
+        self.last_probe_at: Dict[int, datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start probing in the background (call from the app's startup hook)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.probe_all()
+            except Exception:
+                logger.exception("Health probe cycle failed")
+            await asyncio.sleep(self.interval_seconds)
+
+    def _active_company_ids(self):
+        db = SessionLocal()
+        try:
+            rows = db.query(CompanyEndpoints.company_id).join(
+                Company, Company.id == CompanyEndpoints.company_id
+            ).filter(
+                Company.is_active == True,
+                CompanyEndpoints.is_active == True
+            ).all()
+            return [row[0] for row in rows]
+        finally:
+            db.close()
+
+    async def probe_all(self):
+        """Probe every active company concurrently"""
+        company_ids = await asyncio.to_thread(self._active_company_ids)
+        await asyncio.gather(*(self.probe_company(cid) for cid in company_ids))
+
+    def _build_client(self, company_id: int) -> Optional[CompanyAPIClient]:
+        """Load the company's config into a probe client (blocking DB work)"""
+        db = SessionLocal()
+        try:
+            return CompanyAPIClient(company_id=company_id, db=db, probe=True)
+        except ValueError:
+            return None
+        finally:
+            # The client reads its config once, in __init__; the probes don't touch the DB
+            db.close()
+
+    async def probe_company(self, company_id: int):
+        """Call each cheap endpoint once with the synthetic account"""
+        client = await asyncio.to_thread(self._build_client, company_id)
+        if client is None:
+            return
+
+        account = settings.HEALTH_PROBE_ACCOUNT
+        token = settings.HEALTH_PROBE_TOKEN
+        probes = [
+            client.get_balance(account_number=account, user_token=token),
+            client.get_recipients(account_number=account, user_token=token),
+        ]
+        if client.endpoints.get_transactions_endpoint:
+            probes.append(client.get_transactions(account_number=account, user_token=token, limit=1))
+
+        await asyncio.gather(*probes)
+        self.last_probe_at[company_id] = datetime.utcnow()
+
+
+# Global prober instance
+health_prober = HealthProber(interval_seconds=settings.HEALTH_PROBE_INTERVAL_SECONDS)
@@ -0,0 +1,316 @@
+"""
+Background Job Queue
+
+Runs non-interactive work (receipts, notifications, audit records) off the
+request path. Jobs are persisted in their own SQLite file before enqueue()
+returns, so they survive a restart. A fixed number of asyncio workers
+(JOB_WORKERS) run them. A failed job is retried with exponential backoff;
+after max_attempts it is moved to the dead-letter state for an operator to
+inspect or retry.
+
+    @job_queue.job("transfer.receipt", max_attempts=5)
+    async def send_receipt(payload: dict):
+        ...
+
+    job_queue.enqueue("transfer.receipt", {"email": ..., "amount": ...})
+
+Handlers get the JSON payload back and should be idempotent: a job that was
+running when the process died is run again on the next start.
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from app.core.config import settings
+from app.core.metrics import JOB_QUEUE_DEPTH, JOB_SECONDS, JOBS_TOTAL
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DEAD = "dead"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_at REAL NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, run_at);
+"""
+
+
+class JobQueue:
+    """SQLite-backed queue with a pool of asyncio workers"""
+
+    def __init__(
+        self,
+        path: str = "./jobs.db",
+        workers: int = 4,
+        max_attempts: int = 5,
+        retry_backoff_seconds: float = 2.0,
+        job_timeout_seconds: float = 60.0,
+        poll_interval_seconds: float = 1.0
+    ):
+        self.path = path
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.job_timeout_seconds = job_timeout_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+
+        self._handlers: Dict[str, JobHandler] = {}
+        self._max_attempts: Dict[str, int] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+
+    # ------------------------------------------------------------------
+    # Registration and enqueueing
+    # ------------------------------------------------------------------
+
+    def job(self, name: str, max_attempts: Optional[int] = None):
+        """Decorator registering an async handler for a job name"""
+        def register(handler: JobHandler) -> JobHandler:
+            self._handlers[name] = handler
+            if max_attempts is not None:
+                self._max_attempts[name] = max_attempts
+            return handler
+        return register
+
+    def enqueue(self, name: str, payload: Dict[str, Any], delay_seconds: float = 0.0) -> int:
+        """
+        Persist a job and wake a worker
+
+        Args:
+            name: Registered job name
+            payload: JSON-serializable arguments for the handler
+            delay_seconds: Don't run before this much time has passed
+
+        Returns:
+            Job id
+
+        Raises:
+            ValueError: No handler registered under this name
+        """
+        if name not in self._handlers:
+            raise ValueError(f"Unknown job: {name}")
+
+        now = time.time()
+        with self._lock:
+            cursor = self._db().execute(
+                "INSERT INTO jobs (name, payload, status, max_attempts, run_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (name, json.dumps(payload, default=str), QUEUED,
+                 self._max_attempts.get(name, self.max_attempts), now + delay_seconds, now, now)
+            )
+            job_id = cursor.lastrowid
+
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_id
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Recover interrupted jobs and start the workers (call from the app's startup hook)"""
+        if self._tasks:
+            return
+
+        with self._lock:
+            recovered = self._db().execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ?",
+                (QUEUED, time.time(), RUNNING)
+            ).rowcount
+        if recovered:
+            logger.warning("Re-queued %d jobs interrupted by the last shutdown", recovered)
+
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self, timeout: float = 10.0):
+        """Let running jobs finish (up to timeout), then stop; queued jobs stay for the next start"""
+        if not self._tasks:
+            return
+        tasks, self._tasks = self._tasks, []
+        self._stopping = True
+        self._wakeup.set()
+
+        _, unfinished = await asyncio.wait(tasks, timeout=timeout)
+        for task in unfinished:
+            task.cancel()
+        if unfinished:
+            await asyncio.wait(unfinished)
+        self._wakeup = None
+
+    # ------------------------------------------------------------------
+    # Inspection
+    # ------------------------------------------------------------------
+
+    def depth(self, status: str = QUEUED) -> int:
+        with self._lock:
+            (count,) = self._db().execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (status,)).fetchone()
+        return count
+
+    def dead_letters(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent jobs that ran out of attempts"""
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT id, name, payload, attempts, last_error, created_at, updated_at FROM jobs "
+                "WHERE status = ? ORDER BY updated_at DESC LIMIT ?",
+                (DEAD, limit)
+            ).fetchall()
+        return [
+            {
+                "id": row[0],
+                "name": row[1],
+                "payload": json.loads(row[2]),
+                "attempts": row[3],
+                "last_error": row[4],
+                "created_at": row[5],
+                "failed_at": row[6],
+            }
+            for row in rows
+        ]
+
+    def retry_dead(self, job_id: int) -> bool:
+        """Put a dead-lettered job back in the queue with fresh attempts"""
+        now = time.time()
+        with self._lock:
+            updated = self._db().execute(
+                "UPDATE jobs SET status = ?, attempts = 0, run_at = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (QUEUED, now, now, job_id, DEAD)
+            ).rowcount
+        if updated and self._wakeup is not None:
+            self._wakeup.set()
+        return bool(updated)
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    async def _worker(self):
+        while not self._stopping:
+            job = self._claim()
+            if job is None:
+                await self._idle()
+                continue
+            await self._run(*job)
+
+    async def _idle(self):
+        if self._stopping:
+            return
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval_seconds)
+        except asyncio.TimeoutError:
+            pass  # Poll anyway: delayed retries become due without a wakeup
+
+    def _claim(self):
+        """Mark the next due job as running; returns (id, name, payload, attempts, max_attempts) or None"""
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                "SELECT id, name, payload, attempts, max_attempts FROM jobs "
+                "WHERE status = ? AND run_at <= ? ORDER BY run_at, id LIMIT 1",
+                (QUEUED, now)
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (RUNNING, now, row[0])
+            )
+        job_id, name, payload, attempts, max_attempts = row
+        return job_id, name, json.loads(payload), attempts + 1, max_attempts
+
+    async def _run(self, job_id: int, name: str, payload: Dict[str, Any], attempt: int, max_attempts: int):
+        handler = self._handlers.get(name)
+        start = time.perf_counter()
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job {name!r}")
+            await asyncio.wait_for(handler(payload), timeout=self.job_timeout_seconds)
+        except asyncio.CancelledError:
+            # Shutting down mid-job: it runs again on the next start
+            self._update(job_id, QUEUED, time.time(), "Interrupted by shutdown")
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            if attempt >= max_attempts:
+                self._update(job_id, DEAD, time.time(), error)
+                JOBS_TOTAL.inc(job=name, outcome="dead")
+                logger.error(
+                    "Job dead-lettered after %d attempts: %s", attempt, error,
+                    extra={"job": name, "job_id": job_id}
+                )
+            else:
+                delay = self.retry_backoff_seconds * 2 ** (attempt - 1)
+                self._update(job_id, QUEUED, time.time() + delay, error)
+                JOBS_TOTAL.inc(job=name, outcome="retry")
+                logger.warning(
+                    "Job failed (attempt %d/%d), retrying in %.1fs: %s", attempt, max_attempts, delay, error,
+                    extra={"job": name, "job_id": job_id}
+                )
+            return
+        finally:
+            JOB_SECONDS.observe(time.perf_counter() - start, job=name)
+
+        with self._lock:
+            self._db().execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        JOBS_TOTAL.inc(job=name, outcome="done")
+
+    def _update(self, job_id: int, status: str, run_at: float, error: str):
+        with self._lock:
+            self._db().execute(
+                "UPDATE jobs SET status = ?, run_at = ?, last_error = ?, updated_at = ? WHERE id = ?",
+                (status, run_at, error, time.time(), job_id)
+            )
+
+    def _db(self) -> sqlite3.Connection:
+        # Opened lazily so importing the module never touches the filesystem; callers hold _lock
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")  # Durable across process crashes; WAL keeps inserts cheap
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+
+# Global job queue instance
+job_queue = JobQueue(
+    path=settings.JOB_QUEUE_PATH,
+    workers=settings.JOB_WORKERS,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    retry_backoff_seconds=settings.JOB_RETRY_BACKOFF_SECONDS,
+    job_timeout_seconds=settings.JOB_TIMEOUT_SECONDS
+)
+JOB_QUEUE_DEPTH.set_function(lambda: job_queue.depth(QUEUED), status=QUEUED)
+JOB_QUEUE_DEPTH.set_function(lambda: job_queue.depth(DEAD), status=DEAD)
@@ -1,7 +1,71 @@
-from openai import OpenAI
 from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS_TOTAL
+from app.core.deadline import DeadlineExceeded, remaining_time, within_deadline
+from app.core.tracing import span
+from app.services.tenant_scheduler import model_slot
+from app.utils.lazy import LazyService
+import asyncio
+import copy
 import json
-from typing import Dict, Optional
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Session keys that mean a conversation is mid-transfer; the same words then
+# depend on the context ("yes", "1234", "Chioma"), so they are never cached
+_IN_PROGRESS_KEYS = (
+    "pending_transfer", "awaiting_pin", "pending_recipients", "awaiting_transfer_details",
+    "pending_amount", "pending_recipient_name", "transfer_state"
+)
+
+# Intents that follow from the words alone
+_CACHEABLE_INTENTS = {"check_balance", "view_recipients", "view_transactions", "transfer", "greeting", "help"}
+
+
+class IntentCache:
+    """
+    Parsed intents of context-free utterances ("what is my balance"), so the
+    most common requests skip the LLM. LRU-bounded, entries expire after ttl.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[Dict, float]]" = OrderedDict()
+
+    @staticmethod
+    def key(transcript: str, context: Optional[Dict]) -> Optional[str]:
+        """Cache key for a parse, or None when the context could change the answer"""
+        if context and any(context.get(k) for k in _IN_PROGRESS_KEYS):
+            return None
+        normalized = " ".join(re.sub(r"[^\w\s]", " ", transcript.lower()).split())
+        return normalized or None
+
+    def get(self, key: str) -> Optional[Dict]:
+        entry = self._entries.get(key)
+        if entry is None or entry[1] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            CACHE_REQUESTS_TOTAL.inc(cache="intent", result="miss")
+            return None
+        self._entries.move_to_end(key)
+        CACHE_REQUESTS_TOTAL.inc(cache="intent", result="hit")
+        return copy.deepcopy(entry[0])  # Callers fill in / change entities
+
+    def put(self, key: str, result: Dict):
+        if self.max_entries <= 0 or result.get("intent") not in _CACHEABLE_INTENTS:
+            return
+        self._entries[key] = (copy.deepcopy(result), time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
 
 
 class LLMService:
@@ -10,12 +74,34 @@ class LLMService:
     Updated: 2025-10-25
     """
 
+    # Per-call timeout; a turn's deadline may cut it shorter
+    TIMEOUT = 30.0
+
     def __init__(self):
+        # Imported here: the SDK takes ~0.5s to import, which cold starts shouldn't wait for
+        from openai import OpenAI
+
         # Use Together AI with new OpenAI client
         self.client = OpenAI(
             api_key=settings.TOGETHER_API_KEY,
             base_url="https://api.together.xyz/v1"
         )
+        self.intent_cache = IntentCache(
+            max_entries=settings.LLM_INTENT_CACHE_SIZE,
+            ttl_seconds=settings.LLM_INTENT_CACHE_TTL_SECONDS
+        )
+
+    async def prime_intent_cache(self, utterances: Iterable[str]) -> int:
+        """
+        Parse common utterances ahead of time (startup warm-up)
+
+        Returns:
+            How many ended up cached
+        """
+        results = await asyncio.gather(
+            *(self.parse_intent(text) for text in utterances), return_exceptions=True
+        )
+        return sum(1 for r in results if isinstance(r, dict) and r.get("intent") in _CACHEABLE_INTENTS)
 
     async def parse_intent(self, transcript: str, context: Optional[Dict] = None) -> Dict:
         """
@@ -135,26 +221,24 @@ NEXT_STEP values:
 - clarify: Need more information
 """
 
+        cache_key = self.intent_cache.key(transcript, context)
+        if cache_key is not None:
+            cached = self.intent_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         user_prompt = f"User said: '{transcript}'"
 
         if context:
             user_prompt += f"\n\nContext: {json.dumps(context)}"
 
         try:
-            response = self.client.chat.completions.create(
-                model="meta-llama/Meta-Llama-3.1-8B-Instruct-Turbo",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.3,  # Low temperature for consistent parsing
-                max_tokens=200
-            )
+            response = await within_deadline(self._complete(system_prompt, user_prompt), "llm")
 
             # Parse LLM response
             result_text = response.choices[0].message.content.strip()
 
-            print(f"[LLM DEBUG] Raw LLM response: {result_text}")
+            logger.debug("Raw LLM response: %s", result_text)
 
             # Extract JSON from response (in case LLM adds extra text)
             if "```json" in result_text:
@@ -183,7 +267,7 @@ NEXT_STEP values:
 
             result = json.loads(result_text)
 
-            print(f"[LLM DEBUG] Parsed JSON result: {result}")
+            logger.debug("Parsed LLM result: %s", result)
 
             # Validate required fields
             if "intent" not in result:
@@ -195,12 +279,14 @@ NEXT_STEP values:
             if "next_step" not in result:
                 result["next_step"] = "clarify"
 
+            if cache_key is not None:
+                self.intent_cache.put(cache_key, result)
             return result
 
         except json.JSONDecodeError as e:
             # LLM didn't return valid JSON
-            print(f"[LLM ERROR] JSON parsing failed: {e}")
-            print(f"[LLM ERROR] Raw response was: {result_text}")
+            logger.warning("LLM returned invalid JSON: %s", e)
+            logger.debug("Unparseable LLM response: %s", result_text)
             return {
                 "intent": "unknown",
                 "confidence": 0.0,
@@ -208,11 +294,11 @@ NEXT_STEP values:
                 "next_step": "clarify",
                 "error": f"Failed to parse LLM response: {str(e)}"
             }
+        except DeadlineExceeded:
+            raise  # Let the turn answer with a timeout rather than "I didn't understand"
         except Exception as e:
             # Other errors (API errors, etc.)
-            print(f"[LLM ERROR] Exception occurred: {type(e).__name__}: {str(e)}")
-            import traceback
-            print(f"[LLM ERROR] Full traceback: {traceback.format_exc()}")
+            logger.exception("LLM intent parsing failed: %s: %s", type(e).__name__, e)
             return {
                 "intent": "unknown",
                 "confidence": 0.0,
@@ -221,6 +307,27 @@ NEXT_STEP values:
                 "error": f"{type(e).__name__}: {str(e)}"
             }
 
+    async def _complete(self, system_prompt: str, user_prompt: str):
+        """One chat completion, in this company's share of the LLM capacity"""
+        async with model_slot("llm"):
+            with span("llm.parse_intent", model="meta-llama/Meta-Llama-3.1-8B-Instruct-Turbo") as llm_span:
+                # The SDK call is blocking; keep it off the event loop so other turns
+                # (and speculative parses) run while we wait for the model
+                response = await asyncio.to_thread(
+                    self.client.chat.completions.create,
+                    model="meta-llama/Meta-Llama-3.1-8B-Instruct-Turbo",
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    temperature=0.3,  # Low temperature for consistent parsing
+                    max_tokens=200,
+                    timeout=remaining_time(self.TIMEOUT)
+                )
+                if llm_span is not None and response.usage is not None:
+                    llm_span.set_attribute("completion_tokens", response.usage.completion_tokens)
+        return response
+
     def convert_words_to_number(self, text: str) -> Optional[int]:
         """
         Convert spoken numbers to integers
@@ -260,5 +367,5 @@ NEXT_STEP values:
         return total if total > 0 else None
 
 
-# Singleton instance
-llm_service = LLMService()
+# Singleton instance (built on first use or by the startup warm-up)
+llm_service: LLMService = LazyService(LLMService, "llm")
@@ -0,0 +1,98 @@
+"""
+Post-transfer Notifications
+
+Receipts and audit records for completed transfers. They run as background
+jobs (see job_queue.py) so a slow mail server never holds up the response
+that tells the user their money has moved; a failed send is retried and,
+after JOB_MAX_ATTEMPTS, dead-lettered.
+"""
+import asyncio
+import logging
+import smtplib
+from email.message import EmailMessage
+from typing import Any, Dict, Optional
+from app.core.config import settings
+from app.services.job_queue import job_queue
+
+logger = logging.getLogger(__name__)
+
+# Audit records go to their own logger so they can be routed to a separate sink
+audit_logger = logging.getLogger("echobank.audit")
+
+RECEIPT_JOB = "transfer.receipt"
+AUDIT_JOB = "transfer.audit"
+
+
+@job_queue.job(RECEIPT_JOB)
+async def send_transfer_receipt(payload: Dict[str, Any]):
+    """Email a transfer receipt to the sender"""
+    message = EmailMessage()
+    message["From"] = settings.EMAIL_SENDER
+    message["To"] = payload["email"]
+    message["Subject"] = f"EchoBank transfer receipt {payload['transaction_ref']}"
+    message.set_content(
+        f"Hello {payload.get('sender_name') or 'there'},\n\n"
+        f"You sent ₦{float(payload['amount']):,.2f} to {payload['recipient_name']}.\n"
+        f"Reference: {payload['transaction_ref']}\n"
+        f"Date: {payload.get('completed_at') or ''}\n\n"
+        f"EchoBank"
+    )
+    await asyncio.to_thread(_send_email, message)
+
+
+def _send_email(message: EmailMessage):
+    with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=30) as smtp:
+        smtp.starttls()
+        smtp.login(settings.EMAIL_SENDER, settings.EMAIL_PASSWORD)
+        smtp.send_message(message)
+
+
+@job_queue.job(AUDIT_JOB)
+async def record_transfer_audit(payload: Dict[str, Any]):
+    """Write the structured audit record for a completed transfer"""
+    audit_logger.info("Transfer completed", extra={"audit": payload})
+
+
+def notify_transfer_completed(
+    transaction_ref: str,
+    amount: float,
+    recipient_name: str,
+    email: Optional[str] = None,
+    sender_name: Optional[str] = None,
+    **audit_fields: Any
+):
+    """
+    Queue the receipt (when there is an email to send it to) and the audit record
+
+    Never raises: the transfer has already happened, so a queue failure is
+    logged rather than turned into an error for the user.
+
+    Args:
+        transaction_ref: Bank's reference for the transfer
+        amount: Amount sent
+        recipient_name: Who it was sent to
+        email: Sender's email for the receipt
+        sender_name: Sender's name for the receipt greeting
+        **audit_fields: Extra context for the audit record (company_id, session_id, ...)
+    """
+    try:
+        job_queue.enqueue(AUDIT_JOB, {
+            "transaction_ref": transaction_ref,
+            "amount": amount,
+            "recipient_name": recipient_name,
+            **audit_fields
+        })
+        if email:
+            job_queue.enqueue(RECEIPT_JOB, {
+                "email": email,
+                "sender_name": sender_name,
+                "transaction_ref": transaction_ref,
+                "amount": amount,
+                "recipient_name": recipient_name,
+                "completed_at": audit_fields.get("completed_at")
+            })
+    except Exception as e:
+        logger.error(
+            "Couldn't queue transfer notifications: %s", e,
+            extra={"transaction_ref": transaction_ref}
+        )
@@ -0,0 +1,34 @@
+"""
+Fixed assistant replies
+
+Replies that never change from turn to turn. Keeping them in one place lets
+the startup warm-up render them to audio ahead of time (see
+TTSService.prerender), so these turns skip TTS entirely.
+"""
+
+GREETING_TEXT = (
+    "Hello! I'm your voice banking assistant. I can help you check your balance, send money, "
+    "view recipients, or check transactions. What would you like to do?"
+)
+HELP_TEXT = (
+    "I can help you with: checking your balance, sending money to saved recipients, viewing your "
+    "recipients, checking transaction history, or adding new recipients. Just tell me what you'd like to do!"
+)
+NOT_UNDERSTOOD_TEXT = "I didn't quite understand that. Could you please rephrase your request?"
+NO_SPEECH_TEXT = "I didn't hear anything. Please try again."
+TIMEOUT_TEXT = "Sorry, that's taking longer than it should. Please try again."
+TRANSFER_DETAILS_TEXT = "I can help you with that transfer. Who would you like to send money to and how much?"
+PIN_PROMPT_TEXT = "Please enter your 4-digit PIN to complete the transfer."
+TRANSFER_CANCELLED_TEXT = "Transfer cancelled. How else can I help you?"
+
+# Rendered to audio by the warm-up
+STATIC_PROMPTS = (
+    GREETING_TEXT,
+    HELP_TEXT,
+    NOT_UNDERSTOOD_TEXT,
+    NO_SPEECH_TEXT,
+    TIMEOUT_TEXT,
+    TRANSFER_DETAILS_TEXT,
+    PIN_PROMPT_TEXT,
+    TRANSFER_CANCELLED_TEXT,
+)
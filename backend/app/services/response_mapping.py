@@ -0,0 +1,287 @@
+"""
+Response Mapping Compiler
+
+Banks describe where their data lives with `response_mapping`, e.g.
+    {"balance_path": "data.account.balance", "recipients_path": "data.beneficiaries"}
+
+Rather than splitting these strings and probing response shapes on every call,
+we compile a company's mapping once into plain accessor functions and cache the
+result alongside the company config. Recipient and transaction lists are also
+projected onto our canonical field names here, so the orchestrator can rely on
+`recipient["name"]` instead of guessing between `name`/`recipient_name`/etc.
+List entries that aren't objects (a stray string or null) are dropped.
+
+Mappings are validated strictly when a bank saves them. Configs stored before
+validation existed are compiled leniently: a key that doesn't compile is
+logged and skipped, and the defaults apply for it.
+"""
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.core.metrics import CACHE_REQUESTS_TOTAL
+
+logger = logging.getLogger(__name__)
+
+Path = Tuple[str, ...]
+Getter = Callable[[Any], Any]
+
+_MISSING = object()
+
+PATH_KEYS = ("balance_path", "recipients_path", "transactions_path", "next_cursor_path")
+FIELD_KEYS = ("recipient_fields", "transaction_fields")
+PARAM_KEYS = ("transactions_limit_param", "transactions_cursor_param")
+
+# Shapes we try when the bank hasn't told us where the data is
+DEFAULT_BALANCE_PATHS: List[Path] = [("balance",), ("data", "balance"), ("account", "balance")]
+DEFAULT_RECIPIENTS_PATHS: List[Path] = [
+    (),
+    ("recipients",),
+    ("beneficiaries",),
+    ("data",),
+    ("data", "recipients"),
+]
+DEFAULT_TRANSACTIONS_PATHS: List[Path] = [
+    (),
+    ("transactions",),
+    ("data",),
+    ("data", "transactions"),
+    ("history",),
+]
+
+# Canonical field -> aliases banks commonly use, in priority order
+RECIPIENT_FIELD_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "name": ("recipient_name", "name", "beneficiary_name", "account_name"),
+    "account_number": ("account_number", "recipient_account", "accountNumber"),
+    "bank_code": ("bank_code", "bankCode"),
+    "bank_name": ("bank_name", "bankName"),
+}
+TRANSACTION_FIELD_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "transaction_type": ("transaction_type", "type"),
+    "amount": ("amount",),
+    "recipient_name": ("recipient_name", "beneficiary_name", "counterparty"),
+    "status": ("status",),
+    "timestamp": ("timestamp", "created_at", "date"),
+}
+
+
+class ResponseMappingError(ValueError):
+    """Raised when a company's response_mapping can't be compiled"""
+    pass
+
+
+# ============================================================================
+# COMPILATION
+# ============================================================================
+
+def _parse_path(key: str, value: Any) -> Path:
+    if not isinstance(value, str) or not value.strip():
+        raise ResponseMappingError(f"{key} must be a non-empty dotted path like 'data.balance'")
+    path = tuple(part.strip() for part in value.split("."))
+    if any(not part for part in path):
+        raise ResponseMappingError(f"{key} has an empty segment: '{value}'")
+    return path
+
+
+def _compile_getter(path: Path) -> Getter:
+    """Build a function that walks `path`, returning _MISSING instead of raising"""
+    steps = tuple(int(part) if part.isdigit() else part for part in path)
+
+    def getter(data: Any) -> Any:
+        for step in steps:
+            if isinstance(step, int):
+                if not isinstance(data, list) or step >= len(data):
+                    return _MISSING
+                data = data[step]
+            else:
+                if not isinstance(data, dict) or step not in data:
+                    return _MISSING
+                data = data[step]
+        return data
+
+    return getter
+
+
+def _compile_projection(
+    aliases: Dict[str, Tuple[str, ...]],
+    overrides: Optional[Dict[str, str]]
+) -> Callable[[Dict], Dict]:
+    """Build a function that fills canonical fields from the bank's field names"""
+    sources = []
+    for field, names in aliases.items():
+        if overrides and field in overrides:
+            names = (overrides[field],) + names
+        sources.append((field, names))
+
+    def project(item: Dict) -> Dict:
+        projected = dict(item)
+        for field, names in sources:
+            for name in names:
+                value = item.get(name)
+                if value is not None:
+                    projected[field] = value
+                    break
+            else:
+                projected.setdefault(field, None)
+        return projected
+
+    return project
+
+
+def _validate_fields(key: str, value: Any, aliases: Dict[str, Tuple[str, ...]]) -> Dict[str, str]:
+    if not isinstance(value, dict):
+        raise ResponseMappingError(f"{key} must be an object mapping our field names to yours")
+    unknown = set(value) - set(aliases)
+    if unknown:
+        raise ResponseMappingError(
+            f"{key} has unknown fields {sorted(unknown)}. Supported: {sorted(aliases)}"
+        )
+    for field, name in value.items():
+        if not isinstance(name, str) or not name:
+            raise ResponseMappingError(f"{key}.{field} must be a non-empty string")
+    return value
+
+
+def _validate_param(key: str, value: Any) -> str:
+    if not isinstance(value, str) or not value:
+        raise ResponseMappingError(f"{key} must be a non-empty string")
+    return value
+
+
+class CompiledMapping:
+    """Precompiled accessors for one company's response_mapping"""
+
+    def __init__(self, mapping: Optional[Dict] = None, strict: bool = True):
+        source = mapping or {}
+        if not isinstance(source, dict):
+            if strict:
+                raise ResponseMappingError("response_mapping must be an object")
+            logger.warning("Ignoring response_mapping that is not an object", extra={"mapping_type": type(source).__name__})
+            mapping = {}
+        else:
+            mapping = source
+
+        if strict:
+            known = set(PATH_KEYS) | set(FIELD_KEYS) | set(PARAM_KEYS)
+            unknown = set(mapping) - known
+            if unknown:
+                raise ResponseMappingError(
+                    f"Unknown response_mapping keys {sorted(unknown)}. Supported: {sorted(known)}"
+                )
+
+        def compile_key(key: str, compile_value: Callable[[Any], Any]) -> Any:
+            """Compiled value for key; _MISSING when absent, or invalid and not strict"""
+            if key not in mapping:
+                return _MISSING
+            try:
+                return compile_value(mapping[key])
+            except ResponseMappingError as e:
+                if strict:
+                    raise
+                logger.warning("Skipping invalid response_mapping key", extra={"key": key, "error": str(e)})
+                return _MISSING
+
+        paths = {}
+        for key in PATH_KEYS:
+            path = compile_key(key, lambda value, key=key: _parse_path(key, value))
+            if path is not _MISSING:
+                paths[key] = path
+
+        params = {}
+        for key in PARAM_KEYS:
+            param = compile_key(key, lambda value, key=key: _validate_param(key, value))
+            if param is not _MISSING:
+                params[key] = param
+
+        recipient_fields = compile_key(
+            "recipient_fields", lambda value: _validate_fields("recipient_fields", value, RECIPIENT_FIELD_ALIASES)
+        )
+        transaction_fields = compile_key(
+            "transaction_fields", lambda value: _validate_fields("transaction_fields", value, TRANSACTION_FIELD_ALIASES)
+        )
+        if recipient_fields is _MISSING:
+            recipient_fields = None
+        if transaction_fields is _MISSING:
+            transaction_fields = None
+
+        # Keep the source so the cache can tell when a company's config changed
+        self.source = source
+
+        self._balance_getters = [
+            _compile_getter(p)
+            for p in ([paths["balance_path"]] if "balance_path" in paths else []) + DEFAULT_BALANCE_PATHS
+        ]
+        self._recipients_getters = [
+            _compile_getter(p)
+            for p in ([paths["recipients_path"]] if "recipients_path" in paths else []) + DEFAULT_RECIPIENTS_PATHS
+        ]
+        self._project_recipient = _compile_projection(RECIPIENT_FIELD_ALIASES, recipient_fields)
+        self._project_transaction = _compile_projection(TRANSACTION_FIELD_ALIASES, transaction_fields)
+
+        # Transactions are read with the streaming parser, which wants raw paths
+        if "transactions_path" in paths:
+            self.transactions_paths = [paths["transactions_path"]]
+        else:
+            self.transactions_paths = DEFAULT_TRANSACTIONS_PATHS
+        self.next_cursor_path = paths.get("next_cursor_path", ("next_cursor",))
+        self.limit_param = params.get("transactions_limit_param", "limit")
+        self.cursor_param = params.get("transactions_cursor_param", "cursor")
+
+    def extract_balance(self, response_data: Any) -> float:
+        """Extract balance from company's response format"""
+        for getter in self._balance_getters:
+            value = getter(response_data)
+            if value is not _MISSING and not isinstance(value, (dict, list)):
+                return float(value)
+        raise ValueError("Could not extract balance from response")
+
+    def extract_recipients(self, response_data: Any) -> List[Dict]:
+        """Extract recipients list and normalise each entry to our field names"""
+        for getter in self._recipients_getters:
+            value = getter(response_data)
+            if isinstance(value, list):
+                return self.normalize_recipients(value)
+        raise ValueError("Could not extract recipients from response")
+
+    def normalize_recipients(self, recipients: List[Any]) -> List[Dict]:
+        project = self._project_recipient
+        return [project(r) for r in recipients if isinstance(r, dict)]
+
+    def normalize_transactions(self, transactions: List[Any]) -> List[Dict]:
+        project = self._project_transaction
+        return [project(t) for t in transactions if isinstance(t, dict)]
+
+
+def compile_response_mapping(mapping: Optional[Dict], strict: bool = True) -> CompiledMapping:
+    """Compile (and validate) a response_mapping. Raises ResponseMappingError."""
+    return CompiledMapping(mapping, strict=strict)
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+class MappingCache:
+    """Compiled mappings per company, recompiled only when the config changes"""
+
+    def __init__(self):
+        self._compiled: Dict[int, CompiledMapping] = {}
+
+    def get(self, company_id: int, mapping: Optional[Dict]) -> CompiledMapping:
+        compiled = self._compiled.get(company_id)
+        if compiled is None or compiled.source != (mapping or {}):
+            CACHE_REQUESTS_TOTAL.inc(cache="response_mapping", result="miss")
+            # Configs saved before validation existed may carry extra keys
+            compiled = compile_response_mapping(mapping, strict=False)
+            self._compiled[company_id] = compiled
+        else:
+            CACHE_REQUESTS_TOTAL.inc(cache="response_mapping", result="hit")
+        return compiled
+
+    def store(self, company_id: int, compiled: CompiledMapping):
+        self._compiled[company_id] = compiled
+
+    def invalidate(self, company_id: int):
+        self._compiled.pop(company_id, None)
+
+
+# Global cache instance
+mapping_cache = MappingCache()
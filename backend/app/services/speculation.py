@@ -0,0 +1,174 @@
+"""
+Speculative intent parsing
+
+While the user is still talking, a streaming recognizer (on the device or
+server side) produces partial transcripts. Once a partial has stopped changing
+for SPECULATION_STABLE_MS, the intent is parsed from it in the background and
+the bank reads that intent will need (balance, recipients, transactions) are
+started straight away.
+
+When the final transcript arrives, the speculation is either committed (same
+words: the parsed intent is used as-is and the reads are handed to the API
+client, often already finished) or discarded (anything else: the work is
+cancelled and counted as wasted). Only the LLM call and idempotent reads are
+ever run ahead; nothing that moves money happens before the final transcript.
+"""
+import asyncio
+import logging
+import re
+from typing import Dict, Optional
+from app.core.metrics import SPECULATION_TOTAL, SPECULATIVE_WORK_TOTAL
+from app.services.company_api_client import CompanyAPIClient, use_intent
+from app.services.llm import llm_service
+
+logger = logging.getLogger(__name__)
+
+# Bank reads worth starting for each predicted intent (see the intent handlers)
+PREFETCH_FOR_INTENT = {
+    "check_balance": ("get_balance",),
+    "view_recipients": ("get_recipients",),
+    "view_transactions": ("get_transactions",),
+    "transfer": ("get_recipients",),
+}
+
+# Session states answered without the LLM (see run_voice_turn); nothing to speculate on
+FAST_PATH_STATES = ("awaiting_transfer_details", "pending_recipients")
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize_transcript(text: str) -> str:
+    """Lowercase, no punctuation, single spaces ("Send 5,000 to John." -> "send 5000 to john")"""
+    return " ".join(_PUNCTUATION.sub("", text.lower()).split())
+
+
+class Speculation:
+    """Intent parse and bank reads started for one partial transcript"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.task: Optional[asyncio.Task] = None
+        self.prefetches: Dict[str, asyncio.Task] = {}
+
+    def cancel(self):
+        """Discard all of it"""
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+        SPECULATIVE_WORK_TOTAL.inc(work="llm", outcome="wasted")
+        for endpoint, task in self.prefetches.items():
+            task.cancel()
+            SPECULATIVE_WORK_TOTAL.inc(work=f"bank.{endpoint}", outcome="wasted")
+
+
+class IntentSpeculator:
+    """
+    Speculative intent parsing for one conversation
+
+    Call observe() with each partial transcript and resolve() with the final
+    one. At most one speculation is live at a time.
+    """
+
+    def __init__(
+        self,
+        api_client: CompanyAPIClient,
+        account_number: str,
+        user_token: str,
+        stable_ms: int = 250,
+        min_words: int = 2
+    ):
+        self.api_client = api_client
+        self.account_number = account_number
+        self.user_token = user_token
+        self.stable_seconds = stable_ms / 1000
+        self.min_words = min_words
+
+        self._waiting: Optional[asyncio.Task] = None  # Debounce until the partial is stable
+        self._current: Optional[Speculation] = None
+
+    def observe(self, partial: str, context: Dict):
+        """
+        A new partial transcript
+
+        Args:
+            partial: Transcript so far
+            context: Session data as of now (copied; the speculation must not change it)
+        """
+        text = normalize_transcript(partial)
+        if self._current is not None and self._current.text == text:
+            return
+
+        if self._waiting is not None:
+            self._waiting.cancel()
+            self._waiting = None
+
+        if len(text.split()) < self.min_words or any(context.get(state) for state in FAST_PATH_STATES):
+            return
+        self._waiting = asyncio.create_task(self._start_when_stable(text, partial, dict(context)))
+
+    async def resolve(self, final_text: str) -> Optional[Dict]:
+        """
+        Commit or discard the live speculation for the final transcript
+
+        Returns:
+            The speculative parse_intent result when it was made from the same
+            words (its bank reads are handed to the API client), else None
+        """
+        if self._waiting is not None:
+            self._waiting.cancel()
+            self._waiting = None
+
+        speculation, self._current = self._current, None
+        if speculation is None:
+            SPECULATION_TOTAL.inc(result="none")
+            return None
+
+        if normalize_transcript(final_text) != speculation.text:
+            speculation.cancel()
+            SPECULATION_TOTAL.inc(result="miss")
+            return None
+
+        try:
+            intent_result = await speculation.task
+        except Exception as e:
+            logger.warning("Speculative intent parse failed: %s", e)
+            speculation.cancel()
+            SPECULATION_TOTAL.inc(result="error")
+            return None
+
+        SPECULATION_TOTAL.inc(result="hit")
+        SPECULATIVE_WORK_TOTAL.inc(work="llm", outcome="used")
+        for endpoint, task in speculation.prefetches.items():
+            self.api_client.adopt_prefetched(endpoint, self.account_number, self.user_token, task)
+        return intent_result
+
+    def close(self):
+        """Conversation over: drop whatever is still running"""
+        if self._waiting is not None:
+            self._waiting.cancel()
+        if self._current is not None:
+            self._current.cancel()
+        self._waiting = self._current = None
+
+    async def _start_when_stable(self, text: str, partial: str, context: Dict):
+        await asyncio.sleep(self.stable_seconds)
+        self._waiting = None
+
+        if self._current is not None:
+            self._current.cancel()
+            SPECULATION_TOTAL.inc(result="superseded")
+        speculation = Speculation(text)
+        speculation.task = asyncio.create_task(self._run(speculation, partial, context))
+        self._current = speculation
+
+    async def _run(self, speculation: Speculation, partial: str, context: Dict) -> Dict:
+        intent_result = await llm_service.parse_intent(partial, context=context)
+
+        intent = intent_result.get("intent")
+        if intent in PREFETCH_FOR_INTENT:
+            use_intent(intent)  # Prefetches are labelled with the predicted intent
+        for endpoint in PREFETCH_FOR_INTENT.get(intent, ()):
+            read = getattr(self.api_client, endpoint)
+            speculation.prefetches[endpoint] = asyncio.create_task(
+                read(account_number=self.account_number, user_token=self.user_token)
+            )
+        return intent_result
@@ -0,0 +1,270 @@
+"""
+Speech-to-text backends
+
+WhisperService (app/services/whisper.py) delegates to one of these:
+
+    remote - OpenAI Whisper API (whisper-1). Needs WHISPERAPI and a network round trip.
+    local  - faster-whisper (CTranslate2) running on the CPU in this process.
+             Quantised weights (STT_LOCAL_COMPUTE_TYPE=int8), a fixed thread count,
+             and concurrent short utterances batched into one inference.
+
+The local backend is optional: if faster-whisper isn't installed or the model
+fails to load, WhisperService falls back to the remote API.
+"""
+import asyncio
+import logging
+import os
+from io import BytesIO
+from typing import BinaryIO, Dict, List, Union
+from app.core.config import settings
+from app.core.deadline import remaining_time
+from app.core.metrics import STT_BATCH_SIZE
+from app.core.tracing import span
+from app.utils.batching import MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+# Try to import faster-whisper, but don't fail if it's not available
+try:
+    import numpy as np
+    from faster_whisper import WhisperModel, decode_audio
+    FASTER_WHISPER_AVAILABLE = True
+except ImportError:
+    FASTER_WHISPER_AVAILABLE = False
+
+SAMPLE_RATE = 16000
+# In-memory audio, or a file object for large uploads already spooled to disk
+AudioInput = Union[bytes, BinaryIO]
+
+# Whisper's encoder window; clips shorter than this can share one batched inference
+WINDOW_SECONDS = 30
+
+
+def audio_size(audio: AudioInput) -> int:
+    """Byte length of in-memory audio or a seekable file (without reading it)"""
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        return len(audio)
+    position = audio.tell()
+    size = audio.seek(0, os.SEEK_END)
+    audio.seek(position)
+    return size
+
+
+class STTBackend:
+    """Interface every speech-to-text engine implements"""
+
+    name = "base"
+
+    def load(self):
+        """Load models / open clients. Called once at startup (blocking is fine)."""
+
+    async def transcribe(self, audio: AudioInput, filename: str = "audio.wav") -> Dict:
+        """
+        Transcribe one utterance
+
+        Args:
+            audio: Encoded audio as uploaded (wav, webm, ogg, mp3...), either in
+                memory or as a file object for large uploads spooled to disk
+            filename: Original filename; its extension tells the decoder the format
+
+        Returns:
+            {
+                "transcript": str,
+                "confidence": float,
+                "language": str
+            }
+        """
+        raise NotImplementedError
+
+
+class RemoteWhisperBackend(STTBackend):
+    """OpenAI Whisper API"""
+
+    name = "remote"
+
+    # Per-call timeout; a turn's deadline may cut it shorter
+    TIMEOUT = 60.0
+
+    def __init__(self):
+        from openai import OpenAI  # Slow to import; only needed once the service is built
+
+        self.client = OpenAI(api_key=settings.WHISPERAPI)
+
+    async def transcribe(self, audio: AudioInput, filename: str = "audio.wav") -> Dict:
+        # The SDK takes (filename, bytes | file) directly; no temp file needed
+        with span("stt.whisper", model="whisper-1", audio_bytes=audio_size(audio)):
+            # Off the event loop, so the deadline (and other turns) aren't stuck behind the upload
+            transcript = await asyncio.to_thread(
+                self.client.audio.transcriptions.create,
+                model="whisper-1",
+                file=(filename, audio),
+                language="en",  # Nigerian English
+                timeout=remaining_time(self.TIMEOUT)
+            )
+
+        return {
+            "transcript": transcript.text.strip(),
+            "confidence": 0.95,  # Whisper doesn't return confidence, use default high value
+            "language": "en"
+        }
+
+
+class LocalWhisperBackend(STTBackend):
+    """
+    faster-whisper on the CPU with micro-batching
+
+    Utterances shorter than Whisper's 30s window are padded to one window
+    each and decoded together in a single CTranslate2 generate() call. Longer
+    clips go through the regular long-form transcribe().
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        model_name: str = "base.en",
+        compute_type: str = "int8",
+        cpu_threads: int = 4,
+        max_batch_size: int = 8,
+        max_wait_ms: int = 20
+    ):
+        self.model_name = model_name
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.model = None
+        self._tokenizer = None
+        self._batcher = MicroBatcher(
+            self._run_batch,
+            max_batch_size=max_batch_size,
+            max_wait_seconds=max_wait_ms / 1000,
+            workers=1,  # CTranslate2 already uses cpu_threads inside one call
+            name="stt-local"
+        )
+
+    def load(self):
+        if not FASTER_WHISPER_AVAILABLE:
+            raise RuntimeError("faster-whisper is not installed (pip install faster-whisper)")
+
+        self.model = WhisperModel(
+            self.model_name,
+            device="cpu",
+            compute_type=self.compute_type,
+            cpu_threads=self.cpu_threads,
+            download_root=settings.STT_LOCAL_MODEL_DIR or None
+        )
+
+        try:
+            from faster_whisper.tokenizer import Tokenizer
+            self._tokenizer = Tokenizer(
+                self.model.hf_tokenizer,
+                self.model.model.is_multilingual,
+                task="transcribe",
+                language="en"
+            )
+        except Exception as e:
+            # Batched decoding uses faster-whisper internals; without them we still
+            # serve requests, one transcribe() per utterance
+            logger.warning("Batched local STT unavailable, transcribing one by one: %s", e)
+
+        logger.info(
+            "Local STT model loaded",
+            extra={"model": self.model_name, "compute_type": self.compute_type, "cpu_threads": self.cpu_threads}
+        )
+
+    async def transcribe(self, audio: AudioInput, filename: str = "audio.wav") -> Dict:
+        if self.model is None:
+            raise RuntimeError("Local STT model not loaded")
+
+        with span("stt.local", model=self.model_name, audio_bytes=audio_size(audio)):
+            text = await self._batcher.submit(audio)
+
+        return {
+            "transcript": text.strip(),
+            "confidence": 0.9,  # Not calibrated; kept for API compatibility
+            "language": "en"
+        }
+
+    # ------------------------------------------------------------------
+    # Worker thread
+    # ------------------------------------------------------------------
+
+    def _run_batch(self, items: List[AudioInput]) -> List[Union[str, Exception]]:
+        """
+        Transcribe a batch; an item that can't be decoded or transcribed gets
+        its exception in place of the text, so it only fails its own caller
+        """
+        STT_BATCH_SIZE.observe(len(items))
+
+        results: List[Union[str, Exception, None]] = [None] * len(items)
+        samples: Dict[int, np.ndarray] = {}
+        for i, item in enumerate(items):
+            try:
+                samples[i] = decode_audio(
+                    BytesIO(item) if isinstance(item, (bytes, bytearray, memoryview)) else item,
+                    sampling_rate=SAMPLE_RATE
+                )
+            except Exception as e:
+                results[i] = e
+
+        short = [i for i, s in samples.items() if len(s) <= WINDOW_SECONDS * SAMPLE_RATE]
+        if len(short) > 1 and self._tokenizer is not None:
+            try:
+                for i, text in zip(short, self._generate_batch([samples[i] for i in short])):
+                    results[i] = text
+            except Exception as e:
+                # Retried one by one below, so a bad clip only fails itself
+                logger.warning("Batched local STT failed, transcribing one by one: %s", e)
+
+        for i in samples:
+            if results[i] is None:
+                try:
+                    results[i] = self._transcribe_one(samples[i])
+                except Exception as e:
+                    results[i] = e
+        return results
+
+    def _transcribe_one(self, audio) -> str:
+        segments, _ = self.model.transcribe(audio, language="en", beam_size=1, vad_filter=False)
+        return " ".join(segment.text.strip() for segment in segments)
+
+    def _generate_batch(self, clips) -> List[str]:
+        """One generate() over several <=30s clips, greedy decoding"""
+        import ctranslate2
+
+        window = WINDOW_SECONDS * SAMPLE_RATE
+        features = []
+        for clip in clips:
+            padded = np.pad(clip, (0, window - len(clip)))
+            mel = self.model.feature_extractor(padded)
+            features.append(mel[:, :self.model.feature_extractor.nb_max_frames])
+        batch = ctranslate2.StorageView.from_array(np.ascontiguousarray(np.stack(features), dtype=np.float32))
+
+        prompt = list(self._tokenizer.sot_sequence) + [self._tokenizer.no_timestamps]
+        outputs = self.model.model.generate(
+            batch,
+            [prompt] * len(clips),
+            beam_size=1,
+            max_length=224,
+            suppress_blank=True
+        )
+
+        eot = self._tokenizer.eot
+        return [
+            self._tokenizer.decode([t for t in output.sequences_ids[0] if t < eot])
+            for output in outputs
+        ]
+
+
+def build_backend(name: str) -> STTBackend:
+    """Construct a backend from settings by name"""
+    if name == "local":
+        return LocalWhisperBackend(
+            model_name=settings.STT_LOCAL_MODEL,
+            compute_type=settings.STT_LOCAL_COMPUTE_TYPE,
+            cpu_threads=settings.STT_LOCAL_CPU_THREADS,
+            max_batch_size=settings.STT_BATCH_MAX_SIZE,
+            max_wait_ms=settings.STT_BATCH_WINDOW_MS
+        )
+    if name == "remote":
+        return RemoteWhisperBackend()
+    raise ValueError(f"Unknown STT backend: {name}")
@@ -0,0 +1,132 @@
+"""
+Tenant Scheduler
+
+Every company shares the same STT, LLM and TTS capacity. A fair scheduler in
+front of each stage (see app/utils/fair_scheduler.py) keeps one bank's burst
+from raising every other bank's latency: slots are shared by the company's
+scheduling_weight, and model_concurrency_limit / model_rate_limit cap what a
+single company can take. The settings live on the Company record and are
+cached for TENANT_POLICY_CACHE_SECONDS.
+
+The company a call is for is taken from a context variable set at the start
+of each turn (use_company), so the model services need no extra arguments.
+Work not tied to a company (e.g. /tts) is scheduled as the "none" tenant with
+default settings. Turns marked urgent (finishing a transfer, see admission.py)
+are served ahead of queued work.
+"""
+import logging
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import MODEL_QUEUE_SECONDS, MODEL_QUEUE_WAITING
+from app.models.company import Company
+from app.utils.fair_scheduler import FairScheduler
+
+logger = logging.getLogger(__name__)
+
+# (weight, max_concurrency, rate, burst)
+Policy = Tuple[float, Optional[int], Optional[float], Optional[float]]
+
+DEFAULT_POLICY: Policy = (1.0, None, None, None)
+
+_current_company: ContextVar[Optional[int]] = ContextVar("echobank_company_id", default=None)
+_urgent: ContextVar[bool] = ContextVar("echobank_urgent_turn", default=False)
+
+
+def use_company(company_id: Optional[int]):
+    """Attribute model calls made from here on (in this task and its children) to a company"""
+    _current_company.set(company_id)
+
+
+def mark_urgent(urgent: bool = True):
+    """Serve model calls made from here on ahead of queued work"""
+    _urgent.set(urgent)
+
+
+class TenantPolicies:
+    """Company scheduling settings, cached"""
+
+    def __init__(self, ttl_seconds: float = 30.0):
+        self.ttl_seconds = ttl_seconds
+        self._cache: Dict[int, Tuple[Policy, float]] = {}
+
+    def get(self, company_id: Optional[int]) -> Policy:
+        if company_id is None:
+            return DEFAULT_POLICY
+
+        cached = self._cache.get(company_id)
+        now = time.monotonic()
+        if cached is not None and cached[1] > now:
+            return cached[0]
+
+        policy = self._load(company_id)
+        self._cache[company_id] = (policy, now + self.ttl_seconds)
+        return policy
+
+    def invalidate(self, company_id: int):
+        self._cache.pop(company_id, None)
+
+    @staticmethod
+    def _load(company_id: int) -> Policy:
+        db = SessionLocal()
+        try:
+            company = db.query(Company).filter(Company.id == company_id).first()
+        except Exception as e:
+            logger.warning("Couldn't load scheduling settings: %s", e, extra={"company_id": company_id})
+            return DEFAULT_POLICY
+        finally:
+            db.close()
+
+        if company is None:
+            return DEFAULT_POLICY
+        return (
+            company.scheduling_weight or 1.0,
+            company.model_concurrency_limit,
+            company.model_rate_limit,
+            company.model_rate_burst
+        )
+
+
+# Global instances
+tenant_policies = TenantPolicies(ttl_seconds=settings.TENANT_POLICY_CACHE_SECONDS)
+
+stage_schedulers: Dict[str, FairScheduler] = {
+    "stt": FairScheduler("stt", settings.STT_MAX_CONCURRENCY),
+    "llm": FairScheduler("llm", settings.LLM_MAX_CONCURRENCY),
+    "tts": FairScheduler("tts", settings.TTS_MAX_CONCURRENCY),
+}
+
+for _stage, _scheduler in stage_schedulers.items():
+    MODEL_QUEUE_WAITING.set_function(_scheduler.waiting, stage=_stage)
+
+
+def model_queue_delay() -> float:
+    """How long the longest-waiting model call (any stage) has been queued, in seconds"""
+    return max(scheduler.oldest_wait() for scheduler in stage_schedulers.values())
+
+
+@asynccontextmanager
+async def model_slot(stage: str):
+    """
+    Hold a slot of a model stage ("stt", "llm" or "tts") for the current company
+
+    Usage:
+        async with model_slot("llm"):
+            response = await asyncio.to_thread(client.chat.completions.create, ...)
+    """
+    company_id = _current_company.get()
+    weight, max_concurrency, rate, burst = tenant_policies.get(company_id)
+
+    queued_at = time.perf_counter()
+    async with stage_schedulers[stage].slot(
+        company_id, weight=weight, max_concurrency=max_concurrency, rate=rate, burst=burst,
+        urgent=_urgent.get()
+    ):
+        MODEL_QUEUE_SECONDS.observe(
+            time.perf_counter() - queued_at,
+            stage=stage, company_id=company_id if company_id is not None else "none"
+        )
+        yield
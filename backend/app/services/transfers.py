@@ -1,12 +1,16 @@
 from app.models.transaction import Transaction
 from app.models.user import User
 from app.models.recipient import Recipient
+from app.services.notifications import notify_transfer_completed
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from decimal import Decimal
 from datetime import datetime, timedelta
+import logging
 import uuid
 
+logger = logging.getLogger(__name__)
+
 
 class TransferService:
     """
@@ -224,12 +228,7 @@ class TransferService:
             db.commit()
             db.refresh(sender)
             db.refresh(transaction)
-
-            return {
-                "success": True,
-                "new_balance": float(sender.balance),
-                "error": None
-            }
+            new_balance = float(sender.balance)
 
         except Exception as e:
             # Rollback on any error
@@ -246,6 +245,37 @@ class TransferService:
                 "error": str(e)
             }
 
+        # Outside the try above: the money has moved, so nothing here may turn
+        # the transfer into a failure
+        TransferService._notify_completed(transaction, sender)
+
+        return {
+            "success": True,
+            "new_balance": new_balance,
+            "error": None
+        }
+
+    @staticmethod
+    def _notify_completed(transaction: Transaction, sender: User):
+        """Queue the receipt and audit record of a completed transfer (never raises)"""
+        try:
+            # Building the payload can fail too (lazy-loaded recipient), not just queueing it
+            notify_transfer_completed(
+                transaction_ref=transaction.transaction_ref,
+                amount=float(transaction.amount),
+                recipient_name=transaction.recipient.name if transaction.recipient else None,
+                email=sender.email,
+                sender_name=sender.full_name,
+                account_number=sender.account_number,
+                session_id=transaction.session_id,
+                completed_at=transaction.completed_at.isoformat() if transaction.completed_at else None
+            )
+        except Exception as e:
+            logger.error(
+                "Couldn't queue transfer notifications: %s", e,
+                extra={"transaction_ref": transaction.transaction_ref}
+            )
+
     @staticmethod
     async def cancel_transaction(transaction: Transaction, db: Session) -> dict:
         """
@@ -3,13 +3,31 @@ Text-to-Speech Service
 
 Converts text responses to audio for voice banking.
 Uses pyttsx3 for offline text-to-speech (no API calls needed!)
+
+Rendering runs on a single worker thread: pyttsx3/espeak isn't safe to use
+from several threads at once, and keeping it off the event loop means a long
+sentence no longer stalls every other request.
 """
 
 import io
+import os
+import re
+import time
 import base64
-from typing import Optional
+import asyncio
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
 import tempfile
-import wave
+from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS_TOTAL, TTS_FIRST_AUDIO_SECONDS
+from app.core.tracing import span
+from app.services.tenant_scheduler import model_slot
+from app.utils.lazy import LazyService
+from app.utils.audio import wav_stream_header, wav_to_pcm16
+
+logger = logging.getLogger(__name__)
 
 # Try to import pyttsx3, but don't fail if it's not available
 try:
@@ -17,7 +35,46 @@ try:
     PYTTSX3_AVAILABLE = True
 except ImportError:
     PYTTSX3_AVAILABLE = False
-    print("[TTS WARNING] pyttsx3 not available. TTS will be disabled. Install espeak-ng for TTS support.")
+    logger.warning("pyttsx3 not available. TTS will be disabled. Install espeak-ng for TTS support.")
+
+
+def scratch_dir() -> Optional[str]:
+    """
+    Directory for short-lived audio files: AUDIO_SCRATCH_DIR, else /dev/shm
+    (tmpfs, so no disk I/O) when writable, else the system temp dir (None)
+    """
+    if settings.AUDIO_SCRATCH_DIR:
+        return settings.AUDIO_SCRATCH_DIR
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return None
+
+
+# Punctuation followed by whitespace ends a clause ("95,000" stays whole)
+_CLAUSE_BREAK = re.compile(r"(?<=[.!?;:,])\s+")
+
+
+def split_into_clauses(text: str, min_chars: int = 30) -> List[str]:
+    """
+    Split text at sentence and clause boundaries for streamed synthesis
+
+    Pieces shorter than min_chars are merged with the next one, so a list like
+    "Chioma, Emeka, Tunde" isn't rendered one name per engine call.
+    """
+    clauses = []
+    current = ""
+    for piece in _CLAUSE_BREAK.split(text.strip()):
+        current = f"{current} {piece}" if current else piece
+        if len(current) >= min_chars:
+            clauses.append(current)
+            current = ""
+
+    if current:
+        if clauses and len(current) < min_chars:
+            clauses[-1] = f"{clauses[-1]} {current}"
+        else:
+            clauses.append(current)
+    return clauses
 
 
 class TTSService:
@@ -32,9 +89,13 @@ class TTSService:
         self.volume = 1.0
         self.preferred_voice_id = None
         self.available = PYTTSX3_AVAILABLE
+        self.scratch_dir = scratch_dir()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts")
+        # Fixed replies rendered ahead of time: (text, speed) -> WAV bytes
+        self._prerendered: Dict[Tuple[str, float], bytes] = {}
 
         if not PYTTSX3_AVAILABLE:
-            print("[TTS] TTS service initialized in DISABLED mode (pyttsx3 not available)")
+            logger.info("TTS service initialized in DISABLED mode (pyttsx3 not available)")
             return
 
         # Try to find a female voice ID on first init
@@ -47,9 +108,9 @@ class TTSService:
                     break
             temp_engine.stop()
             del temp_engine
-            print("[TTS] TTS service initialized successfully")
+            logger.info("TTS service initialized successfully")
         except Exception as e:
-            print(f"[TTS WARNING] Failed to initialize pyttsx3: {e}. TTS will be disabled.")
+            logger.warning("Failed to initialize pyttsx3: %s. TTS will be disabled.", e)
             self.available = False
 
     async def text_to_speech(
@@ -57,7 +118,7 @@ class TTSService:
         text: str,
         voice: str = "default",  # Ignored for pyttsx3, kept for compatibility
         speed: float = 1.0,
-        return_format: str = "base64"  # base64 or file_path
+        return_format: str = "base64"  # base64, bytes or file_path
     ) -> dict:
         """
         Convert text to speech audio using pyttsx3 (offline)
@@ -66,12 +127,14 @@ class TTSService:
             text: Text to convert to speech
             voice: Ignored (kept for API compatibility)
             speed: Speech speed multiplier
-            return_format: "base64" returns base64 encoded audio, "file_path" returns temp file path
+            return_format: "base64" returns base64 encoded audio, "bytes" returns raw WAV bytes,
+                "file_path" returns temp file path
 
         Returns:
             {
                 "success": bool,
                 "audio_base64": str (if return_format="base64"),
+                "audio_bytes": bytes (if return_format="bytes"),
                 "audio_path": str (if return_format="file_path"),
                 "text": str,
                 "duration_estimate": float (seconds),
@@ -91,55 +154,18 @@ class TTSService:
             }
 
         try:
-            # Create a FRESH engine for this request to avoid blocking
-            engine = pyttsx3.init()
-
-            # Configure voice settings
-            engine.setProperty('rate', self.rate)
-            engine.setProperty('volume', self.volume)
-
-            if self.preferred_voice_id:
-                try:
-                    engine.setProperty('voice', self.preferred_voice_id)
-                except:
-                    pass
-
-            # Create a temporary file to save the audio
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_audio:
-                audio_path = temp_audio.name
-
-            # Generate speech and save to file
-            engine.save_to_file(text, audio_path)
-            engine.runAndWait()
-
-            # Clean up engine
-            engine.stop()
-            del engine
+            if return_format == "file_path":
+                with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_audio:
+                    audio_path = temp_audio.name
+                await self._on_worker(self._render_to_file, text, audio_path)
+            else:
+                audio_bytes = await self._render(text, speed)
 
             # Estimate duration (rough approximation: ~150 words per minute)
             word_count = len(text.split())
             duration_estimate = (word_count / 150) * 60 / speed
 
-            if return_format == "base64":
-                # Read the audio file and encode to base64
-                with open(audio_path, 'rb') as audio_file:
-                    audio_bytes = audio_file.read()
-                    audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
-
-                # Clean up temp file
-                import os
-                os.unlink(audio_path)
-
-                return {
-                    "success": True,
-                    "audio_base64": audio_base64,
-                    "text": text,
-                    "duration_estimate": duration_estimate,
-                    "format": "wav",
-                    "error": None
-                }
-
-            else:  # file_path
+            if return_format == "file_path":
                 return {
                     "success": True,
                     "audio_path": audio_path,
@@ -149,6 +175,19 @@ class TTSService:
                     "error": None
                 }
 
+            result = {
+                "success": True,
+                "text": text,
+                "duration_estimate": duration_estimate,
+                "format": "wav",
+                "error": None
+            }
+            if return_format == "bytes":
+                result["audio_bytes"] = audio_bytes
+            else:
+                result["audio_base64"] = base64.b64encode(audio_bytes).decode('ascii')
+            return result
+
         except Exception as e:
             return {
                 "success": False,
@@ -159,6 +198,139 @@ class TTSService:
                 "error": str(e)
             }
 
+    async def stream_speech(self, text: str, speed: float = 1.0) -> AsyncIterator[bytes]:
+        """
+        Synthesize text clause by clause as a WAV stream
+
+        The first chunk is a streaming WAV header plus the first clause's PCM,
+        so playback can start as soon as that clause is rendered; each later
+        chunk is the PCM of one more clause. Rendering runs up to
+        TTS_STREAM_PREFETCH clauses ahead of the client.
+
+        Args:
+            text: Text to speak
+            speed: Speech speed multiplier
+
+        Yields:
+            WAV stream bytes (mono 16-bit PCM at the engine's sample rate)
+        """
+        if (text, speed) in self._prerendered:
+            clauses = [text]  # Already rendered whole; one chunk
+        else:
+            clauses = split_into_clauses(text, settings.TTS_STREAM_MIN_CLAUSE_CHARS)
+        if not clauses:
+            return
+
+        rendered: asyncio.Queue = asyncio.Queue(maxsize=max(settings.TTS_STREAM_PREFETCH, 1))
+        stream_start = time.perf_counter()
+
+        async def render_clauses():
+            try:
+                for clause in clauses:
+                    wav = await self._render(clause, speed)
+                    await rendered.put(wav)
+            except Exception as e:
+                await rendered.put(e)
+                return
+            await rendered.put(None)
+
+        producer = asyncio.create_task(render_clauses())
+        sample_rate = None
+        try:
+            while True:
+                wav = await rendered.get()
+                if wav is None:
+                    break
+                if isinstance(wav, Exception):
+                    # Headers are already sent; all we can do is end the stream early
+                    logger.warning("Streaming TTS failed: %s", wav)
+                    break
+
+                pcm, rate = wav_to_pcm16(wav, sample_rate)
+                if sample_rate is None:
+                    sample_rate = rate
+                    TTS_FIRST_AUDIO_SECONDS.observe(time.perf_counter() - stream_start)
+                    yield wav_stream_header(sample_rate) + pcm
+                else:
+                    yield pcm
+        finally:
+            # Client went away (or barge-in): stop rendering clauses nobody will hear
+            producer.cancel()
+
+    async def prerender(self, texts: Iterable[str], speed: float = 1.0) -> int:
+        """
+        Render fixed replies now so turns that say them skip synthesis
+
+        Returns:
+            How many texts were rendered
+        """
+        if not self.available:
+            return 0
+        rendered = 0
+        for text in texts:
+            if (text, speed) in self._prerendered:
+                continue
+            try:
+                self._prerendered[(text, speed)] = await self._on_worker(self.render_wav, text, speed)
+                rendered += 1
+            except Exception as e:
+                logger.warning("Couldn't pre-render %r: %s", text[:40], e)
+        return rendered
+
+    async def _render(self, text: str, speed: float) -> bytes:
+        """WAV for text: pre-rendered if we have it, else synthesized on the TTS worker"""
+        if self._prerendered:
+            wav = self._prerendered.get((text, speed))
+            CACHE_REQUESTS_TOTAL.inc(cache="tts_prompt", result="hit" if wav is not None else "miss")
+            if wav is not None:
+                return wav
+        return await self._on_worker(self.render_wav, text, speed)
+
+    async def _on_worker(self, func, *args):
+        # Like asyncio.to_thread (trace context carried over), but on the single TTS thread
+        context = contextvars.copy_context()
+        async with model_slot("tts"):
+            return await asyncio.get_running_loop().run_in_executor(self._executor, context.run, func, *args)
+
+    def render_wav(self, text: str, speed: float = 1.0) -> bytes:
+        """
+        Render text to WAV bytes (blocking; call on the TTS worker thread)
+
+        pyttsx3 can only render to a path, so this goes through a scratch file
+        on tmpfs (RAM) that is read back once and removed right away.
+        """
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav", dir=self.scratch_dir) as temp_audio:
+            audio_path = temp_audio.name
+        try:
+            self._render_to_file(text, audio_path)
+            with open(audio_path, 'rb') as audio_file:
+                return audio_file.read()
+        finally:
+            os.unlink(audio_path)
+
+    def _render_to_file(self, text: str, audio_path: str):
+        # Create a FRESH engine for this request to avoid blocking
+        engine = pyttsx3.init()
+
+        # Configure voice settings
+        engine.setProperty('rate', self.rate)
+        engine.setProperty('volume', self.volume)
+
+        if self.preferred_voice_id:
+            try:
+                engine.setProperty('voice', self.preferred_voice_id)
+            except:
+                pass
+
+        # Generate speech and save to file
+        with span("tts.synthesize", engine="pyttsx3", chars=len(text)):
+            engine.save_to_file(text, audio_path)
+            engine.runAndWait()
+
+        # Clean up engine
+        engine.stop()
+        del engine
+
     async def generate_banking_responses(self, response_type: str, **kwargs) -> str:
         """
         Generate contextual banking responses
@@ -207,5 +379,5 @@ class TTSService:
         return template.format(**kwargs)
 
 
-# Singleton instance
-tts_service = TTSService()
+# Singleton instance (built on first use or by the startup warm-up; boots pyttsx3)
+tts_service: TTSService = LazyService(TTSService, "tts")
@@ -0,0 +1,167 @@
+"""
+Startup warm-up
+
+The app binds its port as soon as the database is ready; everything a first
+turn would otherwise pay for is then done in the background:
+
+    services          build Whisper/LLM/TTS (lazy, see app/utils/lazy.py) in a
+                      worker thread and load a local STT model if configured
+    companies         load scheduling settings and compiled response mappings
+                      of every active company (warms the DB pool as well)
+    bank_connections  open WARMUP_BANK_CONNECTIONS pooled connections to each
+                      active bank's base_url (TCP + TLS handshakes done)
+    tts_prompts       render the fixed replies (app/services/prompts.py) and
+                      the busy message
+    intent_cache      parse WARMUP_INTENT_SEEDS so common requests skip the LLM
+
+GET /health/ready answers 503 until the warm-up is finished (or has taken
+WARMUP_TIMEOUT_SECONDS), so the platform only routes traffic to a warm
+instance; /health/live only says the process is up. A phase that fails is
+logged and skipped: the first turn that needs it does the work instead.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import WARMUP_PHASE_SECONDS
+from app.models.company import Company, CompanyEndpoints
+from app.services.admission import admission_controller
+from app.services.company_api_client import open_bank_connections
+from app.services.llm import llm_service
+from app.services.prompts import STATIC_PROMPTS
+from app.services.response_mapping import mapping_cache
+from app.services.tenant_scheduler import tenant_policies
+from app.services.tts import tts_service
+from app.services.whisper import whisper_service
+
+logger = logging.getLogger(__name__)
+
+PHASES = ("services", "companies", "bank_connections", "tts_prompts", "intent_cache")
+
+
+class WarmUp:
+    """Runs the warm-up phases once and reports readiness"""
+
+    def __init__(self, enabled: bool = True, timeout_seconds: float = 60.0):
+        self.enabled = enabled
+        self.timeout_seconds = timeout_seconds
+        self.phases: Dict[str, Dict] = {name: {"status": "pending"} for name in PHASES}
+        self._task: Optional[asyncio.Task] = None
+        self._started_at: Optional[float] = None
+        self._finished = False
+        self._base_urls: List[str] = []
+
+    @property
+    def ready(self) -> bool:
+        """Whether to take traffic: warm-up done, timed out, or disabled"""
+        if not self.enabled or self._finished:
+            return True
+        return self._started_at is not None and time.monotonic() - self._started_at > self.timeout_seconds
+
+    def start(self):
+        """Run the warm-up in the background (call from the app's startup hook)"""
+        if not self.enabled or (self._task is not None and not self._task.done()):
+            return
+        self._started_at = time.monotonic()
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def status(self) -> Dict:
+        return {"enabled": self.enabled, "finished": self._finished, "phases": self.phases}
+
+    async def run(self):
+        started = time.perf_counter()
+        await self._phase("services", self._warm_services)
+        # Independent of each other once the services exist
+        await asyncio.gather(
+            self._companies_then_banks(),
+            self._phase("tts_prompts", self._warm_tts_prompts),
+            self._phase("intent_cache", self._warm_intent_cache),
+        )
+        self._finished = True
+        logger.info(
+            "Warm-up finished in %.0fms", (time.perf_counter() - started) * 1000,
+            extra={"phases": self.phases}
+        )
+
+    async def _phase(self, name: str, work):
+        phase = self.phases[name]
+        phase["status"] = "running"
+        started = time.perf_counter()
+        try:
+            detail = await work()
+            phase["status"] = "done"
+            if detail:
+                phase.update(detail)
+        except Exception as e:
+            phase["status"] = "failed"
+            phase["error"] = str(e)
+            logger.warning("Warm-up phase %s failed: %s", name, e)
+        elapsed = time.perf_counter() - started
+        phase["ms"] = round(elapsed * 1000, 1)
+        WARMUP_PHASE_SECONDS.set(elapsed, phase=name)
+
+    async def _warm_services(self) -> Dict:
+        for service in (whisper_service, llm_service, tts_service):
+            await asyncio.to_thread(service.get)
+        await asyncio.to_thread(whisper_service.preload)
+        return {}
+
+    async def _companies_then_banks(self):
+        await self._phase("companies", self._warm_companies)
+        await self._phase("bank_connections", self._connect_banks)
+
+    async def _warm_companies(self) -> Dict:
+        base_urls = await asyncio.to_thread(self._load_companies)
+        self._base_urls = sorted(set(base_urls.values()))
+        return {"count": len(base_urls)}
+
+    @staticmethod
+    def _load_companies() -> Dict[int, str]:
+        """Cache settings of every active company; returns {company_id: base_url}"""
+        db = SessionLocal()
+        try:
+            rows = db.query(Company.id, CompanyEndpoints).join(
+                CompanyEndpoints, CompanyEndpoints.company_id == Company.id
+            ).filter(Company.is_active == True, CompanyEndpoints.is_active == True).all()
+        finally:
+            db.close()
+
+        base_urls = {}
+        for company_id, endpoints in rows:
+            tenant_policies.get(company_id)
+            mapping_cache.get(company_id, endpoints.response_mapping)
+            base_urls[company_id] = endpoints.base_url
+        return base_urls
+
+    async def _connect_banks(self) -> Dict:
+        if settings.WARMUP_BANK_CONNECTIONS <= 0:
+            return {"banks": 0, "connections": 0}
+        opened = await asyncio.gather(
+            *(open_bank_connections(url, settings.WARMUP_BANK_CONNECTIONS) for url in self._base_urls)
+        )
+        return {"banks": len(opened), "connections": sum(opened)}
+
+    async def _warm_tts_prompts(self) -> Dict:
+        rendered = await tts_service.prerender(STATIC_PROMPTS)
+        await admission_controller.prepare()
+        return {"count": rendered}
+
+    async def _warm_intent_cache(self) -> Dict:
+        seeds: List[str] = [s.strip() for s in settings.WARMUP_INTENT_SEEDS.split(",") if s.strip()]
+        if not seeds:
+            return {"count": 0}
+        return {"count": await llm_service.prime_intent_cache(seeds)}
+
+
+# Global warm-up instance
+warmup = WarmUp(enabled=settings.WARMUP_ON_STARTUP, timeout_seconds=settings.WARMUP_TIMEOUT_SECONDS)
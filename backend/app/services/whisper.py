@@ -1,22 +1,60 @@
-from openai import OpenAI
+import asyncio
+import logging
+import threading
 from app.core.config import settings
+from app.core.deadline import DeadlineExceeded, within_deadline
+from app.services.audio_preprocess import audio_preprocessor
+from app.services.stt_backends import AudioInput, STTBackend, RemoteWhisperBackend, build_backend
+from app.services.tenant_scheduler import model_slot
+from app.utils.lazy import LazyService
 from fastapi import UploadFile
-import tempfile
-import os
 from typing import Dict
 
+logger = logging.getLogger(__name__)
+
 
 class WhisperService:
     """
-    Service for transcribing audio to text using OpenAI Whisper API
+    Service for transcribing audio to text
+
+    The engine is chosen by STT_BACKEND: "remote" (OpenAI Whisper API) or
+    "local" (faster-whisper on the CPU). The remote API stays available as a
+    fallback when the local model can't be loaded or fails on a request.
     """
 
     def __init__(self):
-        self.client = OpenAI(api_key=settings.WHISPERAPI)
+        self.remote = RemoteWhisperBackend()
+        self.backend: STTBackend = self.remote
+        self._loaded = False
+        self._load_lock = threading.Lock()
+
+    def preload(self):
+        """
+        Load the configured backend once (blocks while a local model loads)
+
+        Run by the startup warm-up; otherwise the first transcription runs it.
+        Callers that arrive while the model loads wait for it, so none of them
+        sees _loaded set before the backend is in place.
+        """
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            if settings.STT_BACKEND != "remote":
+                try:
+                    backend = build_backend(settings.STT_BACKEND)
+                    backend.load()
+                    self.backend = backend
+                except Exception as e:
+                    logger.warning(
+                        "STT backend %r unavailable, using remote Whisper API: %s", settings.STT_BACKEND, e
+                    )
+            self._loaded = True
 
     async def transcribe_audio(self, audio_file: UploadFile) -> Dict:
         """
-        Transcribe audio file to text using OpenAI Whisper
+        Transcribe audio file to text
 
         Args:
             audio_file: Audio file from user (UploadFile)
@@ -25,35 +63,63 @@ class WhisperService:
             {
                 "transcript": str,
                 "confidence": float,
-                "language": str
+                "language": str,
+                "backend": str,
+                "no_speech": bool  # True: preprocessing found no speech, STT was skipped
             }
 
         Raises:
             Exception: If transcription fails
         """
-        temp_audio_path = None
+        filename = audio_file.filename or "audio.wav"
+        size = audio_file.size
 
-        try:
-            # Save uploaded file temporarily
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_audio:
-                content = await audio_file.read()
-                temp_audio.write(content)
-                temp_audio_path = temp_audio.name
-
-            # Transcribe using Whisper
-            with open(temp_audio_path, "rb") as audio:
-                transcript = self.client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio,
-                    language="en"  # Nigerian English
-                )
-
-            return {
-                "transcript": transcript.text.strip(),
-                "confidence": 0.95,  # Whisper doesn't return confidence, use default high value
-                "language": "en"
-            }
+        if settings.AUDIO_PREPROCESS_ENABLED and (size is None or size <= settings.AUDIO_PREPROCESS_MAX_BYTES):
+            return await self.transcribe_bytes(await audio_file.read(), filename)
+
+        if size is not None and size > settings.AUDIO_SPOOL_THRESHOLD_BYTES:
+            # Starlette already spooled big uploads to a temp file; hand those over
+            # as a file object instead of pulling them into memory
+            await audio_file.seek(0)
+            content = audio_file.file
+        else:
+            content = await audio_file.read()
+
+        return await self._transcribe(content, filename)
 
+    async def transcribe_bytes(self, data: bytes, filename: str = "audio.wav") -> Dict:
+        """
+        Transcribe audio that is already in memory (e.g. collected from a WebSocket)
+
+        Args:
+            data: Audio file bytes
+            filename: Name hinting at the format ("utterance.webm")
+
+        Returns:
+            Same as transcribe_audio
+        """
+        if settings.AUDIO_PREPROCESS_ENABLED and len(data) <= settings.AUDIO_PREPROCESS_MAX_BYTES:
+            # Trim silence, downmix and resample; silent clips never reach STT
+            prepared = await audio_preprocessor.process(data, filename)
+            if not prepared["speech"]:
+                return {
+                    "transcript": "",
+                    "confidence": 0.0,
+                    "language": "en",
+                    "backend": "none",
+                    "no_speech": True
+                }
+            data, filename = prepared["audio"], prepared["filename"]
+
+        return await self._transcribe(data, filename)
+
+    async def _transcribe(self, content: AudioInput, filename: str) -> Dict:
+        if not self._loaded:
+            await asyncio.to_thread(self.preload)
+        try:
+            return await within_deadline(self._scheduled_transcribe(content, filename), "stt")
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             error_msg = str(e)
             if "rate_limit" in error_msg.lower():
@@ -61,10 +127,26 @@ class WhisperService:
             else:
                 raise Exception(f"Transcription failed: {error_msg}")
 
-        finally:
-            # Clean up temp file
-            if temp_audio_path and os.path.exists(temp_audio_path):
-                os.unlink(temp_audio_path)
+    async def _scheduled_transcribe(self, content: AudioInput, filename: str) -> Dict:
+        async with model_slot("stt"):
+            return await self._transcribe_with_fallback(content, filename)
+
+    async def _transcribe_with_fallback(self, content: AudioInput, filename: str) -> Dict:
+        backend = self.backend
+        try:
+            result = await backend.transcribe(content, filename)
+        except Exception as e:
+            if backend is self.remote or not settings.STT_FALLBACK_TO_REMOTE:
+                raise
+            logger.warning("Local STT failed, falling back to remote: %s", e, extra={"backend": backend.name})
+            backend = self.remote
+            if hasattr(content, "seek"):
+                content.seek(0)
+            result = await backend.transcribe(content, filename)
+
+        result["backend"] = backend.name
+        result["no_speech"] = False
+        return result
 
     def validate_audio_file(self, audio_file: UploadFile) -> bool:
         """
@@ -95,5 +177,5 @@ class WhisperService:
         return True
 
 
-# Singleton instance
-whisper_service = WhisperService()
+# Singleton instance (built on first use or by the startup warm-up)
+whisper_service: WhisperService = LazyService(WhisperService, "whisper")
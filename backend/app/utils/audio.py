@@ -0,0 +1,318 @@
+"""
+Audio decoding / encoding helpers (NumPy)
+
+WAV (PCM 8/16/24/32-bit and 32-bit float) is handled natively. Other
+containers (OGG/Opus, FLAC) need the optional `soundfile` package; without it
+decode_audio() returns None and callers pass the original bytes through.
+
+Samples are float32 in [-1, 1], shaped (frames, channels).
+"""
+import io
+import struct
+from typing import Optional, Tuple
+import numpy as np
+
+# Try to import soundfile (libsndfile), but don't fail if it's not available
+try:
+    import soundfile
+    SOUNDFILE_AVAILABLE = True
+except ImportError:
+    SOUNDFILE_AVAILABLE = False
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class AudioDecodeError(ValueError):
+    """Audio bytes could not be parsed"""
+
+
+def _parse_wav(data: bytes):
+    """(format_code, channels, sample_rate, bits) and the data chunk as a memoryview"""
+    if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise AudioDecodeError("Not a RIFF/WAVE file")
+
+    view = memoryview(data)
+    fmt = None
+    pcm = None
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id = bytes(view[pos:pos + 4])
+        (size,) = struct.unpack_from("<I", data, pos + 4)
+        body = view[pos + 8:pos + 8 + size]
+        if chunk_id == b"fmt ":
+            fmt = struct.unpack_from("<HHIIHH", body)
+            if fmt[0] == WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                # Real format code is the first two bytes of the SubFormat GUID
+                (sub_format,) = struct.unpack_from("<H", body, 24)
+                fmt = (sub_format,) + fmt[1:]
+        elif chunk_id == b"data":
+            pcm = body
+        pos += 8 + size + (size & 1)  # Chunks are word aligned
+
+    if fmt is None or pcm is None:
+        raise AudioDecodeError("WAV file missing fmt or data chunk")
+
+    format_code, channels, sample_rate, _, _, bits = fmt
+    return (format_code, channels, sample_rate, bits), pcm
+
+
+def decode_wav(data: bytes) -> Tuple[np.ndarray, int]:
+    """
+    Parse a RIFF/WAVE file
+
+    Returns:
+        (samples float32 of shape (frames, channels), sample_rate)
+
+    Raises:
+        AudioDecodeError: Not a WAV file or an unsupported encoding
+    """
+    (format_code, channels, sample_rate, bits), pcm = _parse_wav(data)
+    width = bits // 8
+    usable = len(pcm) - len(pcm) % (width * channels)
+    raw = pcm[:usable]
+
+    if format_code == WAVE_FORMAT_IEEE_FLOAT and bits == 32:
+        samples = np.frombuffer(raw, dtype="<f4").astype(np.float32)
+    elif format_code == WAVE_FORMAT_PCM and bits == 8:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif format_code == WAVE_FORMAT_PCM and bits == 16:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif format_code == WAVE_FORMAT_PCM and bits == 24:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        ints = np.where(ints >= 1 << 23, ints - (1 << 24), ints)
+        samples = ints.astype(np.float32) / float(1 << 23)
+    elif format_code == WAVE_FORMAT_PCM and bits == 32:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / float(1 << 31)
+    else:
+        raise AudioDecodeError(f"Unsupported WAV encoding (format {format_code}, {bits}-bit)")
+
+    return samples.reshape(-1, channels), sample_rate
+
+
+def encode_wav(samples: np.ndarray, sample_rate: int) -> bytes:
+    """Mono float32 samples -> 16-bit PCM WAV bytes"""
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2").tobytes()
+    header = struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + len(pcm), b"WAVE",
+        b"fmt ", 16, WAVE_FORMAT_PCM, 1, sample_rate, sample_rate * 2, 2, 16,
+        b"data", len(pcm)
+    )
+    return header + pcm
+
+
+def wav_stream_header(sample_rate: int, channels: int = 1, bits: int = 16) -> bytes:
+    """
+    PCM WAV header for a stream of unknown length
+
+    The RIFF and data sizes are 0xFFFFFFFF, which players read as "until the
+    connection closes"; raw PCM frames follow the header directly.
+    """
+    block_align = channels * bits // 8
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 0xFFFFFFFF, b"WAVE",
+        b"fmt ", 16, WAVE_FORMAT_PCM, channels, sample_rate, sample_rate * block_align, block_align, bits,
+        b"data", 0xFFFFFFFF
+    )
+
+
+def wav_to_pcm16(data: bytes, sample_rate: Optional[int] = None) -> Tuple[bytes, int]:
+    """
+    WAV bytes -> raw mono 16-bit PCM (the frames of a wav_stream_header stream)
+
+    Args:
+        data: WAV file bytes
+        sample_rate: Output rate; None keeps the file's own rate
+
+    Returns:
+        (pcm bytes, sample_rate). Mono 16-bit input at the right rate is
+        returned as-is without decoding.
+    """
+    (format_code, channels, source_rate, bits), pcm = _parse_wav(data)
+    sample_rate = sample_rate or source_rate
+    if format_code == WAVE_FORMAT_PCM and channels == 1 and bits == 16 and source_rate == sample_rate:
+        return bytes(pcm[:len(pcm) - len(pcm) % 2]), sample_rate
+
+    samples, _ = decode_wav(data)
+    mono = resample(to_mono(samples), source_rate, sample_rate)
+    return (np.clip(mono, -1.0, 1.0) * 32767.0).astype("<i2").tobytes(), sample_rate
+
+
+def encode_opus(samples: np.ndarray, sample_rate: int) -> Optional[bytes]:
+    """Mono float32 samples -> OGG/Opus bytes, or None if soundfile/libsndfile can't"""
+    if not SOUNDFILE_AVAILABLE:
+        return None
+    return _soundfile_encode(samples, sample_rate, "ogg")
+
+
+def decode_audio(data: bytes) -> Optional[Tuple[np.ndarray, int]]:
+    """
+    Decode WAV natively, anything else via soundfile if installed
+
+    Returns:
+        (samples, sample_rate), or None if the format can't be decoded here
+    """
+    if data[:4] == b"RIFF":
+        try:
+            return decode_wav(data)
+        except (AudioDecodeError, struct.error):
+            pass
+
+    if SOUNDFILE_AVAILABLE:
+        try:
+            samples, sample_rate = soundfile.read(io.BytesIO(data), dtype="float32", always_2d=True)
+            return samples, sample_rate
+        except Exception:
+            return None
+    return None
+
+
+def to_mono(samples: np.ndarray) -> np.ndarray:
+    """(frames, channels) -> (frames,) by averaging channels"""
+    if samples.ndim == 1:
+        return samples
+    if samples.shape[1] == 1:
+        return samples[:, 0]
+    return samples.mean(axis=1, dtype=np.float32)
+
+
+def _lowpass_kernel(cutoff: float, taps: int = 63) -> np.ndarray:
+    """Windowed-sinc low-pass FIR; cutoff as a fraction of the sample rate"""
+    n = np.arange(taps) - (taps - 1) / 2
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+    return (kernel / kernel.sum()).astype(np.float32)
+
+
+def resample(samples: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """
+    Resample mono audio (anti-alias low-pass when downsampling, then linear interpolation)
+
+    Good enough for speech recognition, which only cares about the band below ~8kHz.
+    """
+    if source_rate == target_rate or len(samples) == 0:
+        return samples.astype(np.float32, copy=False)
+
+    if target_rate < source_rate:
+        cutoff = 0.45 * target_rate / source_rate
+        samples = np.convolve(samples, _lowpass_kernel(cutoff), mode="same")
+
+    duration = len(samples) / source_rate
+    target_len = int(round(duration * target_rate))
+    source_times = np.arange(len(samples), dtype=np.float64) / source_rate
+    target_times = np.arange(target_len, dtype=np.float64) / target_rate
+    return np.interp(target_times, source_times, samples).astype(np.float32)
+
+
+# ============================================================================
+# OUTPUT FORMATS
+# ============================================================================
+
+# format name -> media type
+MEDIA_TYPES = {
+    "wav": "audio/wav",
+    "ogg": "audio/ogg",  # Opus in OGG
+    "mp3": "audio/mpeg",
+}
+
+_MEDIA_ALIASES = {
+    "audio/wav": "wav", "audio/wave": "wav", "audio/x-wav": "wav",
+    "audio/ogg": "ogg", "audio/opus": "ogg",
+    "audio/mpeg": "mp3", "audio/mp3": "mp3",
+}
+
+# Sample rates the Opus encoder accepts
+_OPUS_RATES = (8000, 12000, 16000, 24000, 48000)
+
+
+def _soundfile_encode(samples: np.ndarray, sample_rate: int, fmt: str) -> Optional[bytes]:
+    buffer = io.BytesIO()
+    try:
+        if fmt == "ogg":
+            soundfile.write(buffer, samples, sample_rate, format="OGG", subtype="OPUS")
+        else:
+            soundfile.write(buffer, samples, sample_rate, format="MP3", subtype="MPEG_LAYER_III")
+    except (RuntimeError, TypeError, ValueError):
+        return None  # libsndfile too old for this codec
+    return buffer.getvalue()
+
+
+def transcode_wav(wav: bytes, fmt: str) -> Optional[bytes]:
+    """
+    Convert WAV bytes to wav/ogg(Opus)/mp3
+
+    Returns:
+        Encoded bytes, or None if this server can't produce the format
+    """
+    if fmt == "wav":
+        return wav
+    if fmt not in MEDIA_TYPES or not SOUNDFILE_AVAILABLE:
+        return None
+
+    samples, sample_rate = decode_wav(wav)
+    mono = to_mono(samples)
+    if fmt == "ogg" and sample_rate not in _OPUS_RATES:
+        target = next(rate for rate in _OPUS_RATES if rate >= min(sample_rate, 48000))
+        mono = resample(mono, sample_rate, target)
+        sample_rate = target
+    return _soundfile_encode(mono, sample_rate, fmt)
+
+
+_available_formats: Optional[Tuple[str, ...]] = None
+
+
+def available_formats() -> Tuple[str, ...]:
+    """Output formats this server can encode (probed once)"""
+    global _available_formats
+    if _available_formats is None:
+        probe = encode_wav(np.zeros(1600, dtype=np.float32), 16000)
+        _available_formats = tuple(fmt for fmt in MEDIA_TYPES if transcode_wav(probe, fmt) is not None)
+    return _available_formats
+
+
+def negotiate_audio_format(accept: Optional[str], preference: Tuple[str, ...]) -> Optional[str]:
+    """
+    Pick an output format from an Accept header
+
+    Args:
+        accept: Accept header value (None/empty means anything)
+        preference: Server's format preference among the available ones
+
+    Returns:
+        Format name, or None if the client accepts no audio type we can produce
+        (e.g. "Accept: application/json")
+    """
+    if not preference:
+        return None
+    if not accept:
+        return preference[0]
+
+    best, best_q = None, 0.0
+    for part in accept.split(","):
+        fields = part.strip().split(";")
+        media = fields[0].strip().lower()
+        q = 1.0
+        for param in fields[1:]:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q <= 0:
+            continue
+
+        if media in ("*/*", "audio/*"):
+            candidate = preference[0]
+        else:
+            candidate = _MEDIA_ALIASES.get(media)
+            if candidate not in preference:
+                continue
+
+        # Higher q wins; on a tie the server's preference order decides
+        if q > best_q or (q == best_q and preference.index(candidate) < preference.index(best)):
+            best, best_q = candidate, q
+    return best
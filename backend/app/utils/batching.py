@@ -0,0 +1,93 @@
+"""
+Micro-batching for CPU-bound model inference
+
+Concurrent callers `await batcher.submit(item)`. Items arriving within a short
+window (or until the batch is full) are handed together to one blocking
+`run_batch(items) -> results` call on a worker thread. While a batch is
+running, new arrivals keep accumulating, so under load batches grow on their
+own and the model runs one larger inference instead of many small ones.
+
+run_batch may put an exception in place of an item's result: only that
+caller gets it raised, the rest of the batch is unaffected. An exception
+raised by run_batch itself fails every caller in the batch.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Generic, List, Optional, Tuple, TypeVar, Union
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """Groups concurrent submissions into batched calls on a worker thread"""
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[T]], List[Union[R, BaseException]]],
+        max_batch_size: int = 8,
+        max_wait_seconds: float = 0.02,
+        workers: int = 1,
+        name: str = "batcher"
+    ):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._pending: List[Tuple[T, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running = 0
+
+    async def submit(self, item: T) -> R:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_seconds, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        # All workers busy: keep collecting, the batch is flushed when one frees up
+        if self._running >= self.workers and len(self._pending) < self.max_batch_size:
+            return
+
+        batch, self._pending = self._pending[:self.max_batch_size], self._pending[self.max_batch_size:]
+        items = [item for item, _ in batch]
+        futures = [future for _, future in batch]
+
+        self._running += 1
+        loop = asyncio.get_running_loop()
+        task = loop.run_in_executor(self._executor, self.run_batch, items)
+        task.add_done_callback(lambda done: self._complete(done, futures))
+
+    def _complete(self, done: asyncio.Future, futures: List[asyncio.Future]):
+        self._running -= 1
+        error = done.exception()
+        results = None if error else done.result()
+
+        for i, future in enumerate(futures):
+            if future.done():
+                continue  # Caller went away (cancelled)
+            if error is not None:
+                future.set_exception(error)
+            elif isinstance(results[i], BaseException):
+                future.set_exception(results[i])  # This item failed on its own
+            else:
+                future.set_result(results[i])
+
+        if self._pending:
+            self._flush()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,183 @@
+"""
+Weighted fair scheduling of a shared capacity between tenants
+
+Callers wrap the guarded work in `async with scheduler.slot(tenant, ...)`.
+At most `capacity` slots are held at once. When callers are queued, the next
+free slot goes to the tenant with the lowest virtual start tag (start-time
+fair queueing): each tenant's requests advance its tag by 1/weight, so under
+contention tenants get slots in proportion to their weights, and a tenant
+with a burst queued only delays itself.
+
+Per tenant, on top of the weights:
+    max_concurrency   slots held at once (bulkhead); None = no cap
+    rate / burst      token bucket: slots granted per second, bursting up to
+                      `burst`; None = unlimited
+
+Requests over a tenant's cap or rate wait in that tenant's queue; they never
+hold up other tenants. Urgent requests go ahead of everything else queued
+(still within the tenant's cap and rate) without using up the tenant's share.
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Hashable, Optional, Tuple
+
+
+class _TenantState:
+    __slots__ = ("weight", "max_concurrency", "rate", "burst", "tokens", "refilled_at",
+                 "active", "last_finish", "queue")
+
+    def __init__(self):
+        self.weight = 1.0
+        self.max_concurrency: Optional[int] = None
+        self.rate: Optional[float] = None
+        self.burst = 1.0
+        self.tokens = 1.0
+        self.refilled_at = time.monotonic()
+        self.active = 0
+        self.last_finish = 0.0
+        self.queue: Deque[Tuple[float, asyncio.Future, float]] = deque()
+
+    def configure(self, weight: float, max_concurrency: Optional[int], rate: Optional[float], burst: Optional[float]):
+        self.weight = max(weight, 0.01)
+        self.max_concurrency = max_concurrency
+        if rate != self.rate:
+            self.rate = rate
+            self.burst = max(burst or rate or 1.0, 1.0)
+            self.tokens = self.burst
+            self.refilled_at = time.monotonic()
+
+    def seconds_until_token(self, now: float) -> float:
+        """0 when a request may start now (refills the bucket as a side effect)"""
+        if self.rate is None:
+            return 0.0
+        self.tokens = min(self.burst, self.tokens + (now - self.refilled_at) * self.rate)
+        self.refilled_at = now
+        if self.tokens >= 1.0:
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+
+class FairScheduler:
+    """Shares `capacity` concurrent slots between tenants by weight"""
+
+    def __init__(self, name: str, capacity: int):
+        self.name = name
+        self.capacity = capacity
+        self._tenants: Dict[Hashable, _TenantState] = {}
+        self._running = 0
+        self._virtual_time = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        tenant: Hashable,
+        weight: float = 1.0,
+        max_concurrency: Optional[int] = None,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        urgent: bool = False
+    ):
+        """
+        Hold one slot for the duration of the block
+
+        Args:
+            tenant: Who the work is for
+            weight: Share of the capacity relative to other tenants
+            max_concurrency: Most slots this tenant may hold at once
+            rate: Slots granted per second to this tenant
+            burst: Token bucket size (defaults to rate)
+            urgent: Serve before every non-urgent request
+        """
+        state = self._tenants.get(tenant)
+        if state is None:
+            state = self._tenants[tenant] = _TenantState()
+        state.configure(weight, max_concurrency, rate, burst)
+
+        granted = asyncio.get_running_loop().create_future()
+        if urgent:
+            entry = (float("-inf"), granted, time.monotonic())
+            state.queue.appendleft(entry)
+        else:
+            start_tag = max(self._virtual_time, state.last_finish)
+            state.last_finish = start_tag + 1.0 / state.weight
+            entry = (start_tag, granted, time.monotonic())
+            state.queue.append(entry)
+        self._dispatch()
+
+        try:
+            await granted
+        except asyncio.CancelledError:
+            if granted.done() and not granted.cancelled():
+                # Granted in the same tick we were cancelled: hand the slot back
+                self._release(state)
+            elif entry in state.queue:
+                # Not there if a release already popped (and skipped) it in this tick
+                state.queue.remove(entry)
+            raise
+
+        try:
+            yield
+        finally:
+            self._release(state)
+
+    def waiting(self) -> int:
+        """Requests queued for a slot"""
+        return sum(len(state.queue) for state in self._tenants.values())
+
+    def oldest_wait(self) -> float:
+        """Seconds the longest-waiting queued request has been waiting (0 if none)"""
+        enqueued = [entry[2] for state in self._tenants.values() for entry in state.queue]
+        return time.monotonic() - min(enqueued) if enqueued else 0.0
+
+    def _release(self, state: _TenantState):
+        state.active -= 1
+        self._running -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        now = time.monotonic()
+        while self._running < self.capacity:
+            best: Optional[_TenantState] = None
+            retry_in: Optional[float] = None
+
+            for state in self._tenants.values():
+                if not state.queue:
+                    continue
+                if state.max_concurrency is not None and state.active >= state.max_concurrency:
+                    continue  # A release will dispatch again
+                wait = state.seconds_until_token(now)
+                if wait > 0:
+                    retry_in = wait if retry_in is None else min(retry_in, wait)
+                    continue
+                if best is None or state.queue[0][0] < best.queue[0][0]:
+                    best = state
+
+            if best is None:
+                if retry_in is not None:
+                    self._wake_in(retry_in)
+                return
+
+            start_tag, granted, _ = best.queue.popleft()
+            if granted.done():
+                continue  # Cancelled while queued
+            self._virtual_time = max(self._virtual_time, start_tag)
+            if best.rate is not None:
+                best.tokens -= 1.0
+            best.active += 1
+            self._running += 1
+            granted.set_result(None)
+
+    def _wake_in(self, seconds: float):
+        loop = asyncio.get_running_loop()
+        if self._timer is not None:
+            if self._timer.when() <= loop.time() + seconds:
+                return
+            self._timer.cancel()
+        self._timer = loop.call_later(seconds, self._on_timer)
+
+    def _on_timer(self):
+        self._timer = None
+        self._dispatch()
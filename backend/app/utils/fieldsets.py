@@ -0,0 +1,69 @@
+"""
+Sparse fieldsets
+
+Lets a client ask for only the parts of a response it renders:
+
+    ?fields=intent,response_text,data.recipients.name
+
+A dotted path selects a key inside a nested dict; lists are filtered item by
+item, so "data.recipients.name" keeps the name of every recipient. Naming a
+key without a sub-path keeps it whole.
+"""
+from typing import Any, Dict, Iterable, Optional
+
+# {key: sub-tree}, where None keeps the whole value
+FieldTree = Dict[str, Optional[Dict]]
+
+
+class FieldsetError(ValueError):
+    """The fields parameter names something the response doesn't have"""
+
+
+def parse_fields(spec: str, allowed: Iterable[str], always: Iterable[str] = ()) -> FieldTree:
+    """
+    Parse a comma-separated list of dotted paths into a tree
+
+    Args:
+        spec: e.g. "intent,response_text,data.recipients.name"
+        allowed: top-level keys that may be asked for
+        always: top-level keys kept whatever the client asks
+
+    Returns:
+        Tree for apply_fields()
+
+    Raises:
+        FieldsetError: unknown top-level key or empty path segment
+    """
+    allowed = set(allowed)
+    tree: FieldTree = {key: None for key in always}
+    for path in spec.split(","):
+        path = path.strip()
+        if not path:
+            continue
+        parts = path.split(".")
+        if any(not part for part in parts):
+            raise FieldsetError(f"Invalid field path: {path!r}")
+        if parts[0] not in allowed:
+            raise FieldsetError(f"Unknown field: {parts[0]!r}")
+
+        node = tree
+        for i, part in enumerate(parts):
+            last = i == len(parts) - 1
+            if part in node and node[part] is None:
+                break  # Already kept whole
+            if last:
+                node[part] = None
+            else:
+                node = node.setdefault(part, {})
+    return tree
+
+
+def apply_fields(value: Any, tree: Optional[FieldTree]) -> Any:
+    """Keep only the parts of value selected by tree (see parse_fields)"""
+    if tree is None:
+        return value
+    if isinstance(value, dict):
+        return {key: apply_fields(value[key], sub) for key, sub in tree.items() if key in value}
+    if isinstance(value, list):
+        return [apply_fields(item, tree) for item in value]
+    return value  # A scalar can't be narrowed further
@@ -0,0 +1,294 @@
+"""
+Incremental JSON reader for large bank responses
+
+Banks can return very large lists (e.g. a full transaction history). Instead of
+buffering the whole body and calling json.loads on it, this reader is fed raw
+chunks as they arrive from the network and only decodes the items of the array
+we care about. Everything else is skipped with a character scanner, and the
+buffer is trimmed as we go so memory stays bounded by the largest single item.
+"""
+import codecs
+import json
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+Path = Tuple[str, ...]
+
+_WHITESPACE = " \t\r\n"
+_SCALAR_END = ",]} \t\r\n"
+_NEED_MORE = object()
+
+
+class _Cursor:
+    """Shared read buffer between the feeder and the parser generator"""
+
+    def __init__(self):
+        self.buf = ""
+        self.pos = 0
+        self.mark: Optional[int] = None
+        self.eof = False
+
+    def compact(self):
+        """Drop consumed text that no pending value still needs"""
+        cut = self.pos if self.mark is None else min(self.pos, self.mark)
+        if cut > 4096:
+            self.buf = self.buf[cut:]
+            self.pos -= cut
+            if self.mark is not None:
+                self.mark -= cut
+
+
+class JSONArrayStream:
+    """
+    Push-style parser that extracts items of one array from a JSON document
+
+    Args:
+        item_paths: Candidate key paths of the array to extract. `()` means the
+            document itself is the array. The first candidate found wins.
+        capture_paths: Optional {name: path} of scalar values to capture on the
+            way (e.g. a pagination cursor).
+        limit: Stop once this many items have been decoded. If the array
+            holds more, `truncated` is set: the server ignored the limit, and
+            any captures after the array were not read.
+
+    Usage:
+        reader = JSONArrayStream([("data", "transactions")], limit=10)
+        for chunk in chunks:
+            reader.feed(chunk)
+            if reader.done:
+                break
+        reader.close()
+        reader.items, reader.captured, reader.truncated
+    """
+
+    def __init__(
+        self,
+        item_paths: Iterable[Path],
+        capture_paths: Optional[Dict[str, Path]] = None,
+        limit: Optional[int] = None
+    ):
+        self.item_paths = [tuple(p) for p in item_paths]
+        self.capture_paths = {name: tuple(p) for name, p in (capture_paths or {}).items()}
+        self.limit = limit
+        self.items: List[Any] = []
+        self.captured: Dict[str, Any] = {}
+        self.found = False
+        self.truncated = False
+        self.done = False
+        self.bytes_read = 0
+
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._cur = _Cursor()
+        self._parser = self._parse_document()
+        self._step()
+
+    def feed(self, chunk: bytes) -> None:
+        """Feed the next chunk of the raw response body"""
+        if self.done:
+            return
+        self.bytes_read += len(chunk)
+        self._cur.buf += self._decoder.decode(chunk)
+        self._step()
+        self._cur.compact()
+
+    def close(self) -> None:
+        """Signal end of body. Raises ValueError on truncated documents."""
+        if self.done:
+            return
+        self._cur.buf += self._decoder.decode(b"", final=True)
+        self._cur.eof = True
+        self._step()
+        if not self.done:
+            raise ValueError("Unexpected end of JSON document")
+
+    # ------------------------------------------------------------------
+    # Parser (generator based so it can suspend whenever input runs out)
+    # ------------------------------------------------------------------
+
+    def _step(self):
+        try:
+            while next(self._parser) is not _NEED_MORE:
+                pass
+        except StopIteration:
+            self.done = True
+
+    def _is_prefix(self, path: Path) -> bool:
+        n = len(path)
+        return any(len(p) > n and p[:n] == path for p in self.item_paths + list(self.capture_paths.values()))
+
+    def _peek(self):
+        cur = self._cur
+        while True:
+            while cur.pos < len(cur.buf) and cur.buf[cur.pos] in _WHITESPACE:
+                cur.pos += 1
+            if cur.pos < len(cur.buf):
+                return cur.buf[cur.pos]
+            if cur.eof:
+                raise ValueError("Unexpected end of JSON document")
+            yield _NEED_MORE
+
+    def _expect(self, char: str):
+        found = yield from self._peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' at offset {self._cur.pos}, found '{found}'")
+        self._cur.pos += 1
+
+    def _skip_value(self):
+        """Advance past one JSON value without decoding it"""
+        cur = self._cur
+        first = yield from self._peek()
+
+        if first in "{[":
+            depth = 0
+            in_string = False
+            escaped = False
+            while True:
+                while cur.pos < len(cur.buf):
+                    ch = cur.buf[cur.pos]
+                    cur.pos += 1
+                    if in_string:
+                        if escaped:
+                            escaped = False
+                        elif ch == "\\":
+                            escaped = True
+                        elif ch == '"':
+                            in_string = False
+                    elif ch == '"':
+                        in_string = True
+                    elif ch in "{[":
+                        depth += 1
+                    elif ch in "}]":
+                        depth -= 1
+                        if depth == 0:
+                            return
+                if cur.eof:
+                    raise ValueError("Unexpected end of JSON document")
+                yield _NEED_MORE
+
+        elif first == '"':
+            cur.pos += 1
+            escaped = False
+            while True:
+                while cur.pos < len(cur.buf):
+                    ch = cur.buf[cur.pos]
+                    cur.pos += 1
+                    if escaped:
+                        escaped = False
+                    elif ch == "\\":
+                        escaped = True
+                    elif ch == '"':
+                        return
+                if cur.eof:
+                    raise ValueError("Unexpected end of JSON document")
+                yield _NEED_MORE
+
+        else:
+            while True:
+                while cur.pos < len(cur.buf):
+                    if cur.buf[cur.pos] in _SCALAR_END:
+                        return
+                    cur.pos += 1
+                if cur.eof:
+                    return
+                yield _NEED_MORE
+
+    def _read_value(self):
+        """Decode one JSON value, keeping its text buffered until complete"""
+        cur = self._cur
+        yield from self._peek()
+        start = cur.pos
+        cur.mark = start
+        try:
+            yield from self._skip_value()
+        finally:
+            cur.mark = None
+        return json.loads(cur.buf[start:cur.pos])
+
+    def _parse_array_items(self):
+        yield from self._expect("[")
+        self.found = True
+
+        if (yield from self._peek()) == "]":
+            self._cur.pos += 1
+            return
+
+        while True:
+            item = yield from self._read_value()
+            self.items.append(item)
+
+            sep = yield from self._peek()
+            self._cur.pos += 1
+            if sep == "]":
+                return
+            if self.limit is not None and len(self.items) >= self.limit:
+                # More items than we asked for: the server ignored the limit,
+                # so don't download the rest. Captures after the array (the
+                # cursor) go unread; if the array had closed here we keep
+                # going to pick them up.
+                self.truncated = True
+                self.done = True
+                return
+            if sep != ",":
+                raise ValueError(f"Expected ',' or ']' at offset {self._cur.pos - 1}")
+
+    def _parse_value(self, path: Path):
+        first = yield from self._peek()
+
+        if not self.found and first == "[" and path in self.item_paths:
+            yield from self._parse_array_items()
+            return
+
+        for name, capture in self.capture_paths.items():
+            if capture == path and first not in "{[":
+                self.captured[name] = yield from self._read_value()
+                return
+
+        if first == "{" and self._is_prefix(path):
+            yield from self._parse_object(path)
+            return
+
+        yield from self._skip_value()
+
+    def _parse_object(self, path: Path):
+        yield from self._expect("{")
+
+        if (yield from self._peek()) == "}":
+            self._cur.pos += 1
+            return
+
+        while True:
+            key = yield from self._read_value()
+            yield from self._expect(":")
+            yield from self._parse_value(path + (key,))
+            if self.done:
+                return
+
+            sep = yield from self._peek()
+            self._cur.pos += 1
+            if sep == "}":
+                return
+            if sep != ",":
+                raise ValueError(f"Expected ',' or '}}' at offset {self._cur.pos - 1}")
+
+    def _parse_document(self):
+        yield from self._parse_value(())
+
+
+async def stream_json_array(
+    chunks: AsyncIterator[bytes],
+    item_paths: Iterable[Path],
+    capture_paths: Optional[Dict[str, Path]] = None,
+    limit: Optional[int] = None
+) -> JSONArrayStream:
+    """
+    Consume an async byte stream (e.g. httpx `response.aiter_bytes()`)
+
+    Stops reading as soon as `limit` items have been decoded, so the rest of a
+    huge body is never downloaded or parsed (see JSONArrayStream.truncated).
+    """
+    reader = JSONArrayStream(item_paths, capture_paths=capture_paths, limit=limit)
+    async for chunk in chunks:
+        reader.feed(chunk)
+        if reader.done:
+            break
+    reader.close()
+    return reader
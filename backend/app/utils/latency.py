@@ -0,0 +1,112 @@
+"""
+Rolling latency histogram
+
+Records request latencies into fixed log-spaced buckets, split into time
+slices so old observations age out. Recording is O(1) and percentiles are
+estimated from the bucket counts, so it is cheap enough to call on every
+bank API request.
+"""
+import bisect
+import time
+from typing import Dict, List, Optional
+
+# Bucket upper bounds in seconds (5ms .. 60s, roughly x1.5 per step)
+DEFAULT_BOUNDS: List[float] = [
+    0.005, 0.0075, 0.01, 0.015, 0.025, 0.035, 0.05, 0.075, 0.1, 0.15,
+    0.25, 0.35, 0.5, 0.75, 1.0, 1.5, 2.5, 3.5, 5.0, 7.5, 10.0, 15.0,
+    25.0, 35.0, 60.0,
+]
+
+
+class _Slice:
+    __slots__ = ("started", "counts", "errors", "total")
+
+    def __init__(self, started: float, n_buckets: int):
+        self.started = started
+        self.counts = [0] * n_buckets
+        self.errors = 0
+        self.total = 0
+
+
+class RollingHistogram:
+    """
+    Latency histogram over the last `window_seconds`
+
+    The window is divided into `slices` ring entries; each entry covers
+    window_seconds / slices and is reset when the ring wraps around to it.
+    """
+
+    def __init__(self, window_seconds: float = 300.0, slices: int = 10, bounds: Optional[List[float]] = None):
+        self.bounds = bounds or DEFAULT_BOUNDS
+        self.slice_seconds = window_seconds / slices
+        self._ring = [_Slice(0.0, len(self.bounds) + 1) for _ in range(slices)]
+        self.last_observed_at: Optional[float] = None
+
+    def _current(self, now: float) -> _Slice:
+        index = int(now // self.slice_seconds)
+        entry = self._ring[index % len(self._ring)]
+        started = index * self.slice_seconds
+        if entry.started != started:
+            entry.started = started
+            entry.counts = [0] * (len(self.bounds) + 1)
+            entry.errors = 0
+            entry.total = 0
+        return entry
+
+    def observe(self, seconds: float, ok: bool = True, now: Optional[float] = None):
+        """Record one request"""
+        now = time.time() if now is None else now
+        entry = self._current(now)
+        entry.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        entry.total += 1
+        if not ok:
+            entry.errors += 1
+        self.last_observed_at = now
+
+    def _live(self, now: float) -> List[_Slice]:
+        oldest = now - self.slice_seconds * len(self._ring)
+        return [entry for entry in self._ring if entry.started > oldest and entry.total]
+
+    def summary(self, now: Optional[float] = None) -> Dict:
+        """
+        Returns:
+            {
+                "samples": int,
+                "error_rate": float,
+                "p50_ms": float | None,
+                "p95_ms": float | None,
+                "p99_ms": float | None
+            }
+        """
+        now = time.time() if now is None else now
+        live = self._live(now)
+
+        counts = [0] * (len(self.bounds) + 1)
+        errors = 0
+        for entry in live:
+            errors += entry.errors
+            for i, c in enumerate(entry.counts):
+                counts[i] += c
+        total = sum(counts)
+
+        def quantile(q: float) -> Optional[float]:
+            if not total:
+                return None
+            rank = q * total
+            seen = 0
+            for i, c in enumerate(counts):
+                if c and seen + c >= rank:
+                    lower = self.bounds[i - 1] if i > 0 else 0.0
+                    upper = self.bounds[i] if i < len(self.bounds) else self.bounds[-1]
+                    # Linear interpolation inside the bucket
+                    return round((lower + (upper - lower) * (rank - seen) / c) * 1000, 1)
+                seen += c
+            return round(self.bounds[-1] * 1000, 1)
+
+        return {
+            "samples": total,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "p50_ms": quantile(0.50),
+            "p95_ms": quantile(0.95),
+            "p99_ms": quantile(0.99),
+        }
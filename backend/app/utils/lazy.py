@@ -0,0 +1,70 @@
+"""
+Lazily constructed service singletons
+
+Services that are expensive to build (API clients, a pyttsx3 engine, a local
+Whisper model) used to be created when their module was imported, so every
+cold start paid for all of them before the port was bound. Wrapping the
+singleton in LazyService keeps the module-level name callers already import,
+but builds the instance on first attribute access:
+
+    whisper_service = LazyService(WhisperService, "whisper")
+    ...
+    await whisper_service.transcribe_audio(file)   # built here, once
+
+Construction is thread-safe. Building on first use from the event loop blocks
+it, so the app warms the services up in a worker thread right after startup
+(see app/services/warmup.py); a request only pays if it arrives first.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Generic, Optional, TypeVar
+from app.core.metrics import SERVICE_INIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LazyService(Generic[T]):
+    """Proxy that builds `factory()` on first use and forwards attribute access to it"""
+
+    def __init__(self, factory: Callable[[], T], name: str):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    def get(self) -> T:
+        """The service instance, built now if it doesn't exist yet"""
+        instance: Optional[T] = self._instance
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            if self._instance is None:
+                started = time.perf_counter()
+                instance = self._factory()
+                elapsed = time.perf_counter() - started
+                object.__setattr__(self, "_instance", instance)
+                SERVICE_INIT_SECONDS.set(elapsed, service=self._name)
+                logger.info(
+                    "%s service ready in %.0fms", self._name, elapsed * 1000,
+                    extra={"service": self._name, "init_ms": round(elapsed * 1000, 1)}
+                )
+            return self._instance
+
+    def __getattr__(self, name: str):
+        # Only called for names not found on the proxy itself
+        return getattr(self.get(), name)
+
+    def __setattr__(self, name: str, value):
+        setattr(self.get(), name, value)
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazyService {self._name} ({state})>"
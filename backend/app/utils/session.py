@@ -5,6 +5,7 @@ For production on Azure, consider using Azure Cache for Redis or database-backed
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
 import json
+from app.core.metrics import ACTIVE_SESSIONS
 
 
 class InMemorySessionStore:
@@ -42,6 +43,9 @@ class InMemorySessionStore:
         if session_id in self._store:
             self._store[session_id].update(data)
 
+    def __len__(self) -> int:
+        return len(self._store)
+
     def _cleanup_expired(self):
         """Remove expired sessions"""
         now = datetime.utcnow()
@@ -55,3 +59,4 @@ class InMemorySessionStore:
 
 # Global session store instance
 session_store = InMemorySessionStore()
+ACTIVE_SESSIONS.set_function(lambda: len(session_store))
@@ -0,0 +1,99 @@
+"""
+Single-flight call coalescing
+
+Concurrent callers asking for the same key share one in-flight call instead
+of each starting their own. Nothing is cached: once the call finishes, the
+next caller starts a fresh one.
+
+    flights = SingleFlight()
+    result = await flights.do(("get_balance", account), lambda: fetch_balance(account))
+
+The shared call runs in its own task. A caller that is cancelled stops
+waiting without cancelling it for the others; only when every caller has
+gone is the call itself cancelled.
+
+The shared call belongs to no single caller, so it runs in an empty context:
+not under the first caller's trace span, and with a deadline (see
+app/core/deadline.py) that is the latest of its callers', extended when a
+caller with more budget joins (timeouts already in progress keep theirs).
+Each caller still stops waiting when its own deadline runs out.
+"""
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from app.core.deadline import Deadline, current_deadline, start_deadline, within_deadline
+
+
+class _Flight:
+    __slots__ = ("task", "waiters", "deadline")
+
+    def __init__(self, task: asyncio.Task, deadline: Optional[Deadline]):
+        self.task = task
+        self.waiters = 0
+        self.deadline = deadline
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls by key"""
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    async def do(
+        self,
+        key: Hashable,
+        call: Callable[[], Awaitable[Any]],
+        on_coalesced: Optional[Callable[[], None]] = None,
+        stage: str = "shared_call"
+    ) -> Any:
+        """
+        Run call(), or join the identical call already in flight
+
+        Args:
+            key: Identifies identical calls
+            call: Starts the call (a coroutine); only invoked when nothing is
+                in flight for key
+            on_coalesced: Invoked when this caller joins an existing call
+            stage: Name reported when this caller's deadline runs out
+
+        Returns:
+            The shared call's result (its exception is raised to every caller)
+
+        Raises:
+            DeadlineExceeded: This caller's deadline ran out while waiting
+        """
+        caller_deadline = current_deadline()
+        flight = self._flights.get(key)
+        if flight is None:
+            context = contextvars.Context()
+            deadline = context.run(start_deadline, caller_deadline.remaining()) if caller_deadline else None
+            task = asyncio.get_running_loop().create_task(context.run(call), context=context)
+            flight = _Flight(task, deadline)
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            if flight.deadline is not None:
+                flight.deadline.extend_to(caller_deadline)
+            if on_coalesced is not None:
+                on_coalesced()
+
+        flight.waiters += 1
+        try:
+            return await within_deadline(self._wait(flight), stage)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Every caller gave up (cancelled or out of time): nobody wants the result
+                flight.task.cancel()
+                self._forget(key, flight)
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    @staticmethod
+    async def _wait(flight: _Flight) -> Any:
+        return await asyncio.shield(flight.task)
+
+    def _forget(self, key: Hashable, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
@@ -0,0 +1,266 @@
+"""
+Bytes moved per voice turn on the audio paths: temp-file vs in-memory
+
+Runs the STT input path (upload -> Whisper request) and the TTS output path
+(pyttsx3 render -> base64 response) both ways:
+
+    legacy    - the previous implementation, reproduced here: upload written
+                to a temp file and re-read; TTS rendered to a temp file on disk,
+                read back and unlinked
+    current   - the services as they are now (in-memory upload, tmpfs scratch)
+
+Whisper and pyttsx3 are faked (the fake SDK reads the whole payload like the
+real multipart encoder does; the fake engine writes a WAV of realistic size),
+so only EchoBank's own handling is measured.
+
+Reported per turn:
+    syscall_bytes  bytes through read()/write() syscalls (/proc/self/io rchar+wchar, Linux)
+    disk_bytes     bytes written to temp files outside tmpfs
+    peak_kib       peak Python memory allocated during the turn (tracemalloc)
+
+Usage (from backend/):
+    python -m benchmarks.audio_copies
+    python -m benchmarks.audio_copies --seconds 3 10 60 --turns 50
+"""
+import argparse
+import asyncio
+import base64
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+for key, value in {
+    "TOGETHER_API_KEY": "benchmark", "WHISPERAPI": "benchmark", "DATABASE_URL": "sqlite://",
+    "JWT_SECRET_KEY": "benchmark", "ENCRYPTION_KEY": "benchmark",
+    "EMAIL_SENDER": "benchmark@example.com", "EMAIL_PASSWORD": "benchmark",
+}.items():
+    os.environ.setdefault(key, value)
+sys.path.insert(0, str(BACKEND_DIR))
+
+from starlette.datastructures import UploadFile  # noqa: E402
+from benchmarks.fakes import silent_wav  # noqa: E402
+
+# Roughly what pyttsx3/espeak produces for one sentence (22.05kHz mono, ~4s)
+TTS_WAV_SECONDS = 4.0
+TTS_TEXT = "Your account balance is ninety five thousand naira. Is there anything else I can help with?"
+
+
+# ============================================================================
+# FAKES
+# ============================================================================
+
+class _FakeTranscriptions:
+    def create(self, model, file, language=None):
+        # The SDK reads the whole payload into the multipart body
+        if isinstance(file, tuple):
+            content = file[1]
+        else:
+            content = file
+        if hasattr(content, "read"):
+            content = content.read()
+        bytes(content)
+        return type("Transcript", (), {"text": " what is my balance "})()
+
+
+class _FakeOpenAI:
+    def __init__(self):
+        self.audio = type("Audio", (), {"transcriptions": _FakeTranscriptions()})()
+
+
+def _on_tmpfs(path: str) -> bool:
+    return str(path).startswith("/dev/shm")
+
+
+class _FakeEngine:
+    def __init__(self):
+        self._job = None
+
+    def getProperty(self, name):
+        return []
+
+    def setProperty(self, *args):
+        pass
+
+    def save_to_file(self, text, path):
+        self._job = path
+
+    def runAndWait(self):
+        audio = silent_wav(TTS_WAV_SECONDS, sample_rate=22050)
+        with open(self._job, "wb") as f:
+            f.write(audio)
+        if _DiskWriteCounter.active is not None and not _on_tmpfs(self._job):
+            _DiskWriteCounter.active.bytes += len(audio)
+
+    def stop(self):
+        pass
+
+
+class _FakePyttsx3:
+    @staticmethod
+    def init():
+        return _FakeEngine()
+
+
+# ============================================================================
+# LEGACY PATHS (as they were before in-memory handling)
+# ============================================================================
+
+async def legacy_stt(upload: UploadFile, client) -> Dict:
+    temp_audio_path = None
+    try:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_audio:
+            content = await upload.read()
+            temp_audio.write(content)
+            temp_audio_path = temp_audio.name
+        with open(temp_audio_path, "rb") as audio:
+            transcript = client.audio.transcriptions.create(model="whisper-1", file=audio, language="en")
+        return {"transcript": transcript.text.strip()}
+    finally:
+        if temp_audio_path and os.path.exists(temp_audio_path):
+            os.unlink(temp_audio_path)
+
+
+async def legacy_tts(text: str) -> Dict:
+    engine = _FakePyttsx3.init()
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_audio:
+        audio_path = temp_audio.name
+    engine.save_to_file(text, audio_path)
+    engine.runAndWait()
+    with open(audio_path, "rb") as audio_file:
+        audio_bytes = audio_file.read()
+        audio_base64 = base64.b64encode(audio_bytes).decode("utf-8")
+    os.unlink(audio_path)
+    return {"audio_base64": audio_base64}
+
+
+# ============================================================================
+# MEASUREMENT
+# ============================================================================
+
+def _proc_io() -> int:
+    try:
+        with open("/proc/self/io") as f:
+            fields = dict(line.split(": ") for line in f.read().splitlines())
+        return int(fields["rchar"]) + int(fields["wchar"])
+    except (OSError, KeyError, ValueError):
+        return 0
+
+
+class _DiskWriteCounter:
+    """Counts bytes written to temp files that are not on tmpfs"""
+
+    active = None
+
+    def __init__(self):
+        self.bytes = 0
+        self._original = tempfile.NamedTemporaryFile
+
+    def __enter__(self):
+        counter = self
+
+        def tracked(*args, **kwargs):
+            handle = counter._original(*args, **kwargs)
+            on_tmpfs = _on_tmpfs(handle.name)
+            write = handle.write
+
+            def counting_write(data):
+                if not on_tmpfs:
+                    counter.bytes += len(data)
+                return write(data)
+            handle.write = counting_write
+            return handle
+
+        tempfile.NamedTemporaryFile = tracked
+        _DiskWriteCounter.active = self
+        return self
+
+    def __exit__(self, *exc):
+        tempfile.NamedTemporaryFile = self._original
+        _DiskWriteCounter.active = None
+
+
+def _make_upload(wav: bytes) -> UploadFile:
+    # Same container Starlette uses for multipart uploads
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    spooled.write(wav)
+    spooled.seek(0)
+    return UploadFile(file=spooled, size=len(wav), filename="turn.wav")
+
+
+async def measure(name: str, turn: Callable, turns: int) -> Dict:
+    await turn()  # warm up imports and caches
+
+    io_before = _proc_io()
+    tracemalloc.start()
+    start = time.perf_counter()
+    with _DiskWriteCounter() as disk:
+        for _ in range(turns):
+            await turn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    io_bytes = _proc_io() - io_before
+
+    return {
+        "name": name,
+        "syscall_bytes": io_bytes // turns,
+        "disk_bytes": disk.bytes // turns,
+        "peak_kib": peak // 1024,
+        "ms_per_turn": elapsed / turns * 1000,
+    }
+
+
+async def run(seconds_list, turns: int):
+    import app.services.tts as tts_module
+    from app.services.stt_backends import RemoteWhisperBackend
+    from app.services.tts import TTSService
+
+    tts_module.pyttsx3 = _FakePyttsx3
+    tts_module.PYTTSX3_AVAILABLE = True
+    tts = TTSService()
+    tts.available = True
+
+    remote = RemoteWhisperBackend()
+    remote.client = _FakeOpenAI()
+    legacy_client = _FakeOpenAI()
+
+    from app.services.whisper import WhisperService
+    whisper = WhisperService()
+    whisper.remote = whisper.backend = remote
+
+    rows = []
+    for seconds in seconds_list:
+        wav = silent_wav(seconds)
+        label = f"stt {seconds:g}s ({len(wav) // 1024} KiB)"
+        rows.append((label, await measure("legacy", lambda: legacy_stt(_make_upload(wav), legacy_client), turns)))
+        rows.append((label, await measure("current", lambda: whisper.transcribe_audio(_make_upload(wav)), turns)))
+
+    label = f"tts -> base64 ({TTS_WAV_SECONDS:g}s wav)"
+    rows.append((label, await measure("legacy", lambda: legacy_tts(TTS_TEXT), turns)))
+    rows.append((label, await measure("current", lambda: tts.text_to_speech(TTS_TEXT), turns)))
+    label = f"tts -> bytes ({TTS_WAV_SECONDS:g}s wav)"
+    rows.append((label, await measure("current", lambda: tts.text_to_speech(TTS_TEXT, return_format="bytes"), turns)))
+
+    print(f"{'path':<28} {'impl':<8} {'syscall B':>11} {'disk B':>10} {'peak KiB':>9} {'ms/turn':>8}")
+    for label, r in rows:
+        print(f"{label:<28} {r['name']:<8} {r['syscall_bytes']:>11,} {r['disk_bytes']:>10,} "
+              f"{r['peak_kib']:>9,} {r['ms_per_turn']:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes copied per turn on the audio paths")
+    parser.add_argument("--seconds", type=float, nargs="+", default=[3, 10, 60],
+                        help="Upload lengths to test (16kHz mono WAV)")
+    parser.add_argument("--turns", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.seconds, args.turns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Cold start benchmark
+
+Measures what a fresh instance (a Render deploy or a free-tier wake-up)
+spends before it can answer, each in a new interpreter:
+
+    import     time to `import app.main`
+    healthy    process spawn -> first 200 from GET /health (uvicorn, real port)
+    ready      process spawn -> first 200 from GET /health/ready (the startup
+               warm-up has finished: services built, banks connected, caches
+               primed)
+
+Every run gets an empty SQLite database, so init_db() creates the schema as
+it would on a new deploy.
+
+Usage (from backend/):
+    python -m benchmarks.cold_start
+    python -m benchmarks.cold_start --runs 10 --no-warmup
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmarks.loadtest import BACKEND_DIR, configure_environment, git_info
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def run_env(db_path: str, warmup: bool) -> Dict[str, str]:
+    """Environment for one child process, with its own empty database"""
+    configure_environment(db_path)
+    env = dict(os.environ)
+    env["WARMUP_ON_STARTUP"] = "true" if warmup else "false"
+    env["JOB_QUEUE_PATH"] = db_path + ".jobs"
+    env["WARMUP_INTENT_SEEDS"] = ""  # The API keys are fake; priming would only wait on errors
+    env["PYTHONPATH"] = str(BACKEND_DIR)
+    return env
+
+
+def measure_import(env: Dict[str, str]) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=str(BACKEND_DIR), env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def measure_startup(env: Dict[str, str], timeout: float) -> Dict[str, Optional[float]]:
+    """Spawn uvicorn and time /health, then /health/ready"""
+    import httpx
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=str(BACKEND_DIR), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    healthy = ready = None
+    try:
+        with httpx.Client(base_url=base_url, timeout=1.0) as client:
+            while time.perf_counter() - started < timeout:
+                if process.poll() is not None:
+                    raise SystemExit("EchoBank API exited during startup (run it by hand to see why)")
+                try:
+                    if healthy is None:
+                        if client.get("/health").status_code == 200:
+                            healthy = time.perf_counter() - started
+                    if healthy is not None and client.get("/health/ready").status_code == 200:
+                        ready = time.perf_counter() - started
+                        break
+                except httpx.HTTPError:
+                    pass
+                time.sleep(0.02)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+    return {"healthy": healthy, "ready": ready}
+
+
+def summarize(values: List[Optional[float]]) -> Optional[Dict[str, float]]:
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    return {
+        "runs": len(values),
+        "median_ms": statistics.median(values) * 1000,
+        "min_ms": min(values) * 1000,
+        "max_ms": max(values) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EchoBank import and startup time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--no-warmup", action="store_true", help="Start with WARMUP_ON_STARTUP=false")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Give up on a startup after this many seconds")
+    parser.add_argument("--output", help="Also save the result as JSON")
+    args = parser.parse_args()
+    warmup = not args.no_warmup
+
+    imports, healthy, ready = [], [], []
+    with tempfile.TemporaryDirectory(prefix="echobank-coldstart-") as tmp:
+        for run in range(args.runs):
+            env = run_env(os.path.join(tmp, f"import-{run}.db"), warmup)
+            imports.append(measure_import(env))
+
+            env = run_env(os.path.join(tmp, f"startup-{run}.db"), warmup)
+            times = measure_startup(env, args.timeout)
+            healthy.append(times["healthy"])
+            ready.append(times["ready"])
+
+    result = {
+        "meta": {**git_info(), "runs": args.runs, "warmup": warmup, "python": sys.version.split()[0]},
+        "import": summarize(imports),
+        "healthy": summarize(healthy),
+        "ready": summarize(ready),
+    }
+
+    print()
+    print(f"{'phase':<10} {'runs':>5} {'median':>10} {'min':>10} {'max':>10}")
+    for phase in ("import", "healthy", "ready"):
+        s = result[phase]
+        if s is None:
+            print(f"{phase:<10} {'-':>5}")
+            continue
+        print(f"{phase:<10} {s['runs']:>5} {s['median_ms']:>8.0f}ms {s['min_ms']:>8.0f}ms {s['max_ms']:>8.0f}ms")
+    print()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
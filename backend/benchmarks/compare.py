@@ -0,0 +1,73 @@
+"""
+Compare two load test result files
+
+Usage (from backend/):
+    python -m benchmarks.compare benchmarks/results/BASE.json benchmarks/results/NEW.json
+    python -m benchmarks.compare BASE.json NEW.json --threshold 15
+
+Exits with status 1 if any p50/p95/p99 got slower than --threshold percent,
+or if throughput dropped by more than --threshold percent.
+"""
+import argparse
+import json
+import sys
+from typing import Dict, List, Tuple
+
+PERCENTILES = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def _rows(base: Dict, new: Dict) -> List[Tuple[str, str, float, float]]:
+    """(section, metric, base_value, new_value) for every metric both runs have"""
+    rows = []
+
+    for name in sorted(set(base["client"]) & set(new["client"])):
+        b, n = base["client"][name], new["client"][name]
+        rows.append((f"client.{name}", "throughput_rps", b["throughput_rps"], n["throughput_rps"]))
+        for key in PERCENTILES:
+            rows.append((f"client.{name}", key, b["latency_ms"][key], n["latency_ms"][key]))
+
+    for name in sorted(set(base["stages"]) & set(new["stages"])):
+        b, n = base["stages"][name], new["stages"][name]
+        for key in PERCENTILES:
+            if b.get(key) is not None and n.get(key) is not None:
+                rows.append((f"stage.{name}", key, b[key], n[key]))
+
+    return rows
+
+
+def compare(base: Dict, new: Dict, threshold_pct: float = 10.0) -> bool:
+    """Print a diff table; return True if nothing regressed beyond the threshold"""
+    print(f"base: {base['meta']['git_commit'][:10]}  {base['meta']['timestamp']}")
+    print(f"new:  {new['meta']['git_commit'][:10]}  {new['meta']['timestamp']}")
+    print()
+    print(f"{'section':<28} {'metric':<15} {'base':>10} {'new':>10} {'change':>9}")
+
+    ok = True
+    for section, metric, b, n in _rows(base, new):
+        change = ((n - b) / b * 100) if b else 0.0
+        # Higher is better for throughput, lower is better for latency
+        regressed = change < -threshold_pct if metric == "throughput_rps" else change > threshold_pct
+        flag = "  REGRESSION" if regressed else ""
+        ok = ok and not regressed
+        print(f"{section:<28} {metric:<15} {b:>10.1f} {n:>10.1f} {change:>+8.1f}%{flag}")
+
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two EchoBank load test results")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed slowdown in percent")
+    args = parser.parse_args()
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    sys.exit(0 if compare(base, new, args.threshold) else 1)
+
+
+if __name__ == "__main__":
+    main()
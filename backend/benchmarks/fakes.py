@@ -0,0 +1,183 @@
+"""
+Fake STT / LLM / TTS backends for load testing
+
+They stand in for Whisper, Together AI and pyttsx3 so a benchmark measures
+EchoBank itself (orchestration, bank calls, serialization) rather than the
+network to OpenAI. Each fake waits for a latency drawn from a configurable
+distribution before answering.
+
+Latency specs (milliseconds):
+    fixed:200                  always 200ms
+    uniform:100,300            uniformly between 100 and 300
+    normal:400,80              mean 400, std 80 (clamped at 0)
+    lognormal:350,0.4          median 350, sigma 0.4 (long right tail, like real APIs)
+    0                          no delay
+
+`blocking=True` sleeps with time.sleep instead of asyncio.sleep. That is how
+the real services behave today (the OpenAI SDK and pyttsx3 are synchronous),
+so it shows what a slow provider does to every other in-flight request.
+"""
+import asyncio
+import base64
+import io
+import math
+import random
+import re
+import time
+import wave
+from typing import Dict, Optional
+
+
+class LatencyDistribution:
+    """Parsed latency spec; sample() returns seconds"""
+
+    def __init__(self, spec: str, seed: Optional[int] = None):
+        self.spec = spec
+        self._random = random.Random(seed)
+        kind, _, params = spec.partition(":")
+        if not params:
+            kind, params = "fixed", kind
+        self.kind = kind
+        self.params = [float(p) for p in params.split(",") if p]
+
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if self.kind not in expected or len(self.params) != expected[self.kind]:
+            raise ValueError(f"Invalid latency spec {spec!r} (see benchmarks/fakes.py)")
+
+    def sample(self) -> float:
+        p = self.params
+        if self.kind == "fixed":
+            ms = p[0]
+        elif self.kind == "uniform":
+            ms = self._random.uniform(p[0], p[1])
+        elif self.kind == "normal":
+            ms = max(0.0, self._random.gauss(p[0], p[1]))
+        else:
+            ms = self._random.lognormvariate(math.log(max(p[0], 1e-3)), p[1])
+        return ms / 1000
+
+    def __repr__(self):
+        return f"LatencyDistribution({self.spec!r})"
+
+
+class _FakeBackend:
+    def __init__(self, latency: LatencyDistribution, blocking: bool = False):
+        self.latency = latency
+        self.blocking = blocking
+        self.calls = 0
+
+    async def _wait(self):
+        self.calls += 1
+        delay = self.latency.sample()
+        if self.blocking:
+            time.sleep(delay)
+        elif delay > 0:
+            await asyncio.sleep(delay)
+
+
+class FakeWhisper(_FakeBackend):
+    """
+    Returns the utterance embedded in the uploaded file
+
+    The load generator sends a WAV whose filename is the utterance with
+    spaces replaced by underscores (e.g. "whats_my_balance.wav").
+    """
+
+    async def transcribe_audio(self, audio_file) -> Dict:
+        await audio_file.read()
+        return await self.transcribe_bytes(b"", audio_file.filename)
+
+    async def transcribe_bytes(self, data: bytes, filename: Optional[str] = None) -> Dict:
+        await self._wait()
+        name = (filename or "what_is_my_balance.wav").rsplit(".", 1)[0]
+        return {
+            "transcript": name.replace("_", " "),
+            "confidence": 0.95,
+            "language": "en"
+        }
+
+
+class FakeLLM(_FakeBackend):
+    """Keyword intent parser with the same output shape as LLMService.parse_intent"""
+
+    _AMOUNT = re.compile(r"(\d[\d,]*)")
+
+    async def parse_intent(self, transcript: str, context: Optional[Dict] = None) -> Dict:
+        await self._wait()
+        text = transcript.lower()
+
+        if "balance" in text:
+            return self._result("check_balance", {}, "complete")
+        if "transaction" in text or "history" in text:
+            return self._result("view_transactions", {}, "complete")
+        if "recipient" in text or "beneficiar" in text:
+            return self._result("view_recipients", {}, "complete")
+        if "send" in text or "transfer" in text:
+            entities = {}
+            amount = self._AMOUNT.search(text)
+            if amount:
+                entities["amount"] = int(amount.group(1).replace(",", ""))
+            words = transcript.split()
+            if "to" in [w.lower() for w in words]:
+                idx = [w.lower() for w in words].index("to")
+                if idx + 1 < len(words):
+                    entities["recipient"] = words[idx + 1]
+            return self._result("transfer", entities, "confirm_transfer")
+        return self._result("unknown", {}, "clarify")
+
+    @staticmethod
+    def _result(intent: str, entities: Dict, next_step: str) -> Dict:
+        return {"intent": intent, "confidence": 0.9, "entities": entities, "next_step": next_step}
+
+
+def silent_wav(seconds: float, sample_rate: int = 16000) -> bytes:
+    """Mono 16-bit PCM silence"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(b"\x00\x00" * int(seconds * sample_rate))
+    return buffer.getvalue()
+
+
+class FakeTTS(_FakeBackend):
+    """Returns silence about as long as the text would take to say"""
+
+    async def text_to_speech(self, text: str, voice: str = "default", speed: float = 1.0,
+                             return_format: str = "base64") -> Dict:
+        await self._wait()
+        duration = (len(text.split()) / 150) * 60 / speed
+        audio = silent_wav(duration)
+        result = {
+            "success": True,
+            "text": text,
+            "duration_estimate": duration,
+            "format": "wav",
+            "error": None
+        }
+        if return_format == "bytes":
+            result["audio_bytes"] = audio
+        else:
+            result["audio_base64"] = base64.b64encode(audio).decode("utf-8")
+        return result
+
+    def render_wav(self, text: str, speed: float = 1.0) -> bytes:
+        """Blocking render used by streamed TTS (runs on the TTS worker thread)"""
+        self.calls += 1
+        time.sleep(self.latency.sample())
+        return silent_wav((len(text.split()) / 150) * 60 / speed)
+
+
+def install(stt: FakeWhisper, llm: FakeLLM, tts: FakeTTS):
+    """Swap the fakes into the app's service singletons"""
+    from app.services.whisper import whisper_service
+    from app.services.llm import llm_service
+    from app.services.tts import tts_service
+
+    whisper_service.transcribe_audio = stt.transcribe_audio
+    whisper_service.transcribe_bytes = stt.transcribe_bytes
+    llm_service.parse_intent = llm.parse_intent
+    tts_service.text_to_speech = tts.text_to_speech
+    tts_service.render_wav = tts.render_wav
+    tts_service.available = True
@@ -0,0 +1,512 @@
+"""
+Load test for the voice orchestrator
+
+Starts the EchoBank API in-process (uvicorn on a background thread) with fake
+STT / LLM / TTS backends, points a benchmark company at mock_bank_server.py,
+then drives /api/v1/voice/process-text and /process-audio at a fixed
+concurrency. Reports client-side throughput and latency percentiles plus
+per-stage percentiles taken from the server's /metrics histograms, and saves
+everything as JSON tagged with the git commit.
+
+Usage (from backend/):
+    python ../mock_bank_server.py &            # or pass --start-bank
+    python -m benchmarks.loadtest --concurrency 20 --requests 500
+    python -m benchmarks.loadtest --duration 60 --audio-ratio 0.5 --include-audio
+    python -m benchmarks.loadtest --llm-latency lognormal:350,0.4 --blocking-fakes
+    python -m benchmarks.loadtest --compare benchmarks/results/<baseline>.json
+
+See benchmarks/README.md for the latency spec syntax and result format.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+REPO_DIR = BACKEND_DIR.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# Account on mock_bank_server.py with recipients, balance and transactions
+BENCH_ACCOUNT = "8523711419"
+
+# (utterance, weight) - roughly what users ask for
+SCENARIOS = [
+    ("what is my balance", 40),
+    ("show my recipients", 20),
+    ("show my transaction history", 20),
+    ("send 5000 to Chioma", 20),
+]
+
+
+# ============================================================================
+# SETUP
+# ============================================================================
+
+def configure_environment(db_path: str):
+    """Settings the app needs at import time; the benchmark DB is always isolated"""
+    defaults = {
+        "TOGETHER_API_KEY": "benchmark",
+        "WHISPERAPI": "benchmark",
+        "JWT_SECRET_KEY": "benchmark",
+        "ENCRYPTION_KEY": "benchmark",
+        "EMAIL_SENDER": "benchmark@example.com",
+        "EMAIL_PASSWORD": "benchmark",
+        "LOG_LEVEL": "WARNING",
+    }
+    for key, value in defaults.items():
+        os.environ.setdefault(key, value)
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["HEALTH_PROBE_ENABLED"] = "false"
+    os.environ["ENVIRONMENT"] = "benchmark"
+
+
+def seed_company(bank_url: str) -> int:
+    """Create the benchmark company pointing at the mock bank"""
+    from app.core.database import SessionLocal, init_db
+    from app.models.company import Company, CompanyEndpoints
+
+    init_db()
+    db = SessionLocal()
+    try:
+        company = Company(
+            company_name="Benchmark Bank",
+            email="benchmark@example.com",
+            contact_person="Benchmark",
+            phone="0000000000",
+            api_key="echobank_benchmark",
+            api_secret="benchmark",
+            is_active=True,
+            is_verified=True
+        )
+        db.add(company)
+        db.commit()
+        db.refresh(company)
+
+        db.add(CompanyEndpoints(
+            company_id=company.id,
+            base_url=bank_url,
+            get_balance_endpoint="/api/v1/accounts/{account_number}/balance",
+            get_recipients_endpoint="/api/v1/accounts/{account_number}/beneficiaries",
+            get_transactions_endpoint="/api/v1/accounts/{account_number}/transactions",
+            initiate_transfer_endpoint="/api/v1/transfers/initiate",
+            confirm_transfer_endpoint="/api/v1/transfers/{transfer_id}/confirm",
+            cancel_transfer_endpoint="/api/v1/transfers/{transfer_id}/cancel",
+            is_active=True
+        ))
+        db.commit()
+        return company.id
+    finally:
+        db.close()
+
+
+def wait_for(url: str, timeout: float = 15.0) -> bool:
+    import httpx
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1.0)
+            return True
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    return False
+
+
+def start_mock_bank(bank_url: str) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, str(REPO_DIR / "mock_bank_server.py")],
+        cwd=str(REPO_DIR),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    if not wait_for(bank_url):
+        process.terminate()
+        raise SystemExit(f"mock_bank_server.py did not come up on {bank_url}")
+    return process
+
+
+def start_api(port: int):
+    """Run the app on a background thread so the load generator has its own loop"""
+    import uvicorn
+    from app.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="echobank-api", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise SystemExit("EchoBank API failed to start")
+        time.sleep(0.05)
+    return server, thread
+
+
+# ============================================================================
+# PERCENTILES
+# ============================================================================
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """Linear-interpolated percentile of already sorted values (q in 0..1)"""
+    if not sorted_values:
+        return None
+    pos = (len(sorted_values) - 1) * q
+    low = int(pos)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (pos - low)
+
+
+def histogram_quantile(q: float, buckets: Dict[float, float]) -> Optional[float]:
+    """Quantile from cumulative Prometheus buckets (same interpolation as PromQL)"""
+    bounds = sorted(buckets)
+    total = buckets[bounds[-1]] if bounds else 0
+    if total <= 0:
+        return None
+
+    rank = q * total
+    prev_bound, prev_count = 0.0, 0.0
+    for bound in bounds:
+        count = buckets[bound]
+        if count >= rank:
+            if bound == float("inf"):
+                return prev_bound
+            if count == prev_count:
+                return bound
+            return prev_bound + (bound - prev_bound) * (rank - prev_count) / (count - prev_count)
+        prev_bound, prev_count = bound, count
+    return prev_bound
+
+
+def _parse_labels(raw: str) -> Dict[str, str]:
+    labels = {}
+    for part in raw.split('",'):
+        if "=" in part:
+            key, value = part.split("=", 1)
+            labels[key.strip()] = value.strip().strip('"')
+    return labels
+
+
+def parse_histogram(text: str, name: str, group_by: str) -> Dict[str, Dict]:
+    """
+    Sum one histogram from /metrics output over every label except group_by
+
+    Returns:
+        {group_value: {"buckets": {le: cumulative_count}, "sum": float, "count": float}}
+    """
+    groups: Dict[str, Dict] = defaultdict(lambda: {"buckets": defaultdict(float), "sum": 0.0, "count": 0.0})
+    for line in text.splitlines():
+        if not line.startswith(name) or line.startswith("#"):
+            continue
+        series, _, value = line.rpartition(" ")
+        metric, _, raw_labels = series.partition("{")
+        labels = _parse_labels(raw_labels.rstrip("}"))
+        group = groups[labels.get(group_by, "")]
+
+        if metric == f"{name}_bucket":
+            le = labels["le"]
+            group["buckets"][float("inf") if le == "+Inf" else float(le)] += float(value)
+        elif metric == f"{name}_sum":
+            group["sum"] += float(value)
+        elif metric == f"{name}_count":
+            group["count"] += float(value)
+    return groups
+
+
+def histogram_delta(before: Dict[str, Dict], after: Dict[str, Dict]) -> Dict[str, Dict]:
+    """after - before, per group; groups without new observations are dropped"""
+    delta = {}
+    for key, current in after.items():
+        previous = before.get(key, {"buckets": {}, "sum": 0.0, "count": 0.0})
+        count = current["count"] - previous["count"]
+        if count <= 0:
+            continue
+        delta[key] = {
+            "buckets": {le: c - previous["buckets"].get(le, 0.0) for le, c in current["buckets"].items()},
+            "sum": current["sum"] - previous["sum"],
+            "count": count,
+        }
+    return delta
+
+
+# name in results -> (metric, label to group by)
+STAGE_HISTOGRAMS = {
+    "stage": ("echobank_stage_duration_seconds", "stage"),
+    "bank": ("echobank_bank_api_duration_seconds", "endpoint"),
+    "turn": ("echobank_turn_duration_seconds", "input"),
+}
+
+
+def stage_stats(metrics_before: str, metrics_after: str) -> Dict[str, Dict]:
+    """Per-stage latency (ms) observed by the server during the measured window"""
+    stats = {}
+    for prefix, (metric, label) in STAGE_HISTOGRAMS.items():
+        delta = histogram_delta(
+            parse_histogram(metrics_before, metric, label),
+            parse_histogram(metrics_after, metric, label)
+        )
+        for key, hist in sorted(delta.items()):
+            name = key if prefix == "stage" else f"{prefix}.{key}"
+
+            def ms(q):
+                value = histogram_quantile(q, hist["buckets"])
+                return round(value * 1000, 2) if value is not None else None
+
+            stats[name] = {
+                "count": int(hist["count"]),
+                "mean_ms": round(hist["sum"] / hist["count"] * 1000, 2),
+                "p50_ms": ms(0.50),
+                "p95_ms": ms(0.95),
+                "p99_ms": ms(0.99),
+            }
+    return stats
+
+
+# ============================================================================
+# LOAD GENERATION
+# ============================================================================
+
+class Sample:
+    __slots__ = ("kind", "utterance", "seconds", "status", "ok")
+
+    def __init__(self, kind, utterance, seconds, status, ok):
+        self.kind = kind
+        self.utterance = utterance
+        self.seconds = seconds
+        self.status = status
+        self.ok = ok
+
+
+async def run_load(args, base_url: str, company_id: int, total: Optional[int],
+                   duration: Optional[float], wav: bytes) -> List[Sample]:
+    """Fire requests from `concurrency` workers until `total` or `duration` is reached"""
+    import httpx
+
+    rng = random.Random(args.seed)
+    utterances = [u for u, _ in SCENARIOS]
+    weights = [w for _, w in SCENARIOS]
+    samples: List[Sample] = []
+    issued = 0
+    deadline = time.perf_counter() + duration if duration else None
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120.0, limits=limits) as client:
+
+        async def one(worker_id: int, seq: int):
+            utterance = rng.choices(utterances, weights)[0]
+            kind = "audio" if rng.random() < args.audio_ratio else "text"
+            session_id = f"bench-{worker_id}-{seq}"
+            start = time.perf_counter()
+            try:
+                if kind == "text":
+                    response = await client.post("/api/v1/voice/process-text", json={
+                        "text": utterance,
+                        "account_number": BENCH_ACCOUNT,
+                        "company_id": company_id,
+                        "session_id": session_id,
+                        "token": "benchmark",
+                        "include_audio": args.include_audio,
+                    })
+                else:
+                    response = await client.post(
+                        "/api/v1/voice/process-audio",
+                        files={"audio": (utterance.replace(" ", "_") + ".wav", wav, "audio/wav")},
+                        headers={
+                            "account-number": BENCH_ACCOUNT,
+                            "company-id": str(company_id),
+                            "session-id": session_id,
+                            "token": "benchmark",
+                            "include-audio": "true" if args.include_audio else "false",
+                        }
+                    )
+                ok = response.status_code == 200 and response.json().get("success", False)
+                status = response.status_code
+            except httpx.HTTPError:
+                ok, status = False, 0
+            samples.append(Sample(kind, utterance, time.perf_counter() - start, status, ok))
+
+        async def worker(worker_id: int):
+            nonlocal issued
+            seq = 0
+            while True:
+                if total is not None and issued >= total:
+                    return
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return
+                issued += 1
+                seq += 1
+                await one(worker_id, seq)
+
+        await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+
+    return samples
+
+
+def client_stats(samples: List[Sample], elapsed: float) -> Dict[str, Dict]:
+    """Throughput and latency (ms) overall and per endpoint"""
+    groups = {"all": samples}
+    for kind in ("text", "audio"):
+        subset = [s for s in samples if s.kind == kind]
+        if subset:
+            groups[kind] = subset
+
+    stats = {}
+    for name, group in groups.items():
+        latencies = sorted(s.seconds * 1000 for s in group)
+        stats[name] = {
+            "requests": len(group),
+            "errors": sum(1 for s in group if not s.ok),
+            "throughput_rps": round(len(group) / elapsed, 2) if elapsed else 0.0,
+            "latency_ms": {
+                "mean": round(sum(latencies) / len(latencies), 2),
+                "p50_ms": round(percentile(latencies, 0.50), 2),
+                "p90_ms": round(percentile(latencies, 0.90), 2),
+                "p95_ms": round(percentile(latencies, 0.95), 2),
+                "p99_ms": round(percentile(latencies, 0.99), 2),
+                "max": round(latencies[-1], 2),
+            },
+        }
+    return stats
+
+
+# ============================================================================
+# REPORTING
+# ============================================================================
+
+def git_info() -> Dict:
+    def git(*cmd):
+        try:
+            return subprocess.run(
+                ["git", *cmd], cwd=str(REPO_DIR), capture_output=True, text=True, timeout=10
+            ).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+
+    return {
+        "git_commit": git("rev-parse", "HEAD") or "unknown",
+        "git_dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+def print_report(result: Dict):
+    print()
+    print(f"{'client':<10} {'reqs':>6} {'errs':>5} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for name, s in result["client"].items():
+        lat = s["latency_ms"]
+        print(f"{name:<10} {s['requests']:>6} {s['errors']:>5} {s['throughput_rps']:>8.1f} "
+              f"{lat['p50_ms']:>9.1f} {lat['p95_ms']:>9.1f} {lat['p99_ms']:>9.1f} {lat['max']:>9.1f}")
+
+    print()
+    print(f"{'stage':<28} {'count':>6} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, s in result["stages"].items():
+        cols = [s["mean_ms"], s["p50_ms"], s["p95_ms"], s["p99_ms"]]
+        print(f"{name:<28} {s['count']:>6} " + " ".join(f"{c:>9.1f}" if c is not None else f"{'-':>9}" for c in cols))
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EchoBank voice orchestrator load test")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests (ignored with --duration)")
+    parser.add_argument("--duration", type=float, help="Measure for this many seconds instead of a request count")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests sent first")
+    parser.add_argument("--audio-ratio", type=float, default=0.0, help="Fraction of requests sent to /process-audio")
+    parser.add_argument("--include-audio", action="store_true", help="Ask for TTS audio in every response")
+    parser.add_argument("--stt-latency", default="lognormal:300,0.3", help="Fake Whisper latency (ms spec)")
+    parser.add_argument("--llm-latency", default="lognormal:350,0.4", help="Fake LLM latency (ms spec)")
+    parser.add_argument("--tts-latency", default="lognormal:250,0.3", help="Fake TTS latency (ms spec)")
+    parser.add_argument("--blocking-fakes", action="store_true",
+                        help="Fakes block the event loop (time.sleep) like the sync SDKs do")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--bank-url", default="http://127.0.0.1:8100")
+    parser.add_argument("--start-bank", action="store_true", help="Launch mock_bank_server.py for the run")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the in-process API")
+    parser.add_argument("--label", default="", help="Free-form note stored with the result")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", help="Baseline result file to diff against")
+    args = parser.parse_args()
+
+    bank = None
+    if args.start_bank:
+        bank = start_mock_bank(args.bank_url)
+    elif not wait_for(args.bank_url, timeout=2.0):
+        raise SystemExit(f"No bank at {args.bank_url}; run mock_bank_server.py or pass --start-bank")
+
+    workdir = tempfile.mkdtemp(prefix="echobank-bench-")
+    configure_environment(os.path.join(workdir, "bench.db"))
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    from benchmarks.fakes import FakeLLM, FakeTTS, FakeWhisper, LatencyDistribution, install, silent_wav
+
+    company_id = seed_company(args.bank_url)
+    fakes = {
+        "stt": FakeWhisper(LatencyDistribution(args.stt_latency, args.seed), args.blocking_fakes),
+        "llm": FakeLLM(LatencyDistribution(args.llm_latency, args.seed + 1), args.blocking_fakes),
+        "tts": FakeTTS(LatencyDistribution(args.tts_latency, args.seed + 2), args.blocking_fakes),
+    }
+    install(fakes["stt"], fakes["llm"], fakes["tts"])
+
+    server, thread = start_api(args.port)
+    base_url = f"http://127.0.0.1:{args.port}"
+    wav = silent_wav(2.0)
+
+    try:
+        import httpx
+        if args.warmup:
+            asyncio.run(run_load(args, base_url, company_id, args.warmup, None, wav))
+
+        metrics_before = httpx.get(f"{base_url}/metrics").text
+        total = None if args.duration else args.requests
+        start = time.perf_counter()
+        samples = asyncio.run(run_load(args, base_url, company_id, total, args.duration, wav))
+        elapsed = time.perf_counter() - start
+        metrics_after = httpx.get(f"{base_url}/metrics").text
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+        if bank is not None:
+            bank.terminate()
+
+    meta = git_info()
+    meta.update({
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "label": args.label,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "elapsed_seconds": round(elapsed, 3),
+        "args": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+    })
+    result = {
+        "meta": meta,
+        "client": client_stats(samples, elapsed),
+        "stages": stage_stats(metrics_before, metrics_after),
+    }
+
+    print_report(result)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / (
+        f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{meta['git_commit'][:8]}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+    print(f"Saved {output}")
+
+    if args.compare:
+        from benchmarks.compare import compare
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print()
+        if not compare(baseline, result):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
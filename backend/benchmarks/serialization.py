@@ -0,0 +1,164 @@
+"""
+Serialization time per VoiceResponse size class
+
+Encodes typical voice responses the way each path does it and reports the
+median time per response:
+
+    fastapi+json    what FastAPI did by default: dump the returned model,
+                    re-validate it against response_model, serialize it, then
+                    json.dumps (JSONResponse)
+    fastapi+orjson  the same passes, encoded by FastJSONResponse (the app's
+                    default response class; used by endpoints returning dicts)
+    voice_json      voice_json_response(): pydantic's one-pass JSON encoder,
+                    or the pre-serialized body for fixed replies
+
+Size classes:
+    greeting        fixed reply (pre-serialized body)
+    balance         short reply with a small data dict
+    recipients      50 saved recipients in data
+    transactions    10 transactions plus 10 recipients
+    audio_4s        balance reply with ~4s of inline base64 WAV
+    audio_20s       same with ~20s of audio
+
+Usage (from backend/):
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --iterations 2000
+"""
+import argparse
+import asyncio
+import base64
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+for key, value in {
+    "TOGETHER_API_KEY": "benchmark", "WHISPERAPI": "benchmark", "DATABASE_URL": "sqlite://",
+    "JWT_SECRET_KEY": "benchmark", "ENCRYPTION_KEY": "benchmark",
+    "EMAIL_SENDER": "benchmark@example.com", "EMAIL_PASSWORD": "benchmark",
+    "LOG_LEVEL": "WARNING",
+}.items():
+    os.environ.setdefault(key, value)
+sys.path.insert(0, str(BACKEND_DIR))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from app.api.voice_orchestrator import VoiceResponse, router, voice_json_response  # noqa: E402
+from app.core.responses import ORJSON_AVAILABLE, FastJSONResponse  # noqa: E402
+from app.services.prompts import GREETING_TEXT  # noqa: E402
+from benchmarks.fakes import silent_wav  # noqa: E402
+
+SESSION_ID = "session_8523711419"
+
+
+def recipients(count: int) -> List[Dict]:
+    return [
+        {"id": i, "name": f"Recipient {i}", "account_number": f"{1000000000 + i}",
+         "bank_name": "Demo Bank", "bank_code": "999"}
+        for i in range(count)
+    ]
+
+
+def transactions(count: int) -> List[Dict]:
+    return [
+        {"id": f"TXN{i:08d}", "type": "debit" if i % 2 else "credit", "amount": 5000.0 + i,
+         "description": f"Transfer to Recipient {i}", "date": "2026-10-01T12:00:00Z",
+         "balance_after": 250000.0 - i * 5000}
+        for i in range(count)
+    ]
+
+
+def balance(**extra) -> VoiceResponse:
+    return VoiceResponse(
+        success=True, session_id=SESSION_ID, intent="check_balance",
+        response_text="Your balance is 250,000 naira.", action="complete",
+        data={"balance": 250000.0, "currency": "NGN", "account_number": "8523711419"}, **extra
+    )
+
+
+def size_classes() -> Dict[str, VoiceResponse]:
+    return {
+        "greeting": VoiceResponse(
+            success=True, session_id=SESSION_ID, intent="greeting", response_text=GREETING_TEXT, action="ready"
+        ),
+        "balance": balance(),
+        "recipients": VoiceResponse(
+            success=True, session_id=SESSION_ID, intent="view_recipients",
+            response_text="You have 50 saved recipients.", action="complete",
+            data={"recipients": recipients(50)}
+        ),
+        "transactions": VoiceResponse(
+            success=True, session_id=SESSION_ID, intent="view_transactions",
+            response_text="Here are your last 10 transactions.", action="complete",
+            data={"transactions": transactions(10), "recipients": recipients(10)}
+        ),
+        "audio_4s": balance(
+            response_audio=base64.b64encode(silent_wav(4.0, sample_rate=22050)).decode("ascii"), audio_format="wav"
+        ),
+        "audio_20s": balance(
+            response_audio=base64.b64encode(silent_wav(20.0, sample_rate=22050)).decode("ascii"), audio_format="wav"
+        ),
+    }
+
+
+def response_field():
+    for route in router.routes:
+        if route.path.endswith("/process-text"):
+            return route.secure_cloned_response_field
+    raise SystemExit("process-text route not found")
+
+
+def fastapi_path(field, response_class) -> Callable:
+    async def encode(response: VoiceResponse) -> bytes:
+        content = await serialize_response(field=field, response_content=response)
+        return response_class(content).body
+    return encode
+
+
+async def voice_json(response: VoiceResponse) -> bytes:
+    return voice_json_response(response).body
+
+
+async def measure(encode: Callable, response: VoiceResponse, iterations: int) -> Dict:
+    body = await encode(response)
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await encode(response)
+        timings.append(time.perf_counter() - start)
+    return {"us": statistics.median(timings) * 1e6, "bytes": len(body)}
+
+
+async def run(iterations: int):
+    field = response_field()
+    paths = {
+        "fastapi+json": fastapi_path(field, JSONResponse),
+        "fastapi+orjson": fastapi_path(field, FastJSONResponse),
+        "voice_json": voice_json,
+    }
+    if not ORJSON_AVAILABLE:
+        print("orjson is not installed: FastJSONResponse falls back to the json module")
+
+    print()
+    print(f"{'class':<14} {'bytes':>9} " + " ".join(f"{name:>15}" for name in paths) + f" {'speedup':>8}")
+    for name, response in size_classes().items():
+        results = {path: await measure(encode, response, iterations) for path, encode in paths.items()}
+        size = results["fastapi+json"]["bytes"]
+        speedup = results["fastapi+json"]["us"] / results["voice_json"]["us"]
+        print(f"{name:<14} {size:>9} " + " ".join(f"{r['us']:>13.1f}us" for r in results.values()) + f" {speedup:>7.1f}x")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serialization time per VoiceResponse size class")
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
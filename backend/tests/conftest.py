@@ -0,0 +1,10 @@
+"""Settings the app needs at import time, so the tests run without a .env"""
+import os
+
+for key, value in {
+    "TOGETHER_API_KEY": "test", "WHISPERAPI": "test", "DATABASE_URL": "sqlite://",
+    "JWT_SECRET_KEY": "test", "ENCRYPTION_KEY": "test",
+    "EMAIL_SENDER": "test@example.com", "EMAIL_PASSWORD": "test",
+    "LOG_LEVEL": "WARNING",
+}.items():
+    os.environ.setdefault(key, value)
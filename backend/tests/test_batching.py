@@ -0,0 +1,42 @@
+"""
+MicroBatcher: per-item errors
+
+Run from backend/:
+    python -m pytest tests
+"""
+import asyncio
+import pytest
+from app.utils.batching import MicroBatcher
+
+
+def test_item_error_only_fails_its_own_caller():
+    def run_batch(items):
+        return [ValueError(f"bad {item}") if item < 0 else item * 2 for item in items]
+
+    async def scenario():
+        batcher = MicroBatcher(run_batch, max_batch_size=4, max_wait_seconds=0.01)
+        try:
+            results = await asyncio.gather(*(batcher.submit(i) for i in (1, -1, 3)), return_exceptions=True)
+        finally:
+            batcher.shutdown()
+        return results
+
+    ok1, bad, ok3 = asyncio.run(scenario())
+    assert (ok1, ok3) == (2, 6)
+    assert isinstance(bad, ValueError)
+
+
+def test_batch_error_fails_every_caller():
+    def run_batch(items):
+        raise RuntimeError("model crashed")
+
+    async def scenario():
+        batcher = MicroBatcher(run_batch, max_batch_size=4, max_wait_seconds=0.01)
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in (1, 2)), return_exceptions=True)
+        finally:
+            batcher.shutdown()
+
+    for result in asyncio.run(scenario()):
+        with pytest.raises(RuntimeError):
+            raise result
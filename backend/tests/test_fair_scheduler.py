@@ -0,0 +1,63 @@
+"""
+FairScheduler: cancellation of queued requests
+
+Run from backend/:
+    python -m pytest tests
+"""
+import asyncio
+import pytest
+from app.utils.fair_scheduler import FairScheduler
+
+
+def test_cancel_while_queued_releases_queue_entry():
+    async def scenario():
+        scheduler = FairScheduler("test", capacity=1)
+        held = scheduler.slot("a")
+        await held.__aenter__()
+
+        async def waiter():
+            async with scheduler.slot("b"):
+                pass
+
+        task = asyncio.create_task(waiter())
+        await asyncio.sleep(0)
+        assert scheduler.waiting() == 1
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert scheduler.waiting() == 0
+        await held.__aexit__(None, None, None)
+        assert scheduler._running == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancel_during_release_raises_cancelled_error():
+    async def scenario():
+        scheduler = FairScheduler("test", capacity=1)
+        held = scheduler.slot("a")
+        await held.__aenter__()
+
+        async def waiter():
+            async with scheduler.slot("b"):
+                pass
+
+        task = asyncio.create_task(waiter())
+        await asyncio.sleep(0)
+
+        # Cancelled, then the holder releases before the waiter gets to run:
+        # the release pops the (cancelled) entry and skips it
+        task.cancel()
+        await held.__aexit__(None, None, None)
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert scheduler.waiting() == 0
+        assert scheduler._running == 0
+
+        # The slot is free for the next caller
+        async with scheduler.slot("c"):
+            assert scheduler._running == 1
+
+    asyncio.run(scenario())
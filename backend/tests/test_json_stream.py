@@ -0,0 +1,29 @@
+"""
+Incremental JSON reader: limit and captures
+
+Run from backend/:
+    python -m pytest tests
+"""
+import json
+from app.utils.json_stream import JSONArrayStream
+
+
+def _read(document, limit):
+    reader = JSONArrayStream([("data",)], capture_paths={"next_cursor": ("next_cursor",)}, limit=limit)
+    reader.feed(json.dumps(document).encode())
+    reader.close()
+    return reader
+
+
+def test_limit_reached_inside_array_is_truncated():
+    reader = _read({"data": [1, 2, 3, 4], "next_cursor": "c2"}, limit=2)
+    assert reader.items == [1, 2]
+    assert reader.truncated
+    assert "next_cursor" not in reader.captured
+
+
+def test_array_ending_at_limit_keeps_cursor():
+    reader = _read({"data": [1, 2], "next_cursor": "c2"}, limit=2)
+    assert reader.items == [1, 2]
+    assert not reader.truncated
+    assert reader.captured == {"next_cursor": "c2"}
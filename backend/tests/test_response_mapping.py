@@ -0,0 +1,37 @@
+"""
+Response mapping: recipient/transaction normalisation
+
+Run from backend/:
+    python -m pytest tests
+"""
+import pytest
+from app.services.response_mapping import ResponseMappingError, compile_response_mapping
+
+
+def test_non_object_list_entries_are_dropped():
+    mapping = compile_response_mapping({})
+    recipients = mapping.extract_recipients({"recipients": ["John", None, {"name": "Ada"}]})
+    assert [r["name"] for r in recipients] == ["Ada"]
+    assert mapping.normalize_transactions([None, 3, {"type": "credit"}])[0]["transaction_type"] == "credit"
+
+
+def test_recipient_name_wins_over_name():
+    mapping = compile_response_mapping({})
+    recipients = mapping.extract_recipients([{"name": "Ada", "recipient_name": "Ada Obi"}])
+    assert recipients[0]["name"] == "Ada Obi"
+
+
+def test_lenient_compile_skips_invalid_keys():
+    mapping = compile_response_mapping(
+        {"balance_path": "", "recipients_path": "data..list", "recipient_fields": "name",
+         "transactions_limit_param": 5, "legacy": True},
+        strict=False,
+    )
+    assert mapping.extract_balance({"balance": 12}) == 12.0
+    assert mapping.extract_recipients({"recipients": [{"name": "Ada"}]})[0]["name"] == "Ada"
+    assert mapping.limit_param == "limit"
+
+
+def test_strict_compile_rejects_invalid_keys():
+    with pytest.raises(ResponseMappingError):
+        compile_response_mapping({"balance_path": "data..balance"})
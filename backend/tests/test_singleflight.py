@@ -0,0 +1,70 @@
+"""
+SingleFlight: shared calls and caller deadlines
+
+Run from backend/:
+    python -m pytest tests
+"""
+import asyncio
+import pytest
+from app.core.deadline import DeadlineExceeded, current_deadline, remaining_time, start_deadline
+from app.utils.singleflight import SingleFlight
+
+
+def test_joiner_with_more_budget_outlives_first_caller():
+    async def scenario():
+        flights = SingleFlight()
+        calls = []
+
+        async def slow_read():
+            calls.append(1)
+            await asyncio.sleep(0.2)
+            return remaining_time(30.0)
+
+        async def caller(budget: float):
+            start_deadline(budget)
+            return await flights.do("balance", slow_read)
+
+        short = asyncio.create_task(caller(0.05))
+        await asyncio.sleep(0)
+        long = asyncio.create_task(caller(2.0))
+        results = await asyncio.gather(short, long, return_exceptions=True)
+        return calls, results
+
+    calls, (short, long) = asyncio.run(scenario())
+    assert calls == [1]
+    assert isinstance(short, DeadlineExceeded)
+    assert long > 1.0  # The shared call ran on the joiner's (later) deadline
+
+
+def test_shared_call_runs_outside_the_callers_context():
+    async def scenario():
+        flights = SingleFlight()
+        start_deadline(5.0)
+        caller_deadline = current_deadline()
+
+        async def read():
+            return current_deadline()
+
+        return caller_deadline, await flights.do("balance", read)
+
+    caller_deadline, flight_deadline = asyncio.run(scenario())
+    assert flight_deadline is not None and flight_deadline is not caller_deadline
+
+
+def test_every_caller_gone_cancels_the_call():
+    async def scenario():
+        flights = SingleFlight()
+        started = asyncio.Event()
+
+        async def read():
+            started.set()
+            await asyncio.sleep(10)
+
+        task = asyncio.create_task(flights.do("balance", read))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return flights.in_flight()
+
+    assert asyncio.run(scenario()) == 0
@@ -66,6 +66,19 @@ BALANCES = {
     "8523711419": 250000.00,  # Funbi
 }
 
+# Transaction history per account (most recent first)
+TRANSACTIONS_BY_ACCOUNT = {
+    "6523711418": [
+        {"id": "TXN000103", "transaction_type": "transfer", "amount": 5000.00, "recipient_name": "John Ade", "status": "completed", "timestamp": "2025-10-24T14:12:00"},
+        {"id": "TXN000102", "transaction_type": "credit", "amount": 20000.00, "recipient_name": "", "status": "completed", "timestamp": "2025-10-23T09:30:00"},
+        {"id": "TXN000101", "transaction_type": "transfer", "amount": 2500.00, "recipient_name": "Mary Johnson", "status": "completed", "timestamp": "2025-10-21T18:45:00"}
+    ],
+    "8523711419": [
+        {"id": "TXN000202", "transaction_type": "transfer", "amount": 15000.00, "recipient_name": "Tunde Bakare", "status": "completed", "timestamp": "2025-10-24T11:05:00"},
+        {"id": "TXN000201", "transaction_type": "transfer", "amount": 7000.00, "recipient_name": "Chioma Okafor", "status": "completed", "timestamp": "2025-10-22T16:20:00"}
+    ]
+}
+
 # In-memory storage for initiated transfers
 initiated_transfers = {}
 transfer_counter = 1
@@ -93,6 +106,25 @@ async def get_recipients(account_number: str, authorization: str = Header(None))
     }
 
 
+@app.get("/api/v1/accounts/{account_number}/transactions")
+async def get_transactions(
+    account_number: str,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    authorization: str = Header(None)
+):
+    """Get transaction history (cursor is the offset of the next page)"""
+    transactions = TRANSACTIONS_BY_ACCOUNT.get(account_number, [])
+    offset = int(cursor) if cursor and cursor.isdigit() else 0
+    page = transactions[offset:offset + limit]
+    next_offset = offset + len(page)
+    return {
+        "success": True,
+        "transactions": page,
+        "next_cursor": str(next_offset) if next_offset < len(transactions) else None
+    }
+
+
 class TransferInitiateRequest(BaseModel):
     sender_account: str
     recipient_account: str
@@ -214,6 +246,7 @@ async def root():
         "endpoints": {
             "balance": "/api/v1/accounts/{account_number}/balance",
             "recipients": "/api/v1/accounts/{account_number}/beneficiaries",
+            "transactions": "/api/v1/accounts/{account_number}/transactions",
             "initiate_transfer": "/api/v1/transfers/initiate",
             "confirm_transfer": "/api/v1/transfers/{transfer_id}/confirm",
             "cancel_transfer": "/api/v1/transfers/{transfer_id}/cancel",
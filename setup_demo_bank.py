@@ -51,6 +51,7 @@ def setup_demo_bank():
                 base_url="http://127.0.0.1:8100",  # Mock bank server
                 get_balance_endpoint="/api/v1/accounts/{account_number}/balance",
                 get_recipients_endpoint="/api/v1/accounts/{account_number}/beneficiaries",
+                get_transactions_endpoint="/api/v1/accounts/{account_number}/transactions",
                 initiate_transfer_endpoint="/api/v1/transfers/initiate",
                 confirm_transfer_endpoint="/api/v1/transfers/{transfer_id}/confirm",
                 cancel_transfer_endpoint="/api/v1/transfers/{transfer_id}/cancel",
@@ -66,6 +67,7 @@ def setup_demo_bank():
             endpoints.base_url = "http://127.0.0.1:8100"
             endpoints.get_balance_endpoint = "/api/v1/accounts/{account_number}/balance"
             endpoints.get_recipients_endpoint = "/api/v1/accounts/{account_number}/beneficiaries"
+            endpoints.get_transactions_endpoint = "/api/v1/accounts/{account_number}/transactions"
             endpoints.initiate_transfer_endpoint = "/api/v1/transfers/initiate"
             endpoints.confirm_transfer_endpoint = "/api/v1/transfers/{transfer_id}/confirm"
             endpoints.cancel_transfer_endpoint = "/api/v1/transfers/{transfer_id}/cancel"